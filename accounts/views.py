@@ -12,6 +12,7 @@ from django.urls import reverse_lazy
 from django.views.generic.edit import UpdateView
 
 from accounts.models import UserAccount
+from scheduler import archive
 from scheduler.models import ShiftHelper
 from volunteer_planner.utils import LoginRequiredMixin
 
@@ -169,13 +170,8 @@ def shift_list_done(request):
              ie.: user and shifts_past.
     """
     user = request.user
-    shifthelper = ShiftHelper.objects.filter(
-        user_account=UserAccount.objects.get(user=user)
-    )
-    shifts_past = (
-        shifthelper.filter(shift__ending_time__lt=date.today())
-        .order_by("shift__starting_time")
-        .reverse()
+    shifts_past = archive.get_past_shift_helpers(
+        UserAccount.objects.get(user=user), ended_before=date.today()
     )
 
     return render(
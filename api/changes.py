@@ -0,0 +1,141 @@
+"""
+Change log of shifts, so clients mirroring them can poll for what changed since
+their last sync instead of fetching everything again.
+
+Changes of shifts and of their helpers (which change the shift's availability)
+are collected per transaction and written after commit, at most one entry per
+shift and transaction. Entries are hints: clients should fetch the current
+state of the changed shifts (``/api/v1/shifts/?ids=``).
+
+compact() keeps the log small: older than CHANGE_LOG_COMPACT_AFTER, only the
+latest entry of every shift is kept; older than CHANGE_LOG_RETENTION, entries
+are deleted and cursors pointing before them are rejected.
+"""
+import threading
+import weakref
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from scheduler.models import Shift
+from .models import ChangeLogWatermark, ShiftChange
+from .settings import CHANGE_LOG_COMPACT_AFTER, CHANGE_LOG_RETENTION
+
+Action = ShiftChange.Action
+
+
+class PendingChanges(dict):
+    """
+    ``{shift_id: (action, facility_id or None)}`` of the current transaction.
+
+    Only its on commit callbacks refer to it, the thread local just weakly. When
+    a rollback discards the callbacks, the changes are gone with them and the
+    next transaction starts over. Changes rolled back to a savepoint are kept
+    if callbacks registered before the savepoint remain, which is harmless for
+    hints.
+    """
+
+
+_pending = threading.local()
+
+
+def get_pending():
+    ref = getattr(_pending, "changes", None)
+    pending = ref() if ref else None
+    if pending is None:
+        pending = PendingChanges()
+        _pending.changes = weakref.ref(pending)
+    return pending
+
+
+def record_on_commit(shift_id, action, facility_id=None):
+    """
+    Records a change of the shift after the current transaction was committed.
+    The facility is looked up then, if not given.
+    """
+    pending = get_pending()
+    previous_action, previous_facility_id = pending.get(shift_id, (None, None))
+    if previous_action == Action.CREATED and action == Action.UPDATED:
+        action = Action.CREATED
+    pending[shift_id] = (action, facility_id or previous_facility_id)
+    # each call registers a callback, as callbacks are discarded on rollback,
+    # but only the first one to run after commit has anything left to do
+    transaction.on_commit(partial(_record_pending, pending))
+
+
+def _record_pending(pending):
+    if not pending:
+        return
+    changes = dict(pending)
+    pending.clear()
+    record(changes)
+
+
+def record(changes):
+    """Writes ``{shift_id: (action, facility_id or None)}`` to the log."""
+    missing = [pk for pk, (_action, facility_id) in changes.items() if not facility_id]
+    facility_ids = dict(
+        Shift.objects.filter(pk__in=missing).values_list("pk", "facility_id")
+    )
+    now = timezone.now()
+    entries = []
+    for shift_id, (action, facility_id) in sorted(changes.items()):
+        facility_id = facility_id or facility_ids.get(shift_id)
+        if facility_id is None:
+            # deleted in the meantime, its deletion is recorded separately
+            continue
+        entries.append(
+            ShiftChange(
+                shift_id=shift_id,
+                facility_id=facility_id,
+                action=action,
+                changed_at=now,
+            )
+        )
+    ShiftChange.objects.bulk_create(entries)
+
+
+def get_truncated_until():
+    """Returns the sequence number up to which changes were deleted."""
+    watermark = ChangeLogWatermark.objects.values_list("truncated_until", flat=True)
+    return watermark.first() or 0
+
+
+def get_head(settled_before):
+    """
+    Returns the sequence number of the latest change up to ``settled_before``,
+    the cursor of a client which is up to date.
+    """
+    head = ShiftChange.objects.filter(changed_at__lte=settled_before).aggregate(
+        sequence=Max("sequence")
+    )["sequence"]
+    return head or get_truncated_until()
+
+
+@transaction.atomic
+def compact(now=None):
+    """
+    Deletes superseded and expired entries, returns the number of deleted
+    entries.
+    """
+    now = now or timezone.now()
+
+    expired = ShiftChange.objects.filter(changed_at__lt=now - CHANGE_LOG_RETENTION)
+    truncated_until = expired.aggregate(sequence=Max("sequence"))["sequence"]
+    deleted = 0
+    if truncated_until is not None:
+        deleted, _deleted_per_model = expired.delete()
+        ChangeLogWatermark.objects.update_or_create(
+            pk=1, defaults={"truncated_until": truncated_until}
+        )
+
+    old = ShiftChange.objects.filter(changed_at__lt=now - CHANGE_LOG_COMPACT_AFTER)
+    latest = (
+        old.values("shift_id")
+        .annotate(latest=Max("sequence"))
+        .values_list("latest", flat=True)
+    )
+    superseded, _deleted_per_model = old.exclude(sequence__in=list(latest)).delete()
+    return deleted + superseded
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from api import changes
+
+
+class Command(BaseCommand):
+    help = (  # noqa: A003
+        "Deletes superseded and expired entries of the shift change log"
+    )
+
+    def handle(self, *args, **options):
+        deleted = changes.compact()
+        self.stdout.write("Deleted {} change log entries".format(deleted))
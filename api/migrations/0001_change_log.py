@@ -0,0 +1,73 @@
+# Generated by Django 4.0.4 on 2026-10-19 13:27
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="ChangeLogWatermark",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "truncated_until",
+                    models.BigIntegerField(default=0, verbose_name="truncated until"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="updated at"),
+                ),
+            ],
+            options={
+                "verbose_name": "change log watermark",
+                "verbose_name_plural": "change log watermarks",
+            },
+        ),
+        migrations.CreateModel(
+            name="ShiftChange",
+            fields=[
+                (
+                    "sequence",
+                    models.BigAutoField(
+                        primary_key=True, serialize=False, verbose_name="sequence"
+                    ),
+                ),
+                ("shift_id", models.IntegerField(db_index=True, verbose_name="shift")),
+                ("facility_id", models.IntegerField(verbose_name="facility")),
+                (
+                    "action",
+                    models.PositiveSmallIntegerField(
+                        choices=[(1, "created"), (2, "updated"), (3, "deleted")],
+                        verbose_name="action",
+                    ),
+                ),
+                (
+                    "changed_at",
+                    models.DateTimeField(
+                        db_index=True,
+                        default=django.utils.timezone.now,
+                        verbose_name="changed at",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "shift change",
+                "verbose_name_plural": "shift changes",
+                "ordering": ("sequence",),
+            },
+        ),
+    ]
@@ -0,0 +1,61 @@
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class ShiftChange(models.Model):
+    """
+    Append-only log of changes of shifts and their helpers, see api.changes.
+
+    The sequence number increases with every entry, so clients can ask for the
+    changes since the last entry they saw.
+    """
+
+    class Action:
+        CREATED, UPDATED, DELETED = 1, 2, 3
+        CHOICES = (
+            (CREATED, _("created")),
+            (UPDATED, _("updated")),
+            (DELETED, _("deleted")),
+        )
+        NAMES = {CREATED: "created", UPDATED: "updated", DELETED: "deleted"}
+
+    sequence = models.BigAutoField(primary_key=True, verbose_name=_("sequence"))
+    shift_id = models.IntegerField(db_index=True, verbose_name=_("shift"))
+    facility_id = models.IntegerField(verbose_name=_("facility"))
+    action = models.PositiveSmallIntegerField(
+        choices=Action.CHOICES, verbose_name=_("action")
+    )
+    changed_at = models.DateTimeField(
+        default=timezone.now, db_index=True, verbose_name=_("changed at")
+    )
+
+    class Meta:
+        verbose_name = _("shift change")
+        verbose_name_plural = _("shift changes")
+        ordering = ("sequence",)
+
+    def __str__(self):
+        return "#{} shift {} {}".format(
+            self.sequence, self.shift_id, self.Action.NAMES[self.action]
+        )
+
+
+class ChangeLogWatermark(models.Model):
+    """
+    Single row keeping the sequence number up to which the change log was
+    truncated. Clients with an older cursor missed changes and must fetch all
+    data again.
+    """
+
+    truncated_until = models.BigIntegerField(
+        default=0, verbose_name=_("truncated until")
+    )
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("updated at"))
+
+    class Meta:
+        verbose_name = _("change log watermark")
+        verbose_name_plural = _("change log watermarks")
+
+    def __str__(self):
+        return str(self.truncated_until)
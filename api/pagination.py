@@ -0,0 +1,68 @@
+"""
+Keyset (cursor) pagination.
+
+Instead of offsets, pages are requested with an opaque cursor encoding the
+ordering values of the last result of the previous page. Fetching a page is
+therefore equally cheap for every page, and results are neither skipped nor
+repeated when rows are inserted or deleted while a client pages through them.
+"""
+import base64
+import json
+from datetime import datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    # DjangoJSONEncoder truncates microseconds, but cursors must be exact
+    values = [
+        value.isoformat() if isinstance(value, datetime) else value for value in values
+    ]
+    data = json.dumps(values, cls=DjangoJSONEncoder, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, length):
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(data.decode("utf-8"))
+    except ValueError:  # includes binascii.Error and UnicodeDecodeError
+        raise InvalidCursor(cursor)
+    if not isinstance(values, list) or len(values) != length:
+        raise InvalidCursor(cursor)
+    return values
+
+
+def after(fields, values):
+    """
+    Returns a filter for the rows following ``values`` in ascending order of
+    ``fields``, e.g. for ``("starting_time", "pk")``::
+
+        starting_time > t OR (starting_time = t AND pk > pk)
+    """
+    condition = Q()
+    for index in reversed(range(len(fields))):
+        equal = {field: value for field, value in zip(fields[:index], values)}
+        condition = Q(**{fields[index] + "__gt": values[index]}, **equal) | condition
+    return condition
+
+
+def paginate(queryset, fields, cursor_values, limit):
+    """
+    Returns the page of ``queryset`` (ordered by ``fields``) following the
+    cursor values and the cursor values of the next page (or None).
+    """
+    queryset = queryset.order_by(*fields)
+    if cursor_values is not None:
+        queryset = queryset.filter(after(fields, cursor_values))
+    results = list(queryset[: limit + 1])
+    if len(results) <= limit:
+        return results, None
+    results = results[:limit]
+    last = results[-1]
+    return results, [getattr(last, field) for field in fields]
@@ -0,0 +1,20 @@
+from datetime import timedelta
+
+from django.conf import settings
+
+# number of results per page, if not requested otherwise (``?limit=``)
+API_PAGE_SIZE = getattr(settings, "API_PAGE_SIZE", 100)
+API_MAX_PAGE_SIZE = getattr(settings, "API_MAX_PAGE_SIZE", 500)
+
+# seconds responses may be cached by clients and proxies
+API_MAX_AGE = getattr(settings, "API_MAX_AGE", 30)
+
+# changes are only listed this many seconds after they were recorded, so entries
+# with lower sequence numbers committed concurrently are not skipped by clients
+CHANGE_LOG_SETTLE_TIME = getattr(settings, "CHANGE_LOG_SETTLE_TIME", 2)
+# after this time, only the latest change of each shift is kept
+CHANGE_LOG_COMPACT_AFTER = getattr(
+    settings, "CHANGE_LOG_COMPACT_AFTER", timedelta(hours=1)
+)
+# after this time, changes are deleted and older cursors are rejected
+CHANGE_LOG_RETENTION = getattr(settings, "CHANGE_LOG_RETENTION", timedelta(days=7))
@@ -0,0 +1,25 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from scheduler.models import Shift, ShiftHelper
+from . import changes
+from .models import ShiftChange
+
+
+@receiver(post_save, sender=Shift)
+def record_shift_saved(sender, instance, created, **kwargs):
+    action = ShiftChange.Action.CREATED if created else ShiftChange.Action.UPDATED
+    changes.record_on_commit(instance.pk, action, instance.facility_id)
+
+
+@receiver(post_delete, sender=Shift)
+def record_shift_deleted(sender, instance, **kwargs):
+    changes.record_on_commit(
+        instance.pk, ShiftChange.Action.DELETED, instance.facility_id
+    )
+
+
+@receiver(post_save, sender=ShiftHelper)
+@receiver(post_delete, sender=ShiftHelper)
+def record_shift_helper_changed(sender, instance, **kwargs):
+    changes.record_on_commit(instance.shift_id, ShiftChange.Action.UPDATED)
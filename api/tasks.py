@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from . import changes
+
+
+@shared_task
+def compact_change_log():
+    changes.compact()
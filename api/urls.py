@@ -0,0 +1,10 @@
+from django.urls import re_path
+
+from .views import ChangeListView, FacilityListView, PlaceListView, ShiftListView
+
+urlpatterns = [
+    re_path(r"^v1/shifts/$", ShiftListView.as_view(), name="api_shifts"),
+    re_path(r"^v1/facilities/$", FacilityListView.as_view(), name="api_facilities"),
+    re_path(r"^v1/places/$", PlaceListView.as_view(), name="api_places"),
+    re_path(r"^v1/changes/$", ChangeListView.as_view(), name="api_changes"),
+]
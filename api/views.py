@@ -0,0 +1,375 @@
+"""
+Read-only JSON API (``/api/v1/``) for partners mirroring open shifts.
+
+List endpoints return ``{"results": [...], "next": <url or null>}``. Clients
+sync incrementally by following ``next`` (keyset pagination, see
+api.pagination), select fields with ``?fields=id,name`` and revalidate pages
+with their ETag. Requests are rate limited per client IP address and user
+(scope ``api`` of RATELIMITS), see common.ratelimit.
+"""
+import hashlib
+import json
+from datetime import date, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count
+from django.http import HttpResponse, JsonResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.dateparse import parse_datetime
+from django.utils.decorators import method_decorator
+from django.utils import timezone
+from django.utils.timezone import localdate
+from django.views.generic import View
+
+from common.ratelimit import ratelimit
+from organizations.models import Facility
+from places.hierarchy import LEVELS, get_place_hierarchy
+from scheduler.models import OpenShiftRollup, Shift
+from .changes import get_head, get_truncated_until
+from .models import ShiftChange
+from .pagination import InvalidCursor, decode_cursor, encode_cursor, paginate
+from .settings import (
+    API_MAX_AGE,
+    API_MAX_PAGE_SIZE,
+    API_PAGE_SIZE,
+    CHANGE_LOG_SETTLE_TIME,
+)
+
+GEOGRAPHY_KINDS = {model._meta.model_name: model for model in LEVELS}
+
+FACILITY_GEOGRAPHY_LOOKUPS = {
+    "place": "place",
+    "area": "place__area",
+    "region": "place__area__region",
+    "country": "place__area__region__country",
+}
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400, **data):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+        # more members of the error response
+        self.data = data
+
+
+def error_response(message, status, **data):
+    return JsonResponse(dict(data, error=message), status=status)
+
+
+@method_decorator(ratelimit("api", methods=("GET", "HEAD", "OPTIONS")), name="dispatch")
+class ApiView(View):
+    """
+    Base class of the read-only API views.
+
+    Subclasses implement ``get_data``, which returns the data to be serialized
+    as JSON or raises ApiError. Responses carry an ETag, so clients can poll
+    with ``If-None-Match`` and receive a body only if something changed.
+    """
+
+    http_method_names = ["get", "head", "options"]
+
+    # field name -> function returning the value of an object
+    fields = {}
+
+    def get(self, request, *args, **kwargs):
+        try:
+            data = self.get_data(request, *args, **kwargs)
+        except ApiError as e:
+            return error_response(e.message, e.status, **e.data)
+
+        content = json.dumps(data, cls=DjangoJSONEncoder, separators=(",", ":"))
+        content = content.encode("utf-8")
+        etag = '"{}"'.format(hashlib.md5(content).hexdigest())
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(content, content_type="application/json")
+        response["ETag"] = etag
+        patch_cache_control(response, public=True, max_age=API_MAX_AGE)
+        return response
+
+    def get_data(self, request, *args, **kwargs):
+        raise NotImplementedError
+
+    def get_fields(self):
+        """Returns the requested fields (``?fields=id,name``)."""
+        requested = self.request.GET.get("fields")
+        if not requested:
+            return list(self.fields)
+        names = [name.strip() for name in requested.split(",") if name.strip()]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ApiError("Unknown fields: {}".format(", ".join(unknown)))
+        return names
+
+    def serialize(self, objects, fields):
+        getters = [(name, self.fields[name]) for name in fields]
+        return [
+            {name: getter(self, obj) for name, getter in getters} for obj in objects
+        ]
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.GET.get("limit", API_PAGE_SIZE))
+        except ValueError:
+            raise ApiError("limit must be a number.")
+        return min(max(limit, 1), API_MAX_PAGE_SIZE)
+
+    def get_geography(self):
+        """Returns the place hierarchy node of ``?geography=<kind>:<pk>``."""
+        geography = self.request.GET.get("geography")
+        if not geography:
+            return None
+        kind, _sep, pk = geography.partition(":")
+        model = GEOGRAPHY_KINDS.get(kind)
+        node = (
+            get_place_hierarchy().get_by_pk(model, int(pk))
+            if model and pk.isdigit()
+            else None
+        )
+        if node is None:
+            raise ApiError("Unknown geography: {}".format(geography))
+        return node
+
+    def get_flag(self, name):
+        return self.request.GET.get(name, "").lower() in ("1", "true", "yes")
+
+    def page(self, queryset, ordering, parse_cursor):
+        cursor = self.request.GET.get("cursor")
+        cursor_values = None
+        if cursor:
+            try:
+                cursor_values = parse_cursor(decode_cursor(cursor, len(ordering)))
+            except (InvalidCursor, TypeError, ValueError):
+                raise ApiError("Invalid cursor.")
+
+        fields = self.get_fields()
+        results, next_values = paginate(
+            queryset, ordering, cursor_values, self.get_limit()
+        )
+        next_url = None
+        if next_values is not None:
+            params = self.request.GET.copy()
+            params["cursor"] = encode_cursor(next_values)
+            next_url = self.request.build_absolute_uri(
+                "{}?{}".format(self.request.path, params.urlencode())
+            )
+        return {"results": self.serialize(results, fields), "next": next_url}
+
+    def absolute_url(self, path):
+        return self.request.build_absolute_uri(path)
+
+
+def parse_id_cursor(values):
+    (pk,) = values
+    return [int(pk)]
+
+
+def parse_time_cursor(values):
+    starting_time, pk = values
+    starting_time = parse_datetime(starting_time)
+    if starting_time is None:
+        raise ValueError(values)
+    return [starting_time, int(pk)]
+
+
+def shift_url(view, shift):
+    day = localdate(shift.starting_time)
+    return view.absolute_url(
+        reverse(
+            "shift_details",
+            kwargs={
+                "facility_slug": shift.facility.slug,
+                "year": day.year,
+                "month": day.month,
+                "day": day.day,
+                "shift_id": shift.pk,
+            },
+        )
+    )
+
+
+class ShiftListView(ApiView):
+    """
+    Shifts ordered by starting time, filtered by ``ids``, ``geography``,
+    ``facility``, ``date`` (shifts intersecting with that day) and ``open``
+    (shifts not ended yet).
+    """
+
+    fields = {
+        "id": lambda view, shift: shift.pk,
+        "facility": lambda view, shift: shift.facility_id,
+        "task": lambda view, shift: shift.task.name,
+        "task_id": lambda view, shift: shift.task_id,
+        "workplace": lambda view, shift: shift.workplace and shift.workplace.name,
+        "workplace_id": lambda view, shift: shift.workplace_id,
+        "starting_time": lambda view, shift: shift.starting_time,
+        "ending_time": lambda view, shift: shift.ending_time,
+        "slots": lambda view, shift: shift.slots,
+        "volunteer_count": lambda view, shift: shift.volunteer_count,
+        "members_only": lambda view, shift: shift.members_only,
+        "url": shift_url,
+    }
+
+    def get_data(self, request, *args, **kwargs):
+        shifts = Shift.objects.annotate(volunteer_count=Count("helpers"))
+        shifts = shifts.select_related("task", "workplace", "facility")
+
+        node = self.get_geography()
+        if node is not None:
+            shifts = shifts.by_geography(node.model(pk=node.pk))
+        ids = request.GET.get("ids")
+        if ids:
+            try:
+                ids = [int(pk) for pk in ids.split(",")]
+            except ValueError:
+                raise ApiError("ids must be a comma separated list of ids.")
+            if len(ids) > API_MAX_PAGE_SIZE:
+                raise ApiError("At most {} ids allowed.".format(API_MAX_PAGE_SIZE))
+            shifts = shifts.filter(pk__in=ids)
+        facility = request.GET.get("facility")
+        if facility:
+            if not facility.isdigit():
+                raise ApiError("facility must be an id.")
+            shifts = shifts.filter(facility_id=facility)
+        if request.GET.get("date"):
+            try:
+                shifts = shifts.on_shiftdate(date.fromisoformat(request.GET["date"]))
+            except ValueError:
+                raise ApiError("date must be formatted as YYYY-MM-DD.")
+        if self.get_flag("open"):
+            shifts = shifts.open()
+
+        return self.page(shifts, ("starting_time", "pk"), parse_time_cursor)
+
+
+class FacilityListView(ApiView):
+    """
+    Facilities ordered by id, filtered by ``geography`` and ``open`` (facilities
+    with open shifts).
+    """
+
+    fields = {
+        "id": lambda view, facility: facility.pk,
+        "name": lambda view, facility: facility.name,
+        "slug": lambda view, facility: facility.slug,
+        "organization": lambda view, facility: facility.organization.name,
+        "organization_id": lambda view, facility: facility.organization_id,
+        "place": lambda view, facility: "place:{}".format(facility.place_id),
+        "description": lambda view, facility: facility.description_html,
+        "contact_info": lambda view, facility: facility.contact_info_html,
+        "address": lambda view, facility: facility.address,
+        "zip_code": lambda view, facility: facility.zip_code,
+        "latitude": lambda view, facility: facility.latitude,
+        "longitude": lambda view, facility: facility.longitude,
+        "open_shift_count": lambda view, facility: view.open_shift_counts.get(
+            facility.pk, 0
+        ),
+        "url": lambda view, facility: view.absolute_url(facility.get_absolute_url()),
+    }
+
+    def get_data(self, request, *args, **kwargs):
+        if self.get_flag("open"):
+            facilities = Facility.objects.with_open_shifts()
+        else:
+            facilities = Facility.objects.all()
+        facilities = facilities.select_related("organization")
+
+        node = self.get_geography()
+        if node is not None:
+            lookup = FACILITY_GEOGRAPHY_LOOKUPS[node.kind]
+            facilities = facilities.filter(**{lookup: node.pk})
+
+        return self.page(facilities, ("pk",), parse_id_cursor)
+
+    def serialize(self, objects, fields):
+        self.open_shift_counts = {}
+        if "open_shift_count" in fields:
+            self.open_shift_counts = dict(
+                OpenShiftRollup.objects.filter(
+                    level=OpenShiftRollup.Level.FACILITY,
+                    object_id__in=[facility.pk for facility in objects],
+                ).values_list("object_id", "open_shift_count")
+            )
+        return super().serialize(objects, fields)
+
+
+class PlaceListView(ApiView):
+    """
+    All countries, regions, areas and places, parents before their children.
+    The hierarchy is small, so it is not paginated.
+    """
+
+    fields = {
+        "id": lambda view, node: node.key,
+        "kind": lambda view, node: node.kind,
+        "name": lambda view, node: node.name,
+        "slug": lambda view, node: node.slug,
+        "parent": lambda view, node: node.parent and node.parent.key,
+        "url": lambda view, node: view.absolute_url(node.url),
+    }
+
+    def get_data(self, request, *args, **kwargs):
+        hierarchy = get_place_hierarchy()
+        nodes = [node for model in LEVELS for node in hierarchy.nodes[model].values()]
+        return {"results": self.serialize(nodes, self.get_fields()), "next": None}
+
+
+class ChangeListView(ApiView):
+    """
+    Changes of shifts with a sequence number greater than ``since``, see
+    api.changes. The returned ``cursor`` is the ``since`` of the next poll.
+    Without ``since``, there are no results and the cursor is the head of the
+    log, so polling only returns the changes from now on.
+
+    Responds with 410 Gone, if changes after ``since`` were already deleted.
+    The body has the ``cursor`` of the head of the log then. To resync, the
+    client keeps that cursor (or requests one without ``since``), fetches all
+    shifts again from /api/v1/shifts/ and then polls with the cursor. Changes
+    during the refetch are returned again, which is harmless for hints.
+    """
+
+    fields = {
+        "sequence": lambda view, change: change.sequence,
+        "action": lambda view, change: ShiftChange.Action.NAMES[change.action],
+        "shift": lambda view, change: change.shift_id,
+        "facility": lambda view, change: change.facility_id,
+        "changed_at": lambda view, change: change.changed_at,
+    }
+
+    def get_data(self, request, *args, **kwargs):
+        settled = timezone.now() - timedelta(seconds=CHANGE_LOG_SETTLE_TIME)
+        if "since" not in request.GET:
+            return {"results": [], "next": None, "cursor": get_head(settled)}
+        try:
+            since = int(request.GET["since"])
+        except ValueError:
+            raise ApiError("since must be a sequence number.")
+        if since < get_truncated_until():
+            raise ApiError(
+                "Changes since {} are no longer available.".format(since),
+                410,
+                cursor=get_head(settled),
+            )
+
+        changes, next_values = paginate(
+            ShiftChange.objects.filter(changed_at__lte=settled),
+            ("sequence",),
+            [since],
+            self.get_limit(),
+        )
+        cursor = changes[-1].sequence if changes else since
+        next_url = None
+        if next_values is not None:
+            params = request.GET.copy()
+            params["since"] = cursor
+            next_url = request.build_absolute_uri(
+                "{}?{}".format(request.path, params.urlencode())
+            )
+        return {
+            "results": self.serialize(changes, self.get_fields()),
+            "next": next_url,
+            "cursor": cursor,
+        }
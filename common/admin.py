@@ -1,13 +1,17 @@
+import json
 import logging
 
-from django.contrib import messages
+from django.contrib import admin, messages
 from django.core.exceptions import PermissionDenied
-from django.http import HttpResponseRedirect
-from django.urls import reverse
-from django.utils.html import escape
+from django.http import HttpResponse, HttpResponseRedirect
+from django.shortcuts import get_object_or_404
+from django.urls import re_path, reverse
+from django.utils.html import escape, format_html
 from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy as _
 
+from .models import RequestProfile
+
 logger = logging.getLogger(__name__)
 
 
@@ -43,3 +47,89 @@ class RedirectOnAdminPermissionDenied403:
                 + escape(f"{request.method} {request.path}"),
             )
             return HttpResponseRedirect(redirect_path)
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = (
+        "created_at",
+        "method",
+        "path",
+        "view_name",
+        "status_code",
+        "duration_ms",
+        "sql_count",
+        "sql_time_ms",
+        "mode",
+        "user",
+        "get_download_link",
+    )
+    list_filter = ("mode", "view_name", "status_code")
+    search_fields = ("path", "view_name")
+    date_hierarchy = "created_at"
+    exclude = ("data", "top_functions", "call_tree", "sql_timeline")
+    readonly_fields = (
+        "created_at",
+        "user",
+        "mode",
+        "method",
+        "path",
+        "view_name",
+        "status_code",
+        "duration_ms",
+        "sql_count",
+        "sql_time_ms",
+        "get_download_link",
+        "get_top_functions",
+        "get_call_tree",
+        "get_sql_timeline",
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description=_("download"))
+    def get_download_link(self, obj):
+        return format_html(
+            '<a href="{}">{}</a>',
+            reverse("admin:common_requestprofile_download", args=[obj.pk]),
+            obj.download_filename,
+        )
+
+    @admin.display(description=_("top functions"))
+    def get_top_functions(self, obj):
+        return format_html("<pre>{}</pre>", obj.top_functions)
+
+    @admin.display(description=_("call tree"))
+    def get_call_tree(self, obj):
+        return format_html("<pre>{}</pre>", obj.call_tree)
+
+    @admin.display(description=_("SQL timeline"))
+    def get_sql_timeline(self, obj):
+        return format_html("<pre>{}</pre>", json.dumps(obj.sql_timeline, indent=2))
+
+    def download_view(self, request, pk):
+        profile = get_object_or_404(RequestProfile, pk=pk)
+        if not self.has_view_permission(request, profile):
+            raise PermissionDenied
+        response = HttpResponse(
+            bytes(profile.data), content_type="application/octet-stream"
+        )
+        response[
+            "Content-Disposition"
+        ] = f'attachment; filename="{profile.download_filename}"'
+        return response
+
+    def get_urls(self):
+        urls = super(RequestProfileAdmin, self).get_urls()
+        custom_urls = [
+            re_path(
+                r"^(?P<pk>\d+)/download/$",
+                self.admin_site.admin_view(self.download_view),
+                name="common_requestprofile_download",
+            ),
+        ]
+        return custom_urls + urls
@@ -0,0 +1,18 @@
+from django.apps import AppConfig
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+
+
+class CommonConfig(AppConfig):
+    name = "common"
+    verbose_name = _("common")
+
+    def ready(self):
+        # Connect signals
+        from . import brace_format_logging, db_connections, page_cache
+
+        page_cache.connect_signals()
+        db_connections.connect_signals()
+
+        # the handlers of queued handlers, once logging was configured
+        brace_format_logging.start_queue_listeners(settings.LOGGING)
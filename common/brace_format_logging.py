@@ -1,14 +1,62 @@
+import atexit
+import copy
+import json
 import logging
+import logging.config
+import logging.handlers
+import os
+import queue
+from functools import lru_cache
+from string import Formatter
+
+from django.db import connections
+
+
+@lru_cache(maxsize=1024)
+def parse_format(fmt):
+    """
+    Parses a brace format string once and returns its literal text, if it does not
+    contain any replacement fields (and therefore does not need to be formatted at
+    all), otherwise None.
+    """
+    literals = []
+    for literal_text, field_name, _format_spec, _conversion in Formatter().parse(fmt):
+        if field_name is not None:
+            return None
+        literals.append(literal_text)
+    return "".join(literals)
 
 
 class BraceFormatMessage:
-    def __init__(self, fmt, *args, **kwargs):
+    """
+    Lazily formatted log message. Formatting (and merging of the keyword
+    arguments with the extra context) is deferred until a handler actually emits
+    the record and done only once, even if several handlers emit it.
+    """
+
+    def __init__(self, fmt, args=(), kwargs=None, extra=None):
         self.fmt = fmt
         self.args = args
-        self.kwargs = kwargs
+        self.kwargs = kwargs or {}
+        self.extra = extra or {}
+        self._formatted = None
+
+    @property
+    def context(self):
+        """All keyword arguments available for formatting."""
+        context = {"extra": self.extra}
+        context.update(self.extra)
+        context.update(self.kwargs)
+        return context
 
     def __str__(self):
-        return self.fmt.format(*self.args, **self.kwargs)
+        if self._formatted is None:
+            literal = parse_format(self.fmt)
+            if literal is not None:
+                self._formatted = literal
+            else:
+                self._formatted = self.fmt.format(*self.args, **self.context)
+        return self._formatted
 
 
 class BraceFormatLoggerAdapter(logging.LoggerAdapter):
@@ -19,41 +67,207 @@ class BraceFormatLoggerAdapter(logging.LoggerAdapter):
         return msg, kwargs
 
     def log(self, level, msg, /, *args, **kwargs):
+        if not self.isEnabledFor(level):
+            return
+
         exc_info = kwargs.pop("exc_info", None)
         stack_info = kwargs.pop("stack_info", False)
         stacklevel = kwargs.pop("stacklevel", 1)
-        kwargs_extra = kwargs.pop("extra", {})
-
-        extra = {}
-        extra.update(self.extra)
-        extra.update(kwargs_extra)
-
-        message_kwargs = {"extra": extra}
-        message_kwargs.update(extra)
-        message_kwargs.update(kwargs)
-
-        if self.isEnabledFor(level):
-            msg, kwargs = self.process(msg, kwargs)
-            extra = kwargs.get("extra", {})
-            self.logger._log(
-                level=level,
-                msg=BraceFormatMessage(msg, *args, **message_kwargs),
-                args={
-                    # not used for actual formatting, but as additional context
-                    "args": args,
-                    "kwargs": kwargs,
-                },
-                exc_info=exc_info,
-                extra=extra,
-                stack_info=stack_info,
-                stacklevel=stacklevel,
-            )
+        kwargs_extra = kwargs.pop("extra", None)
+
+        if kwargs_extra:
+            extra = dict(self.extra)
+            extra.update(kwargs_extra)
+        else:
+            extra = self.extra
+
+        msg, kwargs = self.process(msg, kwargs)
+        self.logger._log(
+            level=level,
+            msg=BraceFormatMessage(msg, args, kwargs, extra),
+            args={
+                # not used for actual formatting, but as additional context
+                "args": args,
+                "kwargs": kwargs,
+            },
+            exc_info=exc_info,
+            stack_info=stack_info,
+            stacklevel=stacklevel,
+        )
 
 
 def getLogger(name=None, extra=None):
     return BraceFormatLoggerAdapter(logging.getLogger(name=name), extra=extra)
 
 
+class JsonFormatter(logging.Formatter):
+    """
+    Formats records as single line JSON objects. The keyword arguments and extra
+    context passed to a BraceFormatLoggerAdapter are serialized as "context".
+    Values which are not JSON serializable are serialized by their str().
+    """
+
+    def format(self, record):  # noqa: A003
+        data = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "process": record.process,
+            "thread": record.threadName,
+        }
+        if isinstance(record.msg, BraceFormatMessage):
+            data["template"] = record.msg.fmt
+            if record.msg.args:
+                data["args"] = record.msg.args
+            context = record.msg.context
+            context.pop("extra")
+            if context:
+                data["context"] = context
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            data["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(data, default=str)
+
+
+class QueueListenerHandler(logging.Handler):
+    """
+    Enqueues records in the logging thread and lets a background thread format and
+    emit them with the given handlers, so slow handlers (e.g. sending mails) do not
+    block requests.
+
+    ``handlers`` are names of handlers configured in the same dictConfig, e.g.
+
+        "queue": {
+            "class": "common.brace_format_logging.QueueListenerHandler",
+            "handlers": ["mail_admins"],
+        }
+
+    They are created from their configuration by start_queue_listeners(), when
+    the common app is ready, and held by this handler (dictConfig creates
+    instances of them as well, which are not used unless attached to a logger).
+    Records emitted before are kept in the queue.
+
+    The listener thread is (re)started on the first record emitted in a process,
+    which makes it safe to use in forking servers. Records are dropped rather than
+    blocking, if more than ``maxsize`` records are pending.
+
+    In contrast to logging.handlers.QueueHandler, records are enqueued as they are,
+    without formatting them first, which also keeps their structured context.
+    """
+
+    def __init__(self, handlers, maxsize=10000, respect_handler_level=True):
+        super().__init__()
+        self.handler_names = handlers
+        self.handlers = None
+        self.maxsize = maxsize
+        self.respect_handler_level = respect_handler_level
+        self.dropped = 0
+        self.queue = None
+        self._listener = None
+        self._pid = None
+
+    def start(self, handlers):
+        """Starts emitting the queued records with ``handlers``."""
+        self.acquire()
+        try:
+            self.handlers = handlers
+            if self._pid != os.getpid():
+                self._start()
+            elif self._listener is None:
+                self._start_listener()
+        finally:
+            self.release()
+
+    def _start(self):
+        # a listener thread inherited from a parent process is gone, start anew
+        self.queue = queue.Queue(self.maxsize)
+        self._listener = None
+        self._pid = os.getpid()
+        if self.handlers is not None:
+            self._start_listener()
+
+    def _start_listener(self):
+        self._listener = DjangoQueueListener(
+            self.queue,
+            *self.handlers,
+            respect_handler_level=self.respect_handler_level,
+        )
+        self._listener.start()
+        atexit.register(self.close)
+
+    def emit(self, record):
+        try:
+            if self._pid != os.getpid():
+                self.acquire()
+                try:
+                    if self._pid != os.getpid():
+                        self._start()
+                finally:
+                    self.release()
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        listener, self._listener = self._listener, None
+        if listener and self._pid == os.getpid():
+            listener.stop()
+            if self.dropped:
+                logging.getLogger(__name__).warning(
+                    "Dropped %d log records, queue was full.", self.dropped
+                )
+        super().close()
+
+
+def configure_handler(config, name):
+    """
+    Returns a new handler configured like the handler ``name`` of the dictConfig
+    ``config``, with its formatter and filters.
+    """
+    configurator = logging.config.dictConfigClass(copy.deepcopy(config))
+    handler_config = configurator.config["handlers"][name]
+    # configure_handler() expects the formatter and filters configured already
+    if "formatter" in handler_config:
+        formatters = configurator.config["formatters"]
+        formatter = handler_config["formatter"]
+        formatters[formatter] = configurator.configure_formatter(formatters[formatter])
+    filters = configurator.config.get("filters", {})
+    for filter_name in handler_config.get("filters", ()):
+        filters[filter_name] = configurator.configure_filter(filters[filter_name])
+    return configurator.configure_handler(handler_config)
+
+
+def start_queue_listeners(config):
+    """
+    Starts the QueueListenerHandlers of the root logger and the loggers of the
+    dictConfig ``config`` (i.e. settings.LOGGING) with their handlers.
+    """
+    loggers = [logging.getLogger()]
+    loggers.extend(logging.getLogger(name) for name in config.get("loggers", {}))
+    for logger in loggers:
+        for handler in logger.handlers:
+            if isinstance(handler, QueueListenerHandler) and handler.handlers is None:
+                handler.start(
+                    [configure_handler(config, name) for name in handler.handler_names]
+                )
+
+
+class DjangoQueueListener(logging.handlers.QueueListener):
+    def handle(self, record):
+        try:
+            super().handle(record)
+        finally:
+            # Formatting a message may hit the database (e.g. model instances'
+            # __str__), don't leave the connections of this thread open.
+            for connection in connections.all():
+                if connection.connection is not None:
+                    connection.close()
+
+
 if __name__ == "__main__":
     """
     This is for demonstration purpose and to run quick tests.
@@ -0,0 +1,101 @@
+"""
+Version counters in the shared cache, used to invalidate cached data across all
+processes at once.
+
+Cached data is stored together with (or keyed by) the version of its namespace
+at the time it was built. Bumping the version, e.g. whenever one of the models
+it was built from changes, makes every process rebuild it on next access.
+"""
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+KEY_PREFIX = "version"
+
+# namespace -> objects holding process local data of the namespace, which is
+# invalidated by invalidate_local()
+_local = {}
+
+
+def _key(namespace):
+    return "{}:{}".format(KEY_PREFIX, namespace)
+
+
+def _initial_version():
+    # a fresh counter must not collide with versions processes may still hold
+    # after the counter was evicted from the cache
+    return time.time_ns()
+
+
+def get_version(namespace):
+    """Returns the current version of ``namespace``."""
+    return cache.get_or_set(_key(namespace), _initial_version, timeout=None)
+
+
+def bump_version(namespace):
+    """Invalidates everything cached for ``namespace`` in all processes."""
+    key = _key(namespace)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, _initial_version(), timeout=None)
+    invalidate_local(namespace)
+
+
+def bump_version_on_commit(namespace):
+    """
+    Bumps the version of ``namespace`` after the current transaction was
+    committed, so other processes do not rebuild from uncommitted data. Values
+    local to this process are invalidated immediately.
+    """
+    invalidate_local(namespace)
+    transaction.on_commit(lambda: bump_version(namespace))
+
+
+def register_local(namespace, local):
+    """Registers ``local`` to be invalidated when ``namespace`` is bumped."""
+    _local.setdefault(namespace, []).append(local)
+
+
+def invalidate_local(namespace):
+    for local in _local.get(namespace, ()):
+        local.invalidate()
+
+
+class LocalVersionedValue:
+    """
+    Process local value built by ``builder``, which is rebuilt after the version
+    of ``namespace`` was bumped.
+
+    To avoid a roundtrip to the shared cache on every access, the version is
+    only checked once every ``check_interval`` seconds. Bumps in the same
+    process take effect immediately.
+    """
+
+    def __init__(self, namespace, builder, check_interval=5):
+        self.namespace = namespace
+        self.builder = builder
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._value = None
+        self._version = None
+        self._checked_at = None
+        register_local(namespace, self)
+
+    def invalidate(self):
+        self._value = None
+
+    def get(self):
+        value, checked_at = self._value, self._checked_at
+        if value is not None and time.monotonic() - checked_at < self.check_interval:
+            return value
+
+        with self._lock:
+            version = get_version(self.namespace)
+            if self._value is None or version != self._version:
+                self._value = self.builder()
+                self._version = version
+            self._checked_at = time.monotonic()
+            return self._value
@@ -0,0 +1,303 @@
+"""
+Compression of dynamic responses.
+
+CompressionMiddleware compresses text responses larger than
+COMPRESSION_MIN_SIZE bytes with brotli (if the ``brotli`` package is installed
+and the client accepts it) or gzip, including streaming responses.
+
+Responses which contain a CSRF token are only gzipped with a random amount of
+padding in the gzip header, which makes the compressed length useless for
+BREACH style attacks (in addition to the masking of the token by Django).
+
+The original and compressed sizes are counted per view and collected in the
+shared cache, see the ``compression_stats`` management command.
+"""
+import gzip
+import os
+import secrets
+import threading
+import time
+import zlib
+from collections import defaultdict
+from io import BytesIO
+
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+from .settings import (
+    COMPRESSION_BROTLI_QUALITY,
+    COMPRESSION_CONTENT_TYPES,
+    COMPRESSION_GZIP_LEVEL,
+    COMPRESSION_MAX_RANDOM_BYTES,
+    COMPRESSION_MIN_SIZE,
+    COMPRESSION_STATS_FLUSH_INTERVAL,
+)
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATS_KEY_PREFIX = "compression"
+STATS_VIEWS_KEY = "compression:views"
+
+accept_encoding_re = _lazy_re_compile(r"\s*([^\s;,]+)\s*(?:;\s*q=([0-9.]+))?")
+
+
+def accepted_encodings(accept_encoding):
+    """Returns the encodings accepted by the client (with a q-value > 0)."""
+    encodings = set()
+    for part in accept_encoding.split(","):
+        match = accept_encoding_re.match(part)
+        if not match:
+            continue
+        encoding, quality = match.groups()
+        try:
+            if quality is not None and float(quality) <= 0:
+                continue
+        except ValueError:
+            continue
+        encodings.add(encoding.lower())
+    return encodings
+
+
+def choose_encoding(request, pad):
+    encodings = accepted_encodings(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+    # brotli has no header to put padding into
+    if brotli and not pad and "br" in encodings:
+        return "br"
+    if "gzip" in encodings or "*" in encodings:
+        return "gzip"
+    return None
+
+
+def random_filename():
+    length = secrets.randbelow(COMPRESSION_MAX_RANDOM_BYTES + 1)
+    return secrets.token_hex(length)[:length]
+
+
+def gzip_compress(content, pad):
+    buffer = BytesIO()
+    with gzip.GzipFile(
+        filename=random_filename() if pad else "",
+        mode="wb",
+        compresslevel=COMPRESSION_GZIP_LEVEL,
+        fileobj=buffer,
+        mtime=0,
+    ) as f:
+        f.write(content)
+    return buffer.getvalue()
+
+
+def gzip_compress_stream(chunks, pad):
+    buffer = BytesIO()
+    with gzip.GzipFile(
+        filename=random_filename() if pad else "",
+        mode="wb",
+        compresslevel=COMPRESSION_GZIP_LEVEL,
+        fileobj=buffer,
+        mtime=0,
+    ) as f:
+        for chunk in chunks:
+            f.write(chunk)
+            f.flush(zlib.Z_SYNC_FLUSH)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def brotli_compress(content, pad):
+    return brotli.compress(
+        content, mode=brotli.MODE_TEXT, quality=COMPRESSION_BROTLI_QUALITY
+    )
+
+
+def brotli_compress_stream(chunks, pad):
+    compressor = brotli.Compressor(
+        mode=brotli.MODE_TEXT, quality=COMPRESSION_BROTLI_QUALITY
+    )
+    for chunk in chunks:
+        yield compressor.process(chunk) + compressor.flush()
+    yield compressor.finish()
+
+
+COMPRESSORS = {
+    "gzip": (gzip_compress, gzip_compress_stream),
+    "br": (brotli_compress, brotli_compress_stream),
+}
+
+
+class CompressionStats:
+    """
+    Counts original and compressed bytes per view in this process and adds
+    them to counters in the shared cache at most every
+    COMPRESSION_STATS_FLUSH_INTERVAL seconds.
+    """
+
+    FIELDS = ("responses", "original", "compressed")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = defaultdict(lambda: [0, 0, 0])
+        self._flushed_at = time.monotonic()
+        self._pid = os.getpid()
+
+    def add(self, view_name, original, compressed):
+        with self._lock:
+            if self._pid != os.getpid():
+                # counts inherited from a parent process were flushed there
+                self._counts.clear()
+                self._pid = os.getpid()
+            counts = self._counts[view_name]
+            counts[0] += 1
+            counts[1] += original
+            counts[2] += compressed
+            if time.monotonic() - self._flushed_at < COMPRESSION_STATS_FLUSH_INTERVAL:
+                return
+            pending, self._counts = self._counts, defaultdict(lambda: [0, 0, 0])
+            self._flushed_at = time.monotonic()
+        self.flush(pending)
+
+    @classmethod
+    def key(cls, view_name, field):
+        return "{}:{}:{}".format(STATS_KEY_PREFIX, view_name, field)
+
+    @classmethod
+    def flush(cls, pending):
+        views = set(cache.get(STATS_VIEWS_KEY, ()))
+        if not views.issuperset(pending):
+            cache.set(STATS_VIEWS_KEY, sorted(views.union(pending)), None)
+        for view_name, counts in pending.items():
+            for field, value in zip(cls.FIELDS, counts):
+                key = cls.key(view_name, field)
+                if cache.add(key, value, None):
+                    continue
+                try:
+                    cache.incr(key, value)
+                except ValueError:
+                    cache.set(key, value, None)
+
+    @classmethod
+    def collect(cls):
+        """Returns the collected stats by view name."""
+        stats = {}
+        for view_name in cache.get(STATS_VIEWS_KEY, ()):
+            keys = {cls.key(view_name, field): field for field in cls.FIELDS}
+            values = cache.get_many(keys)
+            stats[view_name] = {
+                field: values.get(key, 0) for key, field in keys.items()
+            }
+        return stats
+
+    @classmethod
+    def reset(cls):
+        for view_name in cache.get(STATS_VIEWS_KEY, ()):
+            cache.delete_many([cls.key(view_name, field) for field in cls.FIELDS])
+        cache.delete(STATS_VIEWS_KEY)
+
+
+stats = CompressionStats()
+
+
+def is_compressible(response):
+    if response.has_header("Content-Encoding") or response.status_code == 206:
+        return False
+    content_type = response.get("Content-Type", "").split(";")[0].strip()
+    return content_type.startswith(COMPRESSION_CONTENT_TYPES)
+
+
+def view_name_of(request):
+    resolver_match = getattr(request, "resolver_match", None)
+    return (resolver_match and resolver_match.view_name) or "-"
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses, see module docstring.
+
+    Must be placed before any middleware reading or changing the response body.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        # every response may be compressed, caches need to know that
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        if not is_compressible(response):
+            return response
+        if not response.streaming and len(response.content) < COMPRESSION_MIN_SIZE:
+            return response
+
+        pad = bool(request.META.get("CSRF_COOKIE_USED"))
+        encoding = choose_encoding(request, pad)
+        if not encoding:
+            return response
+        compress, compress_stream = COMPRESSORS[encoding]
+        view_name = view_name_of(request)
+
+        if response.streaming:
+            response.streaming_content = self.measured_stream(
+                compress_stream, response.streaming_content, pad, view_name
+            )
+            # the length is unknown until all content was compressed
+            del response.headers["Content-Length"]
+        else:
+            original_length = len(response.content)
+            compressed = compress(response.content, pad)
+            if len(compressed) >= original_length:
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+            stats.add(view_name, original_length, len(compressed))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            # the compressed representation differs, but is semantically equal
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    @staticmethod
+    def measured_stream(compress_stream, chunks, pad, view_name):
+        sizes = [0, 0]
+
+        def measured(chunks):
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode("utf-8")
+                sizes[0] += len(chunk)
+                yield chunk
+
+        for compressed_chunk in compress_stream(measured(chunks), pad):
+            sizes[1] += len(compressed_chunk)
+            yield compressed_chunk
+        stats.add(view_name, *sizes)
+
+
+def format_stats(collected):
+    """Renders the collected stats as table, largest savings first."""
+    rows = sorted(
+        collected.items(), key=lambda item: item[1]["compressed"] - item[1]["original"]
+    )
+    lines = [
+        "{:<40} {:>9} {:>12} {:>12} {:>7}".format(
+            "view", "responses", "original", "compressed", "saved"
+        )
+    ]
+    for view_name, values in rows:
+        saved = values["original"] - values["compressed"]
+        lines.append(
+            "{:<40} {:>9} {:>12} {:>12} {:>6.1f}%".format(
+                view_name,
+                values["responses"],
+                values["original"],
+                values["compressed"],
+                100.0 * saved / values["original"] if values["original"] else 0,
+            )
+        )
+    return "\n".join(lines)
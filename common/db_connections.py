@@ -0,0 +1,53 @@
+"""
+Health checks of persistent database connections (CONN_MAX_AGE).
+
+Django reuses a connection for CONN_MAX_AGE seconds, but only notices that it
+broke (e.g. the database restarted or a firewall dropped it while the worker
+was idle) when a query fails, i.e. the first request after the breakage
+errors. Connections which were idle for DATABASE_CONN_HEALTH_CHECK_IDLE
+seconds are therefore checked at the start of a request (or Celery task) and
+closed if unusable, so Django reconnects. Busy connections are not checked,
+which would cost a round trip per request.
+
+Connections must not be shared by forked processes: uwsgi loads the
+application in the master and forks its workers afterwards, so the master
+closes its connections right before (see volunteer_planner.wsgi) and workers
+inherit none. Celery drops the connections inherited by its pool processes on
+its own, see celery.fixups.django.
+"""
+import logging
+import time
+
+from django.db import connections
+
+from .settings import DATABASE_CONN_HEALTH_CHECK_IDLE
+
+logger = logging.getLogger(__name__)
+
+
+def check_connections(**kwargs):
+    """Closes unusable connections which have been idle for a while."""
+    now = time.monotonic()
+    for connection in connections.all():
+        if connection.connection is None or connection.in_atomic_block:
+            continue
+        last_used = getattr(connection, "last_used", now)
+        idle = now - last_used
+        if idle >= DATABASE_CONN_HEALTH_CHECK_IDLE and not connection.is_usable():
+            logger.info("Closing unusable connection to %s", connection.alias)
+            connection.close()
+
+
+def touch_connections(**kwargs):
+    """Remembers when the open connections were last used."""
+    now = time.monotonic()
+    for connection in connections.all():
+        if connection.connection is not None:
+            connection.last_used = now
+
+
+def connect_signals():
+    from django.core.signals import request_finished, request_started
+
+    request_started.connect(check_connections, dispatch_uid="db_check_connections")
+    request_finished.connect(touch_connections, dispatch_uid="db_touch_connections")
@@ -0,0 +1,165 @@
+"""
+Reads from database replicas.
+
+Queries of the views listed in DATABASE_REPLICA_VIEWS (by URL name) go to one
+of the DATABASE_REPLICAS, other code can read from them explicitly::
+
+    with replica_reads():
+        ...
+
+All writes go to the primary ("default") database. As replicas lag behind the
+primary, a client which changed something (i.e. sent a POST request) reads
+from the primary for DATABASE_REPLICA_PIN_SECONDS afterwards (remembered by a
+cookie), so it sees its own changes.
+
+Replicas are checked periodically: a replica which cannot be connected to or
+lags more than DATABASE_REPLICA_MAX_LAG seconds behind is not used until the
+next check. Without healthy replicas, everything is read from the primary.
+"""
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+from .settings import (
+    DATABASE_REPLICA_CHECK_INTERVAL,
+    DATABASE_REPLICA_MAX_LAG,
+    DATABASE_REPLICA_PIN_COOKIE,
+    DATABASE_REPLICA_PIN_SECONDS,
+    DATABASE_REPLICA_VIEWS,
+    DATABASE_REPLICAS,
+)
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Seconds since the last replayed transaction was committed on the primary,
+# unless the replica streams from the primary and replayed everything it
+# received. Then it is up to date, even if nothing was written on the primary
+# for a long time. A replica disconnected from the primary may have replayed
+# everything it received long ago, so its lag is the age of the last replayed
+# transaction.
+REPLICATION_LAG_SQL = """
+SELECT CASE
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn()
+        AND EXISTS (
+            SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming'
+        )
+    THEN 0
+    ELSE extract(epoch FROM now() - pg_last_xact_replay_timestamp())
+END
+"""
+
+_state = threading.local()
+# replica alias -> (healthy, checked at)
+_health = {}
+
+
+def check_replica(alias):
+    """Returns if the replica can be connected to and is up to date enough."""
+    connection = connections[alias]
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute(REPLICATION_LAG_SQL)
+                (lag,) = cursor.fetchone()
+                # no replay timestamp: not a replica (or nothing replayed yet)
+                if lag is not None and lag > DATABASE_REPLICA_MAX_LAG:
+                    logger.warning("Replica %s lags %.1f seconds behind", alias, lag)
+                    return False
+            else:
+                cursor.execute("SELECT 1")
+    except DatabaseError:
+        logger.warning("Replica %s is not available", alias, exc_info=True)
+        connection.close()
+        return False
+    return True
+
+
+def is_healthy(alias):
+    healthy, checked_at = _health.get(alias, (None, 0))
+    now = time.monotonic()
+    if healthy is None or now - checked_at > DATABASE_REPLICA_CHECK_INTERVAL:
+        healthy = check_replica(alias)
+        _health[alias] = (healthy, now)
+    return healthy
+
+
+def get_replica():
+    """Returns the alias of a healthy replica chosen at random, or None."""
+    replicas = [alias for alias in DATABASE_REPLICAS if is_healthy(alias)]
+    return random.choice(replicas) if replicas else None
+
+
+@contextmanager
+def replica_reads():
+    """Reads within the block go to a replica, if there is a healthy one."""
+    previous = getattr(_state, "replica", None)
+    _state.replica = get_replica()
+    try:
+        yield _state.replica
+    finally:
+        _state.replica = previous
+
+
+class ReplicaRouter:
+    """Routes reads to the replica chosen by replica_reads(), if any."""
+
+    def db_for_read(self, model, **hints):
+        return getattr(_state, "replica", None)
+
+    def db_for_write(self, model, **hints):
+        # not the instance's database, objects read from a replica are saved
+        # to the primary
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = (DEFAULT_DB_ALIAS,) + tuple(DATABASE_REPLICAS)
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # replicas get the schema of the primary by replication
+        if db in DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaMiddleware:
+    """
+    Reads of the views in DATABASE_REPLICA_VIEWS go to a replica, unless the
+    client is pinned to the primary after changing something.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.replica = None
+        if DATABASE_REPLICAS and request.method not in SAFE_METHODS:
+            response.set_cookie(
+                DATABASE_REPLICA_PIN_COOKIE,
+                "1",
+                max_age=DATABASE_REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (
+            DATABASE_REPLICAS
+            and request.method in SAFE_METHODS
+            and request.resolver_match.view_name in DATABASE_REPLICA_VIEWS
+            and DATABASE_REPLICA_PIN_COOKIE not in request.COOKIES
+        ):
+            _state.replica = get_replica()
+        return None
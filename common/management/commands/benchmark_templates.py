@@ -0,0 +1,103 @@
+import statistics
+from time import perf_counter
+
+from django.core.cache import cache
+from django.core.management import BaseCommand
+from django.template import engines
+from django.template.engine import Engine
+from django.test import RequestFactory
+
+from common.templatetags.fragment_cache import get_fragment_key
+from places.models import Country
+from scheduler.views import GeographicHelpdeskView
+
+HEAVY_TEMPLATES = (
+    "helpdesk_single.html",
+    "helpdesk_range.html",
+    "geographic_helpdesk.html",
+    "shift_details.html",
+    "admin/scheduletemplates/apply_template.html",
+    "admin/scheduletemplates/apply_template_confirm.html",
+)
+
+LOADERS = [
+    "django.template.loaders.filesystem.Loader",
+    "django.template.loaders.app_directories.Loader",
+]
+
+
+def measure(func, repeat):
+    """Returns the median milliseconds of ``repeat`` calls of ``func``."""
+    durations = []
+    for _run in range(repeat):
+        started = perf_counter()
+        func()
+        durations.append((perf_counter() - started) * 1000)
+    return statistics.median(durations)
+
+
+class Command(BaseCommand):
+    help = (  # noqa: A003
+        "Measures loading the heaviest templates with and without the cached "
+        "template loader and rendering the geographic helpdesk with and without "
+        "its cached fragment"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repeat", type=int, default=50, help="Number of runs per measurement"
+        )
+        parser.add_argument(
+            "--country",
+            help="Slug of the country whose helpdesk is rendered, "
+            "defaults to the first country",
+        )
+
+    def handle(self, *args, **options):
+        self.benchmark_loading(options["repeat"])
+        self.benchmark_rendering(options["repeat"], options["country"])
+
+    def benchmark_loading(self, repeat):
+        engine = engines["django"].engine
+        kwargs = {"dirs": engine.dirs, "libraries": engine.libraries}
+        uncached = Engine(loaders=LOADERS, **kwargs)
+        cached = Engine(
+            loaders=[("django.template.loaders.cached.Loader", LOADERS)], **kwargs
+        )
+        self.stdout.write("Loading (median ms):")
+        for template_name in HEAVY_TEMPLATES:
+            cached.get_template(template_name)
+            self.stdout.write(
+                "  {:<55} {:>8.2f} uncached {:>8.3f} cached".format(
+                    template_name,
+                    measure(lambda: uncached.get_template(template_name), repeat),
+                    measure(lambda: cached.get_template(template_name), repeat),
+                )
+            )
+
+    def benchmark_rendering(self, repeat, country_slug):
+        countries = Country.objects.all()
+        if country_slug:
+            countries = countries.filter(slug=country_slug)
+        country = countries.first()
+        if country is None:
+            self.stdout.write("No country to render the geographic helpdesk of.")
+            return
+
+        view = GeographicHelpdeskView.as_view(model=Country)
+        path = country.get_absolute_url()
+        fragment_key = get_fragment_key("geographic_shifts", "page_cache", [path])
+
+        def render():
+            view(RequestFactory().get(path), slug=country.slug).render()
+
+        def render_uncached():
+            cache.delete(fragment_key)
+            render()
+
+        self.stdout.write(
+            "Rendering the helpdesk of {} (median ms): {:.2f} uncached, "
+            "{:.2f} cached fragment".format(
+                country.name, measure(render_uncached, repeat), measure(render, repeat)
+            )
+        )
@@ -1,7 +1,10 @@
-from time import sleep
+import statistics
+from time import perf_counter, sleep
 
 from django.core.management import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
 from django.db import connections
+from django.db.backends.signals import connection_created
 from django.db.utils import OperationalError
 
 
@@ -23,6 +26,14 @@ class Command(BaseCommand):
             default=1,
             help="Seconds to wait after every failed attempt",
         )
+        parser.add_argument(
+            "--benchmark",
+            type=int,
+            default=0,
+            metavar="REQUESTS",
+            help="Measure the latency of simulated requests with and without "
+            "connection reuse (CONN_MAX_AGE)",
+        )
 
     def handle(self, *args, **options):
         if 0 > options["count"]:
@@ -50,3 +61,54 @@ class Command(BaseCommand):
 
         if not success:
             raise CommandError("Database connection check failed")
+
+        if options["benchmark"]:
+            self.benchmark(db_conn, options["benchmark"])
+
+    def benchmark(self, db_conn, requests):
+        connects = []
+
+        def count_connect(sender, connection, **kwargs):
+            if connection.alias == db_conn.alias:
+                connects.append(connection)
+
+        max_age = db_conn.settings_dict["CONN_MAX_AGE"]
+        # compare with Django's default of 0 with five minutes
+        reused_max_age = max_age or 300
+        connection_created.connect(count_connect)
+        try:
+            for title, conn_max_age in (
+                ("without reuse", 0),
+                ("with reuse (CONN_MAX_AGE={})".format(reused_max_age), reused_max_age),
+            ):
+                db_conn.close()
+                db_conn.settings_dict["CONN_MAX_AGE"] = conn_max_age
+                del connects[:]
+                durations = [self.simulate_request(db_conn) for _ in range(requests)]
+                durations.sort()
+                self.stdout.write(
+                    "Requests {}: median {:.2f} ms, 95th percentile {:.2f} ms, "
+                    "{} connection(s) opened".format(
+                        title,
+                        statistics.median(durations),
+                        durations[int(len(durations) * 0.95)],
+                        len(connects),
+                    )
+                )
+        finally:
+            connection_created.disconnect(count_connect)
+            db_conn.settings_dict["CONN_MAX_AGE"] = max_age
+            db_conn.close()
+
+    def simulate_request(self, db_conn):
+        """
+        Returns the milliseconds of a request with a single query, including
+        the connection handling Django does at the start and end of requests.
+        """
+        start = perf_counter()
+        request_started.send(sender=self.__class__)
+        with db_conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+        request_finished.send(sender=self.__class__)
+        return (perf_counter() - start) * 1000
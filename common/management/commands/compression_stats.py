@@ -0,0 +1,23 @@
+from django.core.management import BaseCommand
+
+from common.compression import CompressionStats, format_stats
+
+
+class Command(BaseCommand):
+    help = "Shows the bytes saved by response compression per view."  # noqa: A003
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Reset the statistics after showing them",
+        )
+
+    def handle(self, *args, **options):
+        collected = CompressionStats.collect()
+        if not collected:
+            self.stdout.write("No compressed responses recorded yet.")
+        else:
+            self.stdout.write(format_stats(collected))
+        if options["reset"]:
+            CompressionStats.reset()
@@ -0,0 +1,39 @@
+from django.core.management import BaseCommand
+
+from common.tiered_cache import TieredCacheStats
+
+
+class Command(BaseCommand):
+    help = "Shows the hits of the two tier caches per namespace."  # noqa: A003
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Reset the statistics after showing them",
+        )
+
+    def handle(self, *args, **options):
+        collected = TieredCacheStats.collect()
+        if not collected:
+            self.stdout.write("No cache accesses recorded yet.")
+        else:
+            self.stdout.write(
+                "{:<30} {:>12} {:>12} {:>12} {:>9}".format(
+                    "namespace", "local hits", "shared hits", "misses", "hit rate"
+                )
+            )
+            for namespace, values in sorted(collected.items()):
+                total = sum(values.values())
+                hits = values["local_hits"] + values["shared_hits"]
+                self.stdout.write(
+                    "{:<30} {:>12} {:>12} {:>12} {:>8.1f}%".format(
+                        namespace,
+                        values["local_hits"],
+                        values["shared_hits"],
+                        values["misses"],
+                        100.0 * hits / total if total else 0,
+                    )
+                )
+        if options["reset"]:
+            TieredCacheStats.reset()
@@ -0,0 +1,81 @@
+# Generated by Django 4.0.4 on 2026-10-19 12:58
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RequestProfile",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="created"),
+                ),
+                (
+                    "mode",
+                    models.CharField(
+                        choices=[("cprofile", "deterministic"), ("sample", "sampled")],
+                        max_length=10,
+                        verbose_name="mode",
+                    ),
+                ),
+                ("method", models.CharField(max_length=10, verbose_name="method")),
+                ("path", models.TextField(verbose_name="path")),
+                (
+                    "view_name",
+                    models.CharField(blank=True, max_length=256, verbose_name="view"),
+                ),
+                (
+                    "status_code",
+                    models.PositiveSmallIntegerField(verbose_name="status code"),
+                ),
+                ("duration_ms", models.FloatField(verbose_name="duration (ms)")),
+                ("sql_count", models.PositiveIntegerField(verbose_name="SQL queries")),
+                ("sql_time_ms", models.FloatField(verbose_name="SQL time (ms)")),
+                (
+                    "top_functions",
+                    models.TextField(blank=True, verbose_name="top functions"),
+                ),
+                ("call_tree", models.TextField(blank=True, verbose_name="call tree")),
+                (
+                    "sql_timeline",
+                    models.JSONField(default=list, verbose_name="SQL timeline"),
+                ),
+                ("data", models.BinaryField(verbose_name="raw profile data")),
+                (
+                    "user",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="user",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "request profile",
+                "verbose_name_plural": "request profiles",
+                "ordering": ("-created_at",),
+            },
+        ),
+    ]
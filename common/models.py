@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class RequestProfile(models.Model):
+    """
+    A stored profile of a single request, triggered on demand by a staff user.
+
+    Deterministic profiles (cProfile) keep the raw pstats data, which can be
+    downloaded from the admin and opened with any pstats compatible tool (e.g.
+    snakeviz). Sampled profiles keep the sampled stacks in collapsed format,
+    ready to be fed into flame graph tools.
+    """
+
+    class Mode:
+        DETERMINISTIC, SAMPLED = "cprofile", "sample"
+        CHOICES = (
+            (DETERMINISTIC, _("deterministic")),
+            (SAMPLED, _("sampled")),
+        )
+
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("created"))
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        models.SET_NULL,
+        null=True,
+        related_name="+",
+        verbose_name=_("user"),
+    )
+
+    mode = models.CharField(max_length=10, choices=Mode.CHOICES, verbose_name=_("mode"))
+
+    method = models.CharField(max_length=10, verbose_name=_("method"))
+    path = models.TextField(verbose_name=_("path"))
+    view_name = models.CharField(max_length=256, blank=True, verbose_name=_("view"))
+    status_code = models.PositiveSmallIntegerField(verbose_name=_("status code"))
+
+    duration_ms = models.FloatField(verbose_name=_("duration (ms)"))
+    sql_count = models.PositiveIntegerField(verbose_name=_("SQL queries"))
+    sql_time_ms = models.FloatField(verbose_name=_("SQL time (ms)"))
+
+    top_functions = models.TextField(blank=True, verbose_name=_("top functions"))
+    call_tree = models.TextField(blank=True, verbose_name=_("call tree"))
+    sql_timeline = models.JSONField(default=list, verbose_name=_("SQL timeline"))
+
+    data = models.BinaryField(verbose_name=_("raw profile data"))
+
+    class Meta:
+        verbose_name = _("request profile")
+        verbose_name_plural = _("request profiles")
+        ordering = ("-created_at",)
+
+    def __unicode__(self):
+        return "{} {} ({:.0f} ms)".format(self.method, self.path, self.duration_ms)
+
+    def __str__(self):
+        return self.__unicode__()
+
+    @property
+    def download_filename(self):
+        extension = "prof" if self.mode == self.Mode.DETERMINISTIC else "folded"
+        return "request-profile-{}.{}".format(self.pk, extension)
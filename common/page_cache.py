@@ -0,0 +1,149 @@
+"""
+Full page cache for anonymous visitors.
+
+Pages wrapped with ``cache_anonymous_page`` are rendered once per path and
+language and served from the cache to every visitor without a session (and
+without pending messages), for at most PAGE_CACHE_TIMEOUT seconds. Changes of
+the models in PAGE_CACHE_INVALIDATING_MODELS invalidate all cached pages.
+
+CSRF tokens are personal, so pages are cached with a placeholder instead of the
+token, which is replaced by the visitor's own token when serving the page.
+Pages without a token are marked as publicly cacheable for PAGE_CACHE_MAX_AGE
+seconds, so a reverse proxy may cache them as well.
+"""
+import hashlib
+from functools import wraps
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.translation import get_language
+
+from .cache_versions import bump_version_on_commit, get_version
+from .settings import (
+    PAGE_CACHE_ENABLED,
+    PAGE_CACHE_INVALIDATING_MODELS,
+    PAGE_CACHE_MAX_AGE,
+    PAGE_CACHE_TIMEOUT,
+)
+
+CACHE_NAMESPACE = "page_cache"
+CSRF_TOKEN_PLACEHOLDER = "__page_cache_csrf_token__"
+PLACEHOLDER_BYTES = CSRF_TOKEN_PLACEHOLDER.encode("ascii")
+CACHED_HEADERS = ("Content-Type", "Content-Language")
+
+
+def is_cacheable_request(request):
+    if not PAGE_CACHE_ENABLED or request.method not in ("GET", "HEAD"):
+        return False
+    # visitors with a session may be logged in or have session bound data
+    if settings.SESSION_COOKIE_NAME in request.COOKIES:
+        return False
+    # pending messages would be rendered into the page
+    if getattr(settings, "MESSAGES_COOKIE_NAME", "messages") in request.COOKIES:
+        return False
+    return True
+
+
+def get_cache_key(request):
+    url = hashlib.md5(request.build_absolute_uri().encode("utf-8")).hexdigest()
+    return "page:{}:{}:{}".format(get_version(CACHE_NAMESPACE), get_language(), url)
+
+
+def csrf_token_placeholder(request):
+    """
+    Context processor rendering the placeholder instead of the CSRF token, while
+    a page to be cached is rendered.
+    """
+    if getattr(request, "render_csrf_token_placeholder", False):
+        return {"csrf_token": CSRF_TOKEN_PLACEHOLDER}
+    return {}
+
+
+def replace_csrf_token_placeholder(request, content):
+    if PLACEHOLDER_BYTES not in content:
+        return content
+    return content.replace(PLACEHOLDER_BYTES, get_token(request).encode("ascii"))
+
+
+def serve(request, cached):
+    content, status, headers = cached
+    response = HttpResponse(content, status=status)
+    for header, value in headers.items():
+        response[header] = value
+
+    if PLACEHOLDER_BYTES in content:
+        response.content = replace_csrf_token_placeholder(request, content)
+        patch_cache_control(response, private=True)
+    else:
+        patch_cache_control(response, public=True, max_age=PAGE_CACHE_MAX_AGE)
+    # pages differ per language and are served to anonymous visitors only
+    patch_vary_headers(response, ("Accept-Language", "Cookie"))
+    return response
+
+
+def cache_anonymous_page(view_func):
+    """
+    View decorator caching the whole response for anonymous visitors, see module
+    docstring.
+    """
+
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        if not is_cacheable_request(request):
+            return view_func(request, *args, **kwargs)
+
+        key = get_cache_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            response = serve(request, cached)
+            response["X-Page-Cache"] = "hit"
+            return response
+
+        request.render_csrf_token_placeholder = True
+        try:
+            response = view_func(request, *args, **kwargs)
+            if hasattr(response, "render") and callable(response.render):
+                response.render()
+        finally:
+            request.render_csrf_token_placeholder = False
+
+        if (
+            response.status_code != 200
+            or response.streaming
+            or response.cookies
+            or response.has_header("Cache-Control")
+        ):
+            if not response.streaming:
+                response.content = replace_csrf_token_placeholder(
+                    request, response.content
+                )
+            return response
+
+        headers = {h: response[h] for h in CACHED_HEADERS if response.has_header(h)}
+        cached = (response.content, response.status_code, headers)
+        cache.set(key, cached, PAGE_CACHE_TIMEOUT)
+        response = serve(request, cached)
+        response["X-Page-Cache"] = "miss"
+        return response
+
+    return _wrapped_view
+
+
+def invalidate_page_cache(sender, **kwargs):
+    bump_version_on_commit(CACHE_NAMESPACE)
+
+
+def connect_signals():
+    for model_label in PAGE_CACHE_INVALIDATING_MODELS:
+        model = apps.get_model(model_label)
+        post_save.connect(
+            invalidate_page_cache, sender=model, dispatch_uid="page_cache"
+        )
+        post_delete.connect(
+            invalidate_page_cache, sender=model, dispatch_uid="page_cache"
+        )
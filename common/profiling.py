@@ -0,0 +1,321 @@
+"""
+On-demand profiling of single requests.
+
+Staff users can profile any request by adding the query parameter ``_profile``
+to its URL or by sending the ``X-Profile`` header:
+
+- ``?_profile`` or ``?_profile=cprofile`` runs a deterministic profile (cProfile)
+- ``?_profile=sample`` samples the request thread's stack periodically, which
+  has way less overhead and distorts timings less
+
+Every profiled request is stored as a ``common.models.RequestProfile`` including
+the top functions, a call tree and a timeline of all SQL queries. Profiles can be
+inspected and downloaded in the admin. The response carries the id of the stored
+profile in the ``X-Profile-Id`` header.
+"""
+import cProfile
+import logging
+import marshal
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+from io import StringIO
+
+from django.db import connections
+
+from .settings import (
+    REQUEST_PROFILING_ENABLED,
+    REQUEST_PROFILING_HEADER,
+    REQUEST_PROFILING_PARAMETER,
+    REQUEST_PROFILING_SAMPLE_INTERVAL,
+)
+
+logger = logging.getLogger(__name__)
+
+MAX_SQL_LENGTH = 2000
+TOP_FUNCTIONS_LIMIT = 40
+CALL_TREE_MAX_DEPTH = 40
+# call tree nodes below this fraction of the total are not shown
+CALL_TREE_THRESHOLD = 0.005
+
+
+class SqlTimeline:
+    """
+    Database execute wrapper recording every query with its offset relative to
+    the start of the request.
+    """
+
+    def __init__(self, started):
+        self.started = started
+        self.entries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            end = time.perf_counter()
+            self.entries.append(
+                {
+                    "alias": context["connection"].alias,
+                    "start_ms": round((start - self.started) * 1000, 3),
+                    "duration_ms": round((end - start) * 1000, 3),
+                    "sql": sql[:MAX_SQL_LENGTH],
+                    "many": many,
+                }
+            )
+
+    @property
+    def total_ms(self):
+        return sum(entry["duration_ms"] for entry in self.entries)
+
+
+class StackSampler:
+    """
+    Minimal sampling profiler: a background thread periodically captures the
+    stack of the profiled thread and counts identical stacks.
+    """
+
+    def __init__(self, thread_id, interval=REQUEST_PROFILING_SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="request-profiler", daemon=True
+        )
+
+    def enable(self):
+        self._thread.start()
+
+    def disable(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(function_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.samples[tuple(reversed(stack))] += 1
+
+    def dump(self):
+        """Samples in collapsed stack format, as used by flame graph tools."""
+        lines = (
+            "{} {}".format(";".join(stack), count)
+            for stack, count in self.samples.most_common()
+        )
+        return "\n".join(lines).encode("utf-8")
+
+    def top_functions(self, limit=TOP_FUNCTIONS_LIMIT):
+        total = sum(self.samples.values()) or 1
+        own, inclusive = Counter(), Counter()
+        for stack, count in self.samples.items():
+            own[stack[-1]] += count
+            for label in set(stack):
+                inclusive[label] += count
+
+        lines = ["{:>8} {:>8}  function".format("own %", "total %")]
+        for label, count in own.most_common(limit):
+            lines.append(
+                "{:>8.1f} {:>8.1f}  {}".format(
+                    100.0 * count / total, 100.0 * inclusive[label] / total, label
+                )
+            )
+        return "\n".join(lines)
+
+    def call_tree(self):
+        root = {}
+        for stack, count in self.samples.items():
+            children = root
+            for label in stack:
+                node = children.setdefault(label, [0, {}])
+                node[0] += count
+                children = node[1]
+
+        def children_of(node):
+            return sorted(
+                ((label, child[0], child[1]) for label, child in node.items()),
+                key=lambda item: -item[1],
+            )
+
+        return format_tree(
+            children_of(root),
+            children_of,
+            total=sum(self.samples.values()),
+            unit="samples",
+        )
+
+
+class DeterministicProfiler(cProfile.Profile):
+    """cProfile with the same reporting interface as the StackSampler."""
+
+    def disable(self):
+        super().disable()
+        self.snapshot_stats()
+
+    def dump(self):
+        return marshal.dumps(self.stats)
+
+    def top_functions(self, limit=TOP_FUNCTIONS_LIMIT):
+        stream = StringIO()
+        stats = pstats.Stats(self, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+        return stream.getvalue().strip()
+
+    def call_tree(self):
+        callees = {}
+        roots = []
+        for func, (_cc, _nc, _tt, ct, callers) in self.stats.items():
+            if not callers:
+                roots.append((func, ct))
+            for caller, caller_stats in callers.items():
+                callees.setdefault(caller, []).append((func, caller_stats[3]))
+
+        def children_of(func):
+            return sorted(
+                (
+                    (pstats.func_std_string(callee), time_spent, callee)
+                    for callee, time_spent in callees.get(func, ())
+                ),
+                key=lambda item: -item[1],
+            )
+
+        root_nodes = sorted(
+            ((pstats.func_std_string(func), ct, func) for func, ct in roots),
+            key=lambda item: -item[1],
+        )
+        total = sum(item[1] for item in root_nodes)
+        return format_tree(root_nodes, children_of, total=total, unit="s")
+
+
+def function_label(code):
+    return "{}:{}({})".format(code.co_filename, code.co_firstlineno, code.co_name)
+
+
+def format_tree(nodes, children_of, total, unit):
+    """
+    Renders an indented tree of (label, value, node) tuples. ``children_of``
+    returns the children tuples of ``node``. Nodes below CALL_TREE_THRESHOLD of
+    ``total`` are skipped, recursion is cut at CALL_TREE_MAX_DEPTH.
+    """
+    lines = []
+    threshold = total * CALL_TREE_THRESHOLD
+
+    def walk(items, depth, path):
+        for label, value, node in items:
+            if value < threshold or depth > CALL_TREE_MAX_DEPTH:
+                continue
+            share = 100.0 * value / total if total else 0.0
+            lines.append(
+                "{:>6.1f}% {:>10.4g} {}  {}{}".format(
+                    share, value, unit, "  " * depth, label
+                )
+            )
+            if label not in path:
+                walk(children_of(node), depth + 1, path | {label})
+
+    walk(nodes, 0, frozenset())
+    return "\n".join(lines)
+
+
+def get_requested_profiling_mode(request):
+    """
+    Returns the requested profiling mode, if profiling was requested by a staff
+    user, otherwise None.
+    """
+    from .models import RequestProfile
+
+    if not REQUEST_PROFILING_ENABLED:
+        return None
+
+    if REQUEST_PROFILING_PARAMETER in request.GET:
+        value = request.GET[REQUEST_PROFILING_PARAMETER]
+    elif REQUEST_PROFILING_HEADER in request.META:
+        value = request.META[REQUEST_PROFILING_HEADER]
+    else:
+        return None
+
+    user = getattr(request, "user", None)
+    if not (user and user.is_authenticated and user.is_staff):
+        return None
+
+    if value == RequestProfile.Mode.SAMPLED:
+        return RequestProfile.Mode.SAMPLED
+    return RequestProfile.Mode.DETERMINISTIC
+
+
+class RequestProfilingMiddleware:
+    """
+    Profiles requests of staff users on demand, see module docstring.
+
+    Must be placed after AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = get_requested_profiling_mode(request)
+        if not mode:
+            return self.get_response(request)
+        return self.profile(request, mode)
+
+    def profile(self, request, mode):
+        from .models import RequestProfile
+
+        if mode == RequestProfile.Mode.SAMPLED:
+            profiler = StackSampler(threading.get_ident())
+        else:
+            profiler = DeterministicProfiler()
+
+        started = time.perf_counter()
+        timeline = SqlTimeline(started)
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(timeline))
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        resolver_match = getattr(request, "resolver_match", None)
+        try:
+            profile = RequestProfile.objects.create(
+                user=request.user,
+                mode=mode,
+                method=request.method,
+                path=request.get_full_path(),
+                view_name=resolver_match.view_name if resolver_match else "",
+                status_code=response.status_code,
+                duration_ms=duration_ms,
+                sql_count=len(timeline.entries),
+                sql_time_ms=timeline.total_ms,
+                top_functions=profiler.top_functions(),
+                call_tree=profiler.call_tree(),
+                sql_timeline=timeline.entries,
+                data=profiler.dump(),
+            )
+        except Exception:
+            logger.exception("Could not store profile of %s", request.path)
+            return response
+
+        logger.info(
+            "Stored %s profile %s of %s %s (%.0f ms, %d queries)",
+            mode,
+            profile.pk,
+            request.method,
+            request.path,
+            duration_ms,
+            len(timeline.entries),
+        )
+        response["X-Profile-Id"] = str(profile.pk)
+        return response
@@ -0,0 +1,179 @@
+"""
+Token bucket rate limits, stored in Redis.
+
+Views are limited declaratively by wrapping them with ``ratelimit(scope)``,
+the limits of each scope are configured in RATELIMITS, e.g.::
+
+    RATELIMITS = {"join_leave": {"rate": "30/m", "burst": 10}}
+
+allows bursts of 10 requests, refilled with 30 requests per minute.
+
+Every request consumes a token from the bucket of its client IP address, with
+RATELIMIT_IP_MULTIPLIER times the limits, as many clients may share an address
+behind NATs and proxies. The address is REMOTE_ADDR as set by the WSGI server;
+behind a reverse proxy, the proxy must pass on the client's address (e.g.
+nginx' ``uwsgi_param REMOTE_ADDR $remote_addr``). X-Forwarded-For is not used,
+clients can forge it. Only if the address' bucket has a token left, the
+session's user is looked up and requests of users also consume a token from a
+bucket per user. Buckets are checked and updated atomically by a Lua script in
+a single round trip each.
+
+The checks happen before the wrapped view, requests rejected by the address'
+bucket do no database work at all. If Redis is unavailable, requests are let
+through.
+"""
+import logging
+import math
+from functools import wraps
+
+import redis
+from django.http import HttpResponse
+from django.utils.translation import gettext as _
+
+from .redis_client import get_redis
+from .settings import RATELIMIT_ENABLED, RATELIMIT_IP_MULTIPLIER, RATELIMITS
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+
+# KEYS: buckets, ARGV: capacity, tokens per second
+# returns 1 if a token was taken from every bucket, otherwise 0 and the seconds
+# until a token is available in all buckets (as string, Lua numbers returned to
+# Redis are truncated to integers)
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local time = redis.call("TIME")
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local ttl = math.ceil(capacity / rate) + 1
+
+local tokens = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local bucket = redis.call("HMGET", key, "tokens", "updated")
+    local available = tonumber(bucket[1]) or capacity
+    local updated = tonumber(bucket[2]) or now
+    available = math.min(capacity, available + math.max(0, now - updated) * rate)
+    tokens[i] = available
+    if available < 1 then
+        wait = math.max(wait, (1 - available) / rate)
+    end
+end
+
+local allowed = 0
+if wait == 0 then
+    allowed = 1
+end
+for i, key in ipairs(KEYS) do
+    redis.call("HSET", key, "tokens", tokens[i] - allowed, "updated", now)
+    redis.call("EXPIRE", key, ttl)
+end
+return {allowed, tostring(wait)}
+"""
+
+_scripts = {}
+
+
+def parse_rate(rate):
+    """Returns tokens per second for a rate like ``"30/m"``."""
+    count, _sep, period = rate.partition("/")
+    return int(count) / PERIODS[period]
+
+
+def get_script():
+    client = get_redis()
+    # scripts are bound to the client, which is recreated in forked processes
+    script = _scripts.get(id(client))
+    if script is None:
+        _scripts.clear()
+        script = _scripts[id(client)] = client.register_script(TOKEN_BUCKET_SCRIPT)
+    return script
+
+
+def get_ip_bucket(scope, request):
+    """
+    Returns the key of the bucket of the request's client address and the
+    multiplier of its limits, see module docstring.
+    """
+    key = "ratelimit:{}:ip:{}".format(scope, request.META.get("REMOTE_ADDR", ""))
+    return key, RATELIMIT_IP_MULTIPLIER
+
+
+def get_user_bucket(scope, request):
+    """
+    Returns the key of the bucket of the request's user and the multiplier of
+    its limits, or None for anonymous requests. Looks up the session's user.
+    """
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return "ratelimit:{}:user:{}".format(scope, user.pk), 1
+    return None
+
+
+def take_token(scope, bucket):
+    """
+    Takes a token from ``bucket`` (a key and the multiplier of the limits of
+    ``scope``) and returns 0, or the seconds to wait if the bucket is empty.
+    """
+    limit = RATELIMITS[scope]
+    key, multiplier = bucket
+    allowed, wait = get_script()(
+        keys=[key],
+        args=[limit["burst"] * multiplier, parse_rate(limit["rate"]) * multiplier],
+    )
+    return 0 if int(allowed) else float(wait)
+
+
+def consume(scope, request):
+    """
+    Takes a token for the request from the buckets of ``scope`` and returns
+    0, or the seconds to wait if a bucket is empty.
+    """
+    try:
+        # the address' bucket first, rejecting floods without database work
+        wait = take_token(scope, get_ip_bucket(scope, request))
+        if wait:
+            return wait
+        user_bucket = get_user_bucket(scope, request)
+        if user_bucket is None:
+            return 0
+        return take_token(scope, user_bucket)
+    except redis.RedisError:
+        logger.warning("Rate limit of %s not checked", scope, exc_info=True)
+        return 0
+
+
+def too_many_requests(wait):
+    seconds = max(1, math.ceil(wait))
+    response = HttpResponse(
+        _("Too many requests. Please try again in {seconds} seconds.").format(
+            seconds=seconds
+        ),
+        status=429,
+        content_type="text/plain; charset=utf-8",
+    )
+    response["Retry-After"] = str(seconds)
+    return response
+
+
+def ratelimit(scope, methods=("POST",)):
+    """
+    View decorator limiting requests with one of ``methods`` by the limits of
+    ``scope``, see module docstring.
+    """
+    if scope not in RATELIMITS:
+        raise KeyError("No rate limit configured for {}".format(scope))
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if RATELIMIT_ENABLED and request.method in methods:
+                wait = consume(scope, request)
+                if wait:
+                    return too_many_requests(wait)
+            return view_func(request, *args, **kwargs)
+
+        return _wrapped_view
+
+    return decorator
@@ -0,0 +1,21 @@
+"""
+Shared Redis connection (pool) of the process, for features needing more than
+the cache, e.g. pub/sub or atomic scripts.
+"""
+import os
+
+import redis
+
+from .settings import REDIS_URL
+
+_client = None
+_client_pid = None
+
+
+def get_redis():
+    global _client, _client_pid
+    # connections must not be shared with forked worker processes
+    if _client is None or _client_pid != os.getpid():
+        _client = redis.Redis.from_url(REDIS_URL, socket_timeout=5)
+        _client_pid = os.getpid()
+    return _client
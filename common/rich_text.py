@@ -0,0 +1,165 @@
+"""
+Rich text edited with CKEditor, sanitized once when saved.
+
+RichTextField is a TextField keeping the HTML as edited. When it is saved, a
+copy cleaned by bleach is stored in its ``html_field``: only the markup
+CKEditor produces for formatting, links, images and tables is kept, anything
+else (scripts, event handler attributes, ``javascript:`` URLs, ...) is removed.
+Templates output that copy as is (``|safe``), without processing it on every
+request. The source stays editable as it was, e.g. when the allowed markup is
+extended, the copies can be sanitized again from it.
+
+With ``excerpt_field``, a plain text excerpt of at most EXCERPT_LENGTH
+characters is stored in that field of the model as well, e.g. for admin
+change lists.
+
+Models with RichTextFields inherit from RichTextMixin, which saves the copies
+along with the source, also if saved with ``update_fields``.
+"""
+import html
+import re
+
+import bleach
+from django.db import models
+from django.utils.text import Truncator
+
+EXCERPT_LENGTH = 300
+
+ALLOWED_TAGS = [
+    "a",
+    "abbr",
+    "b",
+    "blockquote",
+    "br",
+    "caption",
+    "code",
+    "div",
+    "em",
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+    "hr",
+    "i",
+    "img",
+    "li",
+    "ol",
+    "p",
+    "pre",
+    "s",
+    "span",
+    "strike",
+    "strong",
+    "sub",
+    "sup",
+    "table",
+    "tbody",
+    "td",
+    "tfoot",
+    "th",
+    "thead",
+    "tr",
+    "u",
+    "ul",
+]
+ALLOWED_ATTRIBUTES = {
+    "*": ["style", "title"],
+    "a": ["href", "name", "target", "rel"],
+    "img": ["src", "alt", "width", "height"],
+    "table": ["border", "cellpadding", "cellspacing"],
+    "td": ["colspan", "rowspan"],
+    "th": ["colspan", "rowspan", "scope"],
+}
+ALLOWED_STYLES = [
+    "background-color",
+    "color",
+    "font-family",
+    "font-size",
+    "font-style",
+    "font-weight",
+    "height",
+    "margin-left",
+    "text-align",
+    "text-decoration",
+    "width",
+]
+ALLOWED_PROTOCOLS = ["http", "https", "mailto", "tel"]
+
+# elements removed with their content, bleach would keep it as text
+UNSAFE_ELEMENTS = re.compile(r"<(script|style)\b.*?</\1\s*>", re.I | re.S)
+# ends of elements which separate words in the excerpt
+BLOCK_END = re.compile(
+    r"<(?:br|hr|/p|/div|/li|/h\d|/td|/th|/tr|/blockquote)\b[^>]*>", re.I
+)
+WHITESPACE = re.compile(r"\s+")
+
+
+def sanitize(value):
+    """Returns the HTML ``value`` without disallowed markup."""
+    if not value:
+        return value
+    return bleach.clean(
+        UNSAFE_ELEMENTS.sub("", value),
+        tags=ALLOWED_TAGS,
+        attributes=ALLOWED_ATTRIBUTES,
+        styles=ALLOWED_STYLES,
+        protocols=ALLOWED_PROTOCOLS,
+        strip=True,
+    )
+
+
+def excerpt(value, length=EXCERPT_LENGTH):
+    """Returns the text of the HTML ``value``, shortened to ``length``."""
+    if not value:
+        return ""
+    text = UNSAFE_ELEMENTS.sub("", BLOCK_END.sub(" ", value))
+    text = bleach.clean(text, tags=[], strip=True)
+    text = WHITESPACE.sub(" ", html.unescape(text)).strip()
+    return Truncator(text).chars(length)
+
+
+class RichTextField(models.TextField):
+    """TextField of HTML, sanitized into another field when saved."""
+
+    def __init__(self, *args, html_field, excerpt_field=None, **kwargs):
+        self.html_field = html_field
+        self.excerpt_field = excerpt_field
+        super().__init__(*args, **kwargs)
+
+    @property
+    def derived_fields(self):
+        return [name for name in (self.html_field, self.excerpt_field) if name]
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs["html_field"] = self.html_field
+        if self.excerpt_field:
+            kwargs["excerpt_field"] = self.excerpt_field
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value = super().pre_save(model_instance, add)
+        html = sanitize(value)
+        setattr(model_instance, self.html_field, html)
+        if self.excerpt_field:
+            setattr(model_instance, self.excerpt_field, excerpt(html))
+        return value
+
+
+class RichTextMixin:
+    """
+    Model mixin adding the fields derived from RichTextFields to the
+    ``update_fields`` of save(), the values are set by the fields' pre_save().
+    """
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            for field in self._meta.concrete_fields:
+                if isinstance(field, RichTextField) and field.name in update_fields:
+                    update_fields.update(field.derived_fields)
+            kwargs["update_fields"] = update_fields
+        super().save(*args, **kwargs)
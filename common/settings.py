@@ -0,0 +1,181 @@
+from django.conf import settings
+
+# on-demand request profiling for staff users, see common.profiling
+REQUEST_PROFILING_ENABLED = getattr(settings, "REQUEST_PROFILING_ENABLED", True)
+REQUEST_PROFILING_PARAMETER = getattr(
+    settings, "REQUEST_PROFILING_PARAMETER", "_profile"
+)
+REQUEST_PROFILING_HEADER = getattr(
+    settings, "REQUEST_PROFILING_HEADER", "HTTP_X_PROFILE"
+)
+# seconds between two stack samples in sampling mode
+REQUEST_PROFILING_SAMPLE_INTERVAL = getattr(
+    settings, "REQUEST_PROFILING_SAMPLE_INTERVAL", 0.002
+)
+
+# full page cache for anonymous visitors, see common.page_cache
+PAGE_CACHE_ENABLED = getattr(settings, "PAGE_CACHE_ENABLED", True)
+# seconds pages are cached at most, changes of the invalidating models
+# invalidate them earlier
+PAGE_CACHE_TIMEOUT = getattr(settings, "PAGE_CACHE_TIMEOUT", 5 * 60)
+# seconds pages without CSRF token may be cached by browsers and proxies
+PAGE_CACHE_MAX_AGE = getattr(settings, "PAGE_CACHE_MAX_AGE", 60)
+PAGE_CACHE_INVALIDATING_MODELS = getattr(
+    settings,
+    "PAGE_CACHE_INVALIDATING_MODELS",
+    (
+        "organizations.Organization",
+        "organizations.Facility",
+        "news.NewsEntry",
+        "scheduler.Shift",
+        "places.Country",
+        "places.Region",
+        "places.Area",
+        "places.Place",
+    ),
+)
+
+# post-processing of static files, see common.static_file_compressor
+# number of worker processes, defaults to the number of CPUs
+STATICFILES_POSTPROCESS_WORKERS = getattr(
+    settings, "STATICFILES_POSTPROCESS_WORKERS", None
+)
+# directory keeping processed files to skip unchanged files, None disables it
+STATICFILES_POSTPROCESS_CACHE_DIR = getattr(
+    settings, "STATICFILES_POSTPROCESS_CACHE_DIR", None
+)
+STATICFILES_POSTPROCESS_REPORT = getattr(
+    settings, "STATICFILES_POSTPROCESS_REPORT", True
+)
+STATICFILES_GZIP_LEVEL = getattr(settings, "STATICFILES_GZIP_LEVEL", 9)
+STATICFILES_BROTLI_QUALITY = getattr(settings, "STATICFILES_BROTLI_QUALITY", 11)
+
+# compression of dynamic responses, see common.compression
+# responses smaller than this number of bytes are not compressed
+COMPRESSION_MIN_SIZE = getattr(settings, "COMPRESSION_MIN_SIZE", 200)
+COMPRESSION_GZIP_LEVEL = getattr(settings, "COMPRESSION_GZIP_LEVEL", 6)
+COMPRESSION_BROTLI_QUALITY = getattr(settings, "COMPRESSION_BROTLI_QUALITY", 5)
+COMPRESSION_CONTENT_TYPES = tuple(
+    getattr(
+        settings,
+        "COMPRESSION_CONTENT_TYPES",
+        (
+            "text/",
+            "application/json",
+            "application/javascript",
+            "application/xml",
+            "image/svg+xml",
+        ),
+    )
+)
+# maximum length of the random padding of responses containing CSRF tokens
+COMPRESSION_MAX_RANDOM_BYTES = getattr(settings, "COMPRESSION_MAX_RANDOM_BYTES", 100)
+# seconds between two updates of the shared bytes saved statistics
+COMPRESSION_STATS_FLUSH_INTERVAL = getattr(
+    settings, "COMPRESSION_STATS_FLUSH_INTERVAL", 30
+)
+
+# Redis server used by common.redis_client
+REDIS_URL = getattr(settings, "REDIS_URL", "redis://localhost:6379/")
+
+# token bucket rate limits, see common.ratelimit
+RATELIMIT_ENABLED = getattr(settings, "RATELIMIT_ENABLED", True)
+# scope -> requests per second, minute or hour and the number of requests
+# allowed in a burst
+RATELIMITS = getattr(
+    settings,
+    "RATELIMITS",
+    {
+        "join_leave": {"rate": "30/m", "burst": 10},
+        "shift_message": {"rate": "10/h", "burst": 3},
+        "api": {"rate": "120/m", "burst": 120},
+    },
+)
+# requests are also limited per IP address, with this many times the
+# limits above, as many clients may share an address (NAT, proxies)
+RATELIMIT_IP_MULTIPLIER = getattr(settings, "RATELIMIT_IP_MULTIPLIER", 20)
+
+# read replicas, see common.db_replicas
+# aliases of the replica databases in DATABASES
+DATABASE_REPLICAS = getattr(settings, "DATABASE_REPLICAS", ())
+# names of the read-only views, whose queries go to a replica
+DATABASE_REPLICA_VIEWS = getattr(
+    settings,
+    "DATABASE_REPLICA_VIEWS",
+    (
+        "home",
+        "shelter_info",
+        "privacy",
+        "helpdesk",
+        "country-details",
+        "region-details",
+        "area-details",
+        "place-details",
+        "organization",
+        "facility",
+        "content.views.translated_flatpage",
+    ),
+)
+# seconds clients read from the primary after they changed something, so they
+# see their changes despite replication lag
+DATABASE_REPLICA_PIN_SECONDS = getattr(settings, "DATABASE_REPLICA_PIN_SECONDS", 10)
+DATABASE_REPLICA_PIN_COOKIE = getattr(
+    settings, "DATABASE_REPLICA_PIN_COOKIE", "vp_primary"
+)
+# seconds between two health checks of a replica, and the replication lag in
+# seconds (PostgreSQL only) beyond which a replica is not used
+DATABASE_REPLICA_CHECK_INTERVAL = getattr(
+    settings, "DATABASE_REPLICA_CHECK_INTERVAL", 10
+)
+DATABASE_REPLICA_MAX_LAG = getattr(settings, "DATABASE_REPLICA_MAX_LAG", 5)
+# seconds a persistent database connection (CONN_MAX_AGE) may be idle before
+# it is checked at the start of the next request or task
+DATABASE_CONN_HEALTH_CHECK_IDLE = getattr(
+    settings, "DATABASE_CONN_HEALTH_CHECK_IDLE", 30
+)
+# default number of entries a two tier cache (see common.tiered_cache) keeps
+# per process
+TIERED_CACHE_MAX_ENTRIES = getattr(settings, "TIERED_CACHE_MAX_ENTRIES", 1000)
+# default seconds entries are kept per process at most
+TIERED_CACHE_LOCAL_TIMEOUT = getattr(settings, "TIERED_CACHE_LOCAL_TIMEOUT", 60)
+# default seconds between two checks of the namespace version, i.e. how long
+# other processes may serve entries after an invalidation
+TIERED_CACHE_CHECK_INTERVAL = getattr(settings, "TIERED_CACHE_CHECK_INTERVAL", 5)
+# seconds between two updates of the shared hit counters
+TIERED_CACHE_STATS_FLUSH_INTERVAL = getattr(
+    settings, "TIERED_CACHE_STATS_FLUSH_INTERVAL", 30
+)
+# seconds the statistics on the home page are cached
+VOLUNTEER_STATS_CACHE_TIMEOUT = getattr(settings, "VOLUNTEER_STATS_CACHE_TIMEOUT", 900)
+# seconds a recomputation of a cached value may take before other processes
+# stop waiting for it (see common.stampede)
+STAMPEDE_LOCK_TIMEOUT = getattr(settings, "STAMPEDE_LOCK_TIMEOUT", 30)
+# seconds expired values are still served while one process recomputes them
+STAMPEDE_STALE_TIMEOUT = getattr(settings, "STAMPEDE_STALE_TIMEOUT", 5 * 60)
+# eagerness of the probabilistic early refresh, 0 disables it
+STAMPEDE_BETA = getattr(settings, "STAMPEDE_BETA", 1.0)
+# warm up the application before uwsgi forks its workers (see common.warmup)
+WARMUP_ENABLED = getattr(settings, "WARMUP_ENABLED", True)
+# templates compiled by the warm up, i.e. those of the most requested pages
+WARMUP_TEMPLATES = getattr(
+    settings,
+    "WARMUP_TEMPLATES",
+    (
+        "home.html",
+        "helpdesk.html",
+        "helpdesk_single.html",
+        "helpdesk_range.html",
+        "shift_details.html",
+        "geographic_helpdesk.html",
+        "organization.html",
+        "facility.html",
+        "flatpages/default.html",
+        "registration/login.html",
+        "admin/index.html",
+        "admin/change_list.html",
+        "admin/change_form.html",
+    ),
+)
+# milliseconds a request may take at most to count as fast, workers log how
+# long after they started their first fast request finished
+WARMUP_FAST_REQUEST_MS = getattr(settings, "WARMUP_FAST_REQUEST_MS", 100)
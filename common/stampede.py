@@ -0,0 +1,91 @@
+"""
+Stampede protection for expensive cached values.
+
+When a cached value expires, every process requesting it would recompute it
+at the same time. get_or_recompute() avoids that:
+
+* Single flight: only the process which gets the lock of the key (a
+  ``cache.add``, so it works with any shared cache backend) recomputes the
+  value.
+* Stale while revalidate: values are kept STAMPEDE_STALE_TIMEOUT seconds
+  after they expired, other processes serve the expired value meanwhile.
+  Without one (i.e. on a cold cache), they wait for the recomputed value, up
+  to STAMPEDE_LOCK_TIMEOUT seconds.
+* Probabilistic early refresh: values are recomputed shortly before they
+  expire, with a probability increasing towards their expiry and with the
+  time their computation took ("XFetch", Vattani et al. 2015), so usually
+  one process refreshes them before they expire at all.
+"""
+import logging
+import math
+import random
+import time
+
+from django.core.cache import cache
+
+from .settings import STAMPEDE_BETA, STAMPEDE_LOCK_TIMEOUT, STAMPEDE_STALE_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+# seconds between two looks for a value recomputed by another process
+WAIT_INTERVAL = 0.05
+
+
+def lock_key(key):
+    return "{}:lock".format(key)
+
+
+def needs_refresh(expires_at, duration, beta=STAMPEDE_BETA):
+    """
+    Returns if a value expiring at ``expires_at`` (epoch seconds), whose
+    computation took ``duration`` seconds, should be recomputed now.
+    """
+    # -log(random) is exponentially distributed, mostly below 3
+    early = duration * beta * -math.log(1.0 - random.random())
+    return time.time() + early >= expires_at
+
+
+def recompute(key, builder, timeout):
+    started = time.time()
+    value = builder()
+    duration = time.time() - started
+    cache.set(
+        key,
+        (value, started + duration + timeout, duration),
+        timeout + STAMPEDE_STALE_TIMEOUT,
+    )
+    return value
+
+
+def get_or_recompute(key, builder, timeout):
+    """
+    Returns the value cached at ``key``, computed by ``builder`` and cached
+    for ``timeout`` seconds, see module docstring.
+    """
+    entry = cache.get(key)
+    if entry is not None:
+        value, expires_at, duration = entry
+        if not needs_refresh(expires_at, duration):
+            return value
+        if not cache.add(lock_key(key), True, STAMPEDE_LOCK_TIMEOUT):
+            # being recomputed
+            return value
+    else:
+        deadline = time.monotonic() + STAMPEDE_LOCK_TIMEOUT
+        while not cache.add(lock_key(key), True, STAMPEDE_LOCK_TIMEOUT):
+            if time.monotonic() > deadline:
+                logger.warning("Gave up waiting for %s to be recomputed", key)
+                return recompute(key, builder, timeout)
+            time.sleep(WAIT_INTERVAL)
+            entry = cache.get(key)
+            if entry is not None:
+                return entry[0]
+        # recomputed by another process meanwhile
+        entry = cache.get(key)
+        if entry is not None:
+            cache.delete(lock_key(key))
+            return entry[0]
+    try:
+        return recompute(key, builder, timeout)
+    finally:
+        cache.delete(lock_key(key))
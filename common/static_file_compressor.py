@@ -1,48 +1,226 @@
+"""
+Static files storages minifying and pre-compressing JS and CSS files, so the
+reverse proxy can serve them compressed without compressing on every request.
+
+Files are processed in parallel by a pool of STATICFILES_POSTPROCESS_WORKERS
+processes. Next to every minified file, a gzipped (``.gz``) and, if the
+``brotli`` package is installed, a brotli compressed (``.br``) version is
+written.
+
+If STATICFILES_POSTPROCESS_CACHE_DIR is set, the results are kept there, keyed
+by the hash of the file contents, so unchanged files (like the vendor bundles)
+are only copied on subsequent runs, even with ``collectstatic --clear``.
+
+CompressedManifestStaticFilesStorage additionally stores copies with the
+content hash in the filename, which can be cached by clients forever.
+"""
 import contextlib
 import gzip
-import io
+import hashlib
+import logging
+import os
 import re
 import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from importlib import import_module
 
-from django.contrib.staticfiles.storage import StaticFilesStorage
+from django.contrib.staticfiles.storage import (
+    ManifestStaticFilesStorage,
+    StaticFilesStorage,
+)
+
+from .settings import (
+    STATICFILES_BROTLI_QUALITY,
+    STATICFILES_GZIP_LEVEL,
+    STATICFILES_POSTPROCESS_CACHE_DIR,
+    STATICFILES_POSTPROCESS_REPORT,
+    STATICFILES_POSTPROCESS_WORKERS,
+)
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+MINIFIERS = {
+    "js": ("rjsmin", "jsmin"),
+    "css": ("rcssmin", "cssmin"),
+}
+
+
+@lru_cache(maxsize=None)
+def get_minifier(ext):
+    module, func = MINIFIERS[ext]
+    return getattr(import_module(module), func)
+
+
+def compressed_suffixes():
+    return (".gz", ".br") if brotli else (".gz",)
+
+
+def minify(content, ext):
+    """Returns the minified content, or None if it could not be minified."""
+    try:
+        return get_minifier(ext)(content.decode("utf-8")).encode("utf-8")
+    except Exception:
+        return None
+
+
+def compress(content):
+    compressed = {
+        ".gz": gzip.compress(content, compresslevel=STATICFILES_GZIP_LEVEL, mtime=0)
+    }
+    if brotli:
+        compressed[".br"] = brotli.compress(content, quality=STATICFILES_BROTLI_QUALITY)
+    return compressed
+
+
+def write_file(path, content):
+    with open(path, "wb") as f_out:
+        f_out.write(content)
+
+
+def restore_from_cache(path, cache_path):
+    suffixes = ("",) + compressed_suffixes()
+    if not all(os.path.exists(cache_path + suffix) for suffix in suffixes):
+        return False
+    for suffix in suffixes:
+        shutil.copyfile(cache_path + suffix, path + suffix)
+    return True
 
 
-class CompressedStaticFilesStorage(StaticFilesStorage):
+def store_in_cache(cache_paths, minified, compressed):
+    for cache_path in cache_paths:
+        with contextlib.suppress(OSError):
+            for suffix, content in compressed.items():
+                write_file(cache_path + suffix, content)
+            # written last, marks the entry as complete
+            write_file(cache_path, minified)
+
+
+def process_file(job):
+    """
+    Minifies and compresses a single file, runs in the worker processes.
+    """
+    name, path, ext, cache_dir = job
+    started = time.perf_counter()
+    with open(path, "rb") as f_in:
+        content = f_in.read()
+
+    result = {"name": name, "size": len(content), "cached": False}
+    cache_path = None
+    if cache_dir:
+        digest = hashlib.sha256(content).hexdigest()
+        cache_path = os.path.join(cache_dir, "{}.{}".format(digest, ext))
+        if restore_from_cache(path, cache_path):
+            result.update(
+                processed=True,
+                cached=True,
+                minified_size=os.path.getsize(path),
+                duration=time.perf_counter() - started,
+            )
+            return result
+
+    minified = minify(content, ext)
+    result["processed"] = minified is not None
+    if minified is None:
+        minified = content
+    else:
+        write_file(path, minified)
+    compressed = compress(minified)
+    for suffix, compressed_content in compressed.items():
+        write_file(path + suffix, compressed_content)
+
+    if cache_path:
+        # also cache by the hash of the result, which is what collectstatic
+        # leaves in place, if the source file did not change
+        minified_digest = hashlib.sha256(minified).hexdigest()
+        minified_path = os.path.join(cache_dir, "{}.{}".format(minified_digest, ext))
+        store_in_cache({cache_path, minified_path}, minified, compressed)
+
+    result.update(
+        minified_size=len(minified),
+        duration=time.perf_counter() - started,
+        **{suffix[1:] + "_size": len(c) for suffix, c in compressed.items()},
+    )
+    return result
+
+
+class CompressedFilesMixin:
     EXTENSIONS = ["js", "css"]
     EXT_LOOKUP = {}
 
-    def __init__(self, location=None, base_url=None, *args, **kwargs):
-        super().__init__(location, base_url, *args, **kwargs)
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
         for ext in self.EXTENSIONS:
             self.EXT_LOOKUP[ext] = re.compile(r".*\.{}\Z".format(ext))
 
     def post_process(self, paths, dry_run=False, **kwargs):
+        names = list(paths)
+        parent_post_process = getattr(super(), "post_process", None)
+        if parent_post_process:
+            for name, processed_name, processed in parent_post_process(
+                paths, dry_run, **kwargs
+            ):
+                yield name, processed_name, processed
+                if processed_name and not isinstance(processed, Exception):
+                    names.append(processed_name)
+
         processing_files = []
-        for name in paths:
+        for name in dict.fromkeys(names):
             ext = self.filename_matches(name)
             if ext:
                 processing_files.append((name, self.path(name), ext))
 
-        for name, path, ext in processing_files:
-            yield self._post_process(name, path, ext, dry_run)
-
-    def _post_process(self, name, path, ext, dry_run):
-        processed = False
         if dry_run:
-            return name, path, False
-        try:
-            func_name = "_minify_{}".format(ext)
-            func = getattr(self, func_name)
-            if func:
-                processed = func(path)
-        except AttributeError:
-            processed = False
-        except io.UnsupportedOperation:
-            # raise explicitly
-            raise
-
-        return name, path, processed
+            for name, path, _ext in processing_files:
+                yield name, path, False
+            return
+
+        for result in self.process_files(processing_files):
+            yield result["name"], self.path(result["name"]), result["processed"]
+
+    def process_files(self, processing_files):
+        cache_dir = STATICFILES_POSTPROCESS_CACHE_DIR
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        jobs = [(name, path, ext, cache_dir) for name, path, ext in processing_files]
+
+        started = time.perf_counter()
+        workers = STATICFILES_POSTPROCESS_WORKERS or os.cpu_count() or 1
+        if workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(process_file, jobs))
+        else:
+            results = [process_file(job) for job in jobs]
+
+        self.report(results, time.perf_counter() - started, workers)
+        return results
+
+    def report(self, results, duration, workers):
+        cached = sum(1 for result in results if result["cached"])
+        size = sum(result["size"] for result in results)
+        minified_size = sum(result["minified_size"] for result in results)
+        lines = [
+            "Minified and compressed {} files ({} from cache) with {} workers "
+            "in {:.2f}s, {} -> {} bytes".format(
+                len(results), cached, workers, duration, size, minified_size
+            )
+        ]
+        slowest = sorted(results, key=lambda result: -result["duration"])[:5]
+        for result in slowest:
+            if result["cached"]:
+                break
+            lines.append("  {:.2f}s {}".format(result["duration"], result["name"]))
+
+        logger.info("\n".join(lines))
+        if STATICFILES_POSTPROCESS_REPORT:
+            sys.stdout.write("\n".join(lines) + "\n")
 
     def filename_matches(self, name):
         for ext in self.EXT_LOOKUP:
@@ -52,31 +230,20 @@ class CompressedStaticFilesStorage(StaticFilesStorage):
 
         return None
 
-    @staticmethod
-    def _minify_js(path):
-        return __class__._generic_minify(path, "rjsmin", "jsmin")
-
-    @staticmethod
-    def _minify_css(path):
-        return __class__._generic_minify(path, "rcssmin", "cssmin")
-
-    @staticmethod
-    def _generic_minify(path, module, func):
-        try:
-            f = getattr(import_module(module), func)
-            with open(path) as f_in:
-                file_content = f_in.read()
-            with open(path, "w") as f_out:
-                f_out.write(f(file_content))
-            __class__._gzip(path)
-
-            return True
-        except Exception:
-            return False
-
-    @staticmethod
-    def _gzip(path):
-        with contextlib.suppress(Exception):  # noqa: SIM117
-            with open(path, "rb") as f_in:  # noqa: SIM117
-                with gzip.open(f"{path}.gz", "wb") as f_out:  # noqa: SIM117
-                    shutil.copyfileobj(f_in, f_out)
+
+class CompressedStaticFilesStorage(CompressedFilesMixin, StaticFilesStorage):
+    pass
+
+
+class CompressedManifestStaticFilesStorage(
+    CompressedFilesMixin, ManifestStaticFilesStorage
+):
+    # do not fail rendering for files missing in the manifest
+    manifest_strict = False
+    # only CSS references are rewritten, the vendor bundles' source map
+    # references point to files not shipped with them
+    patterns = tuple(
+        (glob, patterns)
+        for glob, patterns in ManifestStaticFilesStorage.patterns
+        if glob == "*.css"
+    )
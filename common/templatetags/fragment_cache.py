@@ -0,0 +1,94 @@
+"""
+Template fragment cache invalidated by namespace versions (see
+common.cache_versions), not only by a timeout::
+
+    {% load fragment_cache %}
+    {% versioned_cache 300 "geographic_shifts" "page_cache" place.pk %}
+        ...
+    {% endversioned_cache %}
+
+caches the enclosed section for at most 300 seconds, keyed by the fragment
+name, the current versions of the given namespaces (a comma separated string
+or a list), the additional values after it, the active language and time
+zone. Bumping a namespace version invalidates the fragment in all processes.
+
+Cached fragments are shared by all users, so they must not contain anything
+user specific, like CSRF tokens or the user's name.
+"""
+import hashlib
+
+from django import template
+from django.core.cache import cache
+from django.template import TemplateSyntaxError
+from django.utils.timezone import get_current_timezone_name
+from django.utils.translation import get_language
+
+from common.cache_versions import get_version
+
+register = template.Library()
+
+KEY_PREFIX = "template.versioned_cache"
+
+
+def get_fragment_key(fragment_name, namespaces, vary_on):
+    if isinstance(namespaces, str):
+        namespaces = [namespace for namespace in namespaces.split(",") if namespace]
+    parts = [get_version(namespace.strip()) for namespace in namespaces]
+    parts += [get_language(), get_current_timezone_name()] + list(vary_on)
+    digest = hashlib.md5(":".join(str(part) for part in parts).encode("utf-8"))
+    return "{}.{}.{}".format(KEY_PREFIX, fragment_name, digest.hexdigest())
+
+
+class VersionedCacheNode(template.Node):
+    def __init__(self, nodelist, timeout, fragment_name, namespaces, vary_on):
+        self.nodelist = nodelist
+        self.timeout = timeout
+        self.fragment_name = fragment_name
+        self.namespaces = namespaces
+        self.vary_on = vary_on
+
+    def render(self, context):
+        timeout = self.timeout.resolve(context)
+        try:
+            timeout = int(timeout)
+        except (ValueError, TypeError):
+            raise TemplateSyntaxError(
+                '"versioned_cache" tag got a non-integer timeout value: %r' % timeout
+            )
+        key = get_fragment_key(
+            self.fragment_name.resolve(context),
+            self.namespaces.resolve(context),
+            [var.resolve(context) for var in self.vary_on],
+        )
+        value = cache.get(key)
+        if value is None:
+            value = self.nodelist.render(context)
+            cache.set(key, value, timeout)
+        return value
+
+
+@register.tag("versioned_cache")
+def do_versioned_cache(parser, token):
+    """
+    Caches the enclosed section, see module docstring.
+
+    Usage::
+
+        {% versioned_cache timeout fragment_name namespaces [var1 var2 ...] %}
+            ...
+        {% endversioned_cache %}
+    """
+    nodelist = parser.parse(("endversioned_cache",))
+    parser.delete_first_token()
+    tokens = token.split_contents()
+    if len(tokens) < 4:
+        raise TemplateSyntaxError(
+            "'%r' tag requires at least three arguments." % tokens[0]
+        )
+    return VersionedCacheNode(
+        nodelist,
+        parser.compile_filter(tokens[1]),
+        parser.compile_filter(tokens[2]),
+        parser.compile_filter(tokens[3]),
+        [parser.compile_filter(token) for token in tokens[4:]],
+    )
@@ -1,15 +1,15 @@
-from datetime import timedelta
-
 from django import template
 from django.contrib.auth.models import User
-from django.db.models import Count
-from django.utils import timezone
 
+from common.settings import VOLUNTEER_STATS_CACHE_TIMEOUT
+from common.tiered_cache import TieredCache
 from organizations.models import Facility
-from scheduler.models import Shift
+from scheduler import archive
 
 register = template.Library()
 
+stats_cache = TieredCache("volunteer_stats", max_entries=1)
+
 
 @register.simple_tag
 def get_facility_count():
@@ -40,27 +40,25 @@ def get_volunteer_deleted_number():
 @register.simple_tag
 def get_volunteer_hours():
     """
-    Returns the number of total volunteer hours worked.
+    Returns the number of total volunteer hours worked, including archived
+    shifts.
     """
-    now = timezone.now()
-    finished_shifts = Shift.objects.filter(starting_time__lte=now).annotate(
-        slots_done=Count("helpers")
-    )
-    delta = timedelta()
-    for shift in finished_shifts:
-        delta += shift.slots_done * (shift.ending_time - shift.starting_time)
-    hours = int(delta.total_seconds() / 3600)
-    return hours
+    return archive.get_volunteer_hours()
 
 
 @register.simple_tag
 def get_volunteer_stats():
     """
-    Returns all statistics concerning users, facilities and their shifts.
+    Returns all statistics concerning users, facilities and their shifts,
+    cached for VOLUNTEER_STATS_CACHE_TIMEOUT seconds.
     """
-    return {
-        "volunteer_count": get_volunteer_number(),
-        "volunteer_deleted_count": get_volunteer_deleted_number(),
-        "facility_count": get_facility_count(),
-        "volunteer_hours": get_volunteer_hours(),
-    }
+    return stats_cache.get_or_recompute(
+        "all",
+        lambda: {
+            "volunteer_count": get_volunteer_number(),
+            "volunteer_deleted_count": get_volunteer_deleted_number(),
+            "facility_count": get_facility_count(),
+            "volunteer_hours": get_volunteer_hours(),
+        },
+        VOLUNTEER_STATS_CACHE_TIMEOUT,
+    )
@@ -0,0 +1,234 @@
+"""
+Two tier cache: a bounded, process local LRU in front of the shared cache.
+
+Small, hot and rarely changing values (flat pages, statistics, ...) cost a
+round trip to the shared cache on every access. A TieredCache keeps the
+entries of a namespace in process memory as well::
+
+    flatpage_cache = TieredCache("content.flatpages")
+    data = flatpage_cache.get_or_set(key, build_data, timeout=300)
+
+Entries are looked up in the local tier, then in the shared cache and are
+built on a miss. The local tier keeps ``max_entries`` entries at most (least
+recently used ones are evicted) for ``local_timeout`` seconds at most.
+
+Entries are invalidated in all processes by bumping the version of the
+namespace, see common.cache_versions. Shared keys include the version, local
+entries are dropped when the version changed. Like LocalVersionedValue, the
+version is only checked every ``check_interval`` seconds, bumps in the same
+process take effect immediately.
+
+Values are shared between the callers in a process and must not be modified.
+
+Hits of either tier and misses are counted per namespace and collected in the
+shared cache, see the ``tiered_cache_stats`` management command.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from django.core.cache import cache
+
+from . import cache_versions, stampede
+from .settings import (
+    TIERED_CACHE_CHECK_INTERVAL,
+    TIERED_CACHE_LOCAL_TIMEOUT,
+    TIERED_CACHE_MAX_ENTRIES,
+    TIERED_CACHE_STATS_FLUSH_INTERVAL,
+)
+
+KEY_PREFIX = "tiered"
+STATS_KEY_PREFIX = "tiered_stats"
+STATS_NAMESPACES_KEY = "tiered_stats:namespaces"
+
+_missing = object()
+
+
+class TieredCacheStats:
+    """
+    Counts hits and misses per namespace in this process and adds them to
+    counters in the shared cache at most every TIERED_CACHE_STATS_FLUSH_INTERVAL
+    seconds.
+    """
+
+    FIELDS = ("local_hits", "shared_hits", "misses")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = defaultdict(lambda: [0, 0, 0])
+        self._flushed_at = time.monotonic()
+        self._pid = os.getpid()
+
+    def add(self, namespace, field):
+        with self._lock:
+            if self._pid != os.getpid():
+                # counts inherited from a parent process were flushed there
+                self._counts.clear()
+                self._pid = os.getpid()
+            self._counts[namespace][self.FIELDS.index(field)] += 1
+            if time.monotonic() - self._flushed_at < TIERED_CACHE_STATS_FLUSH_INTERVAL:
+                return
+            pending, self._counts = self._counts, defaultdict(lambda: [0, 0, 0])
+            self._flushed_at = time.monotonic()
+        self.flush(pending)
+
+    @classmethod
+    def key(cls, namespace, field):
+        return "{}:{}:{}".format(STATS_KEY_PREFIX, namespace, field)
+
+    @classmethod
+    def flush(cls, pending):
+        namespaces = set(cache.get(STATS_NAMESPACES_KEY, ()))
+        if not namespaces.issuperset(pending):
+            cache.set(STATS_NAMESPACES_KEY, sorted(namespaces.union(pending)), None)
+        for namespace, counts in pending.items():
+            for field, value in zip(cls.FIELDS, counts):
+                key = cls.key(namespace, field)
+                if cache.add(key, value, None):
+                    continue
+                try:
+                    cache.incr(key, value)
+                except ValueError:
+                    cache.set(key, value, None)
+
+    @classmethod
+    def collect(cls):
+        """Returns the collected stats by namespace."""
+        stats = {}
+        for namespace in cache.get(STATS_NAMESPACES_KEY, ()):
+            keys = {cls.key(namespace, field): field for field in cls.FIELDS}
+            values = cache.get_many(keys)
+            stats[namespace] = {
+                field: values.get(key, 0) for key, field in keys.items()
+            }
+        return stats
+
+    @classmethod
+    def reset(cls):
+        for namespace in cache.get(STATS_NAMESPACES_KEY, ()):
+            cache.delete_many([cls.key(namespace, field) for field in cls.FIELDS])
+        cache.delete(STATS_NAMESPACES_KEY)
+
+
+stats = TieredCacheStats()
+
+
+class TieredCache:
+    """Cache of the entries of ``namespace``, see module docstring."""
+
+    def __init__(
+        self,
+        namespace,
+        max_entries=TIERED_CACHE_MAX_ENTRIES,
+        local_timeout=TIERED_CACHE_LOCAL_TIMEOUT,
+        check_interval=TIERED_CACHE_CHECK_INTERVAL,
+    ):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.local_timeout = local_timeout
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        # key -> (value, expires at), least recently used first
+        self._entries = OrderedDict()
+        self._version = None
+        self._checked_at = None
+        cache_versions.register_local(namespace, self)
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+    def get_version(self):
+        version, checked_at = self._version, self._checked_at
+        if version is None or time.monotonic() - checked_at >= self.check_interval:
+            version = cache_versions.get_version(self.namespace)
+            with self._lock:
+                if version != self._version:
+                    self._entries.clear()
+                    self._version = version
+                self._checked_at = time.monotonic()
+        return version
+
+    def shared_key(self, key, version):
+        return "{}:{}:{}:{}".format(KEY_PREFIX, self.namespace, version, key)
+
+    def get_local(self, key):
+        """Returns the value of ``key`` in the local tier or ``_missing``."""
+        self.get_version()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= time.monotonic():
+                return _missing
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def get(self, key, default=None):
+        value = self.get_local(key)
+        if value is not _missing:
+            stats.add(self.namespace, "local_hits")
+            return value
+
+        value = cache.get(self.shared_key(key, self.get_version()), _missing)
+        if value is _missing:
+            stats.add(self.namespace, "misses")
+            return default
+        stats.add(self.namespace, "shared_hits")
+        self._set_local(key, value, self.local_timeout)
+        return value
+
+    def set(self, key, value, timeout=None):  # noqa: A003
+        """Caches ``value`` for ``timeout`` seconds, or forever if None."""
+        cache.set(self.shared_key(key, self.get_version()), value, timeout)
+        if timeout is None:
+            local_timeout = self.local_timeout
+        else:
+            local_timeout = min(timeout, self.local_timeout)
+        self._set_local(key, value, local_timeout)
+
+    def get_or_set(self, key, default, timeout=None):
+        """
+        Returns the value of ``key``, caches ``default`` (or its result, if it
+        is callable) if there is none.
+        """
+        value = self.get(key, _missing)
+        if value is _missing:
+            value = default() if callable(default) else default
+            self.set(key, value, timeout)
+        return value
+
+    def get_or_recompute(self, key, builder, timeout):
+        """
+        Like get_or_set(), but the shared tier is protected against stampedes
+        of processes recomputing an expensive value, see common.stampede.
+        """
+        value = self.get_local(key)
+        if value is not _missing:
+            stats.add(self.namespace, "local_hits")
+            return value
+
+        built = []
+
+        def build():
+            built.append(True)
+            return builder()
+
+        value = stampede.get_or_recompute(
+            self.shared_key(key, self.get_version()), build, timeout
+        )
+        stats.add(self.namespace, "misses" if built else "shared_hits")
+        self._set_local(key, value, min(timeout, self.local_timeout))
+        return value
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+        cache.delete(self.shared_key(key, self.get_version()))
+
+    def _set_local(self, key, value, timeout):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + timeout)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
@@ -0,0 +1,117 @@
+"""
+Warm up of the application before uwsgi forks its workers.
+
+uwsgi loads the application in its master process and forks the workers from
+it (see uwsgi.ini, lazy-apps must stay off). warm_up() is called by the WSGI
+module, so every worker starts with what it would otherwise load on its first
+requests, shared copy-on-write with the master:
+
+* the translation catalogs of all LANGUAGES,
+* the URL resolvers, which are populated per language on the first reverse()
+  (the admin registry is loaded by django.setup(), its URL patterns with the
+  resolvers),
+* the compiled WARMUP_TEMPLATES, kept by the cached template loader (used
+  unless DEBUG is enabled),
+* the place hierarchy (see places.hierarchy).
+
+A failing step is logged and skipped, the application still starts. Database
+and cache connections opened by the warm up are closed afterwards, so workers
+do not share them.
+
+WarmupMetricsMiddleware logs once per worker how many seconds after its start
+the first fast request (see WARMUP_FAST_REQUEST_MS) finished.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import close_caches
+from django.db import connections
+from django.template.loader import get_template
+from django.urls import reverse
+from django.utils import translation
+
+from .settings import WARMUP_FAST_REQUEST_MS, WARMUP_TEMPLATES
+
+logger = logging.getLogger(__name__)
+
+
+def load_translations_and_urls():
+    for language, _name in settings.LANGUAGES:
+        with translation.override(language):
+            reverse("home")
+
+
+def load_templates():
+    for template_name in WARMUP_TEMPLATES:
+        get_template(template_name)
+
+
+def load_place_hierarchy():
+    from places.hierarchy import get_place_hierarchy
+
+    get_place_hierarchy()
+
+
+STEPS = (load_translations_and_urls, load_templates, load_place_hierarchy)
+
+
+def warm_up():
+    """Runs the warm up steps, see module docstring."""
+    started = time.monotonic()
+    for step in STEPS:
+        try:
+            step()
+        except Exception:
+            logger.exception("Warm up step %s failed", step.__name__)
+    connections.close_all()
+    close_caches()
+    logger.info("Warmed up in %.2f seconds", time.monotonic() - started)
+
+
+class WorkerStartup:
+    """Time and requests of a worker until its first fast request."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.started_at = time.monotonic()
+        self.requests = 0
+        self.first_request_ms = None
+        self.done = False
+
+    def record(self, duration_ms):
+        self.requests += 1
+        if self.first_request_ms is None:
+            self.first_request_ms = duration_ms
+        if duration_ms <= WARMUP_FAST_REQUEST_MS:
+            self.done = True
+            logger.info(
+                "First fast request finished %.2f seconds after start, "
+                "after %d request(s), the first took %.0f ms",
+                time.monotonic() - self.started_at,
+                self.requests,
+                self.first_request_ms,
+            )
+
+
+startup = WorkerStartup()
+
+
+def worker_started():
+    """To be called right after a worker was forked."""
+    startup.reset()
+
+
+class WarmupMetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if startup.done:
+            return self.get_response(request)
+        started = time.perf_counter()
+        response = self.get_response(request)
+        startup.record((time.perf_counter() - started) * 1000)
+        return response
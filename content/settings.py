@@ -0,0 +1,6 @@
+from django.conf import settings
+
+# seconds resolved flat pages are cached, changes invalidate them immediately
+FLATPAGE_CACHE_TIMEOUT = getattr(settings, "FLATPAGE_CACHE_TIMEOUT", 24 * 60 * 60)
+# seconds URLs without flat page are cached
+FLATPAGE_CACHE_MISS_TIMEOUT = getattr(settings, "FLATPAGE_CACHE_MISS_TIMEOUT", 5 * 60)
@@ -0,0 +1,18 @@
+from django.contrib.flatpages.models import FlatPage
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from common.cache_versions import bump_version_on_commit
+from .models import FlatPageExtraStyle, FlatPageTranslation
+from .views import CACHE_NAMESPACE
+
+
+@receiver(post_save, sender=FlatPage)
+@receiver(post_delete, sender=FlatPage)
+@receiver(post_save, sender=FlatPageTranslation)
+@receiver(post_delete, sender=FlatPageTranslation)
+@receiver(post_save, sender=FlatPageExtraStyle)
+@receiver(post_delete, sender=FlatPageExtraStyle)
+@receiver(m2m_changed, sender=FlatPage.sites.through)
+def invalidate_flatpages(sender, **kwargs):
+    bump_version_on_commit(CACHE_NAMESPACE)
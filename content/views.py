@@ -1,16 +1,108 @@
+import hashlib
+
 from django.conf import settings
 from django.contrib.flatpages.models import FlatPage
 from django.contrib.flatpages.views import render_flatpage
 from django.contrib.sites.shortcuts import get_current_site
 from django.http import Http404
-from django.shortcuts import get_object_or_404
 from django.views.decorators.csrf import csrf_protect
 
 from common import brace_format_logging
-from content.models import FlatPageTranslation
+from common.tiered_cache import TieredCache
+from content.models import FlatPageExtraStyle
+from content.settings import FLATPAGE_CACHE_MISS_TIMEOUT, FLATPAGE_CACHE_TIMEOUT
 
 DEFAULT_TEMPLATE = "flatpages/default.html"
 
+CACHE_NAMESPACE = "content.flatpages"
+# cached for URLs without flat page
+MISSING = "missing"
+
+flatpage_cache = TieredCache(CACHE_NAMESPACE)
+
+logger = brace_format_logging.getLogger(__name__)
+
+
+def get_cache_key(url, site_id, language):
+    return "{}:{}:{}".format(
+        site_id,
+        language,
+        hashlib.md5(url.encode("utf-8")).hexdigest(),
+    )
+
+
+def load_flatpage_data(url, site_id, language):
+    """
+    Returns the fields of the flat page at ``url`` translated to ``language``,
+    including its additional CSS, or None, if there is no such flat page.
+    """
+    flatpage = (
+        FlatPage.objects.filter(url=url, sites=site_id)
+        .select_related("extra_style")
+        .first()
+    )
+    if flatpage is None:
+        return None
+
+    data = {
+        field: getattr(flatpage, field)
+        for field in (
+            "id",
+            "url",
+            "title",
+            "content",
+            "enable_comments",
+            "template_name",
+            "registration_required",
+        )
+    }
+    try:
+        data["extra_css"] = flatpage.extra_style.css
+    except FlatPageExtraStyle.DoesNotExist:
+        data["extra_css"] = None
+
+    translation = (
+        flatpage.translations.filter(language=language)
+        .values("title", "content")
+        .first()
+    )
+    if translation:
+        data.update(translation)
+    else:
+        logger.debug(
+            'No translation for page "{flatpage}" for language {lang}',
+            flatpage=url,
+            lang=language,
+        )
+    return data
+
+
+def get_flatpage(url, site_id, language):
+    """
+    Returns an (unsaved) flat page built from the cached data of the flat page at
+    ``url`` or None. Unknown URLs are cached as well.
+    """
+    key = get_cache_key(url, site_id, language)
+    data = flatpage_cache.get(key)
+    if data is None:
+        data = load_flatpage_data(url, site_id, language)
+        if data is None:
+            flatpage_cache.set(key, MISSING, FLATPAGE_CACHE_MISS_TIMEOUT)
+        else:
+            flatpage_cache.set(key, data, FLATPAGE_CACHE_TIMEOUT)
+    if data is None or data == MISSING:
+        return None
+
+    data = dict(data)
+    extra_css = data.pop("extra_css")
+    flatpage = FlatPage(**data)
+    extra_style = None
+    if extra_css is not None:
+        extra_style = FlatPageExtraStyle(flatpage=flatpage, css=extra_css)
+    # avoids a query, when the template accesses flatpage.extra_style
+    FlatPage.extra_style.related.set_cached_value(flatpage, extra_style)
+    return flatpage
+
 
 # This view is called from FlatpageFallbackMiddleware.process_response
 # when a 404 is raised, which often means CsrfViewMiddleware.process_view
@@ -36,28 +128,14 @@ def translated_flatpage(request, url):
     if not url.startswith("/"):
         url = f"/{url}"
     site_id = get_current_site(request).id
-    try:
-        f = get_object_or_404(FlatPage, url=url, sites=site_id)
-    except Http404:
-        if not url.endswith("/") and settings.APPEND_SLASH:
-            url = f"{url}/"
-            f = get_object_or_404(FlatPage, url=url, sites=site_id)
-        else:
-            raise
+    f = get_flatpage(url, site_id, request.LANGUAGE_CODE)
+    if f is None and not url.endswith("/") and settings.APPEND_SLASH:
+        f = get_flatpage(f"{url}/", site_id, request.LANGUAGE_CODE)
+    if f is None:
+        raise Http404
     return render_translated_flatpage(request, f)
 
 
 @csrf_protect
 def render_translated_flatpage(request, f):
-    try:
-        translation = f.translations.get(language=request.LANGUAGE_CODE)
-        f.title = translation.title
-        f.content = translation.content
-    except FlatPageTranslation.DoesNotExist:
-        logger = brace_format_logging.getLogger(__name__)
-        logger.debug(
-            'No translation for page "{flatpage}" for language {lang}',
-            flatpage=f.url,
-            lang=request.LANGUAGE_CODE,
-        )
     return render_flatpage(request, f)
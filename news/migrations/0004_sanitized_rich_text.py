@@ -0,0 +1,36 @@
+# Generated by Django 4.0.4 on 2026-10-19 14:28
+
+import common.rich_text
+from django.db import migrations, models
+
+
+def sanitize_texts(apps, schema_editor):
+    # the sources are kept, migrating backwards just drops the copies
+    NewsEntry = apps.get_model("news", "NewsEntry")
+    for pk, text in NewsEntry.objects.values_list("pk", "text").iterator():
+        NewsEntry.objects.filter(pk=pk).update(
+            text_html=common.rich_text.sanitize(text)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("news", "0003_cascade_deletion"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="newsentry",
+            name="text_html",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AlterField(
+            model_name="newsentry",
+            name="text",
+            field=common.rich_text.RichTextField(
+                html_field="text_html", verbose_name="articletext"
+            ),
+        ),
+        migrations.RunPython(sanitize_texts, migrations.RunPython.noop),
+    ]
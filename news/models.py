@@ -2,8 +2,10 @@ from django.db import models
 from django.template.defaultfilters import slugify
 from django.utils.translation import gettext_lazy as _
 
+from common.rich_text import RichTextField, RichTextMixin
 
-class NewsEntry(models.Model):
+
+class NewsEntry(RichTextMixin, models.Model):
     """
     facilities and organizations can publish news.
     """
@@ -14,7 +16,9 @@ class NewsEntry(models.Model):
         max_length=255, verbose_name=_("subtitle"), null=True, blank=True
     )
 
-    text = models.TextField(verbose_name=_("articletext"))
+    text = RichTextField(verbose_name=_("articletext"), html_field="text_html")
+    # sanitized when saved, see common.rich_text
+    text_html = models.TextField(blank=True, editable=False)
 
     slug = models.SlugField(auto_created=True, max_length=255)
 
@@ -1,18 +1,23 @@
 from django.urls import re_path
 from django.views.defaults import page_not_found, server_error
 
+from common.page_cache import cache_anonymous_page
 from .views import HomeView
 
 urlpatterns = [
-    re_path(r"^$", HomeView.as_view(template_name="home.html"), name="home"),
+    re_path(
+        r"^$",
+        cache_anonymous_page(HomeView.as_view(template_name="home.html")),
+        name="home",
+    ),
     re_path(
         r"^shelters-need-help/$",
-        HomeView.as_view(template_name="shelters_need_help.html"),
+        cache_anonymous_page(HomeView.as_view(template_name="shelters_need_help.html")),
         name="shelter_info",
     ),
     re_path(
         r"^privacy-policy/$",
-        HomeView.as_view(template_name="privacy_policy.html"),
+        cache_anonymous_page(HomeView.as_view(template_name="privacy_policy.html")),
         name="privacy",
     ),
     re_path(r"^404/$", page_not_found),
@@ -1,12 +1,12 @@
 import logging
 
-from django.db.models.aggregates import Count
 from django.http.response import HttpResponseRedirect
 from django.urls import reverse
 from django.views.generic.base import TemplateView
 
 from organizations.models import Facility
 from places.models import Region
+from scheduler.models import OpenShiftRollup
 
 logger = logging.getLogger(__name__)
 
@@ -24,8 +24,11 @@ class HomeView(TemplateView):
         context = super(HomeView, self).get_context_data(**kwargs)
 
         context["regions"] = (
-            Region.objects.annotate(facility_count=Count("areas__places__facilities"))
-            .exclude(facility_count=0)
+            Region.objects.filter(
+                pk__in=OpenShiftRollup.objects.having_facilities(
+                    OpenShiftRollup.Level.REGION
+                )
+            )
             .prefetch_related("areas", "areas__region")
             .all()
         )
@@ -5,7 +5,6 @@ from operator import itemgetter
 from ckeditor.widgets import CKEditorWidget
 from django.contrib import admin
 from django.db.models import Count, Q
-from django.template.defaultfilters import striptags
 from django.utils.encoding import smart_str as smart_text
 from django.utils.translation import gettext_lazy as _
 
@@ -235,13 +234,13 @@ class MembershipFieldListFilter(admin.RelatedFieldListFilter):
 @admin.register(models.Organization)
 class OrganizationAdmin(MembershipFilteredAdmin):
     def get_description(self, obj):
-        return striptags(obj.description)
+        return obj.description_excerpt
 
     get_description.short_description = _("description")
     get_description.allow_tags = True
 
     def get_contact_info(self, obj):
-        return striptags(obj.contact_info)
+        return obj.contact_info_excerpt
 
     get_contact_info.short_description = _("contact info")
     get_contact_info.allow_tags = True
@@ -264,13 +263,13 @@ class OrganizationAdmin(MembershipFilteredAdmin):
 @admin.register(models.Facility)
 class FacilityAdmin(MembershipFilteredAdmin):
     def get_description(self, obj):
-        return striptags(obj.description)
+        return obj.description_excerpt
 
     get_description.short_description = _("description")
     get_description.allow_tags = True
 
     def get_contact_info(self, obj):
-        return striptags(obj.contact_info)
+        return obj.contact_info_excerpt
 
     get_contact_info.short_description = _("contact info")
     get_contact_info.allow_tags = True
@@ -330,7 +329,7 @@ class FacilityMembershipAdmin(MembershipFilteredAdmin):
 @admin.register(models.Workplace)
 class WorkplaceAdmin(MembershipFilteredAdmin):
     def get_description(self, obj):
-        return striptags(obj.description)
+        return obj.description_excerpt
 
     get_description.short_description = _("description")
     get_description.allow_tags = True
@@ -348,7 +347,7 @@ class WorkplaceAdmin(MembershipFilteredAdmin):
 @admin.register(models.Task)
 class TaskAdmin(MembershipFilteredAdmin):
     def get_description(self, obj):
-        return striptags(obj.description)
+        return obj.description_excerpt
 
     get_description.short_description = _("description")
     get_description.allow_tags = True
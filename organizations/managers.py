@@ -1,15 +1,12 @@
-from django.db.models import Count, Manager, Q
-from django.utils import timezone
+from django.db.models import Manager
 
 
 class FacilityManager(Manager):
     def with_open_shifts(self):
-        return (
-            self.get_queryset()
-            .annotate(
-                open_shift_count=Count(
-                    "shift", filter=Q(shift__ending_time__gte=timezone.now())
-                )
+        from scheduler.models import OpenShiftRollup
+
+        return self.get_queryset().filter(
+            pk__in=OpenShiftRollup.objects.having_open_shifts(
+                OpenShiftRollup.Level.FACILITY
             )
-            .exclude(open_shift_count=0)
         )
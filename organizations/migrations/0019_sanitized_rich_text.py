@@ -0,0 +1,151 @@
+# Generated by Django 4.0.4 on 2026-10-19 14:28
+
+import common.rich_text
+from django.db import migrations, models
+
+RICH_TEXT_FIELDS = {
+    "Organization": ("description", "contact_info"),
+    "Facility": ("description", "contact_info"),
+    "Workplace": ("description",),
+    "Task": ("description",),
+}
+
+
+def sanitize_rich_text(apps, schema_editor):
+    # the sources are kept, migrating backwards just drops the copies
+    for model_name, fields in RICH_TEXT_FIELDS.items():
+        model = apps.get_model("organizations", model_name)
+        for values in model.objects.values("pk", *fields).iterator():
+            changes = {}
+            for field in fields:
+                html = common.rich_text.sanitize(values[field])
+                changes["{}_html".format(field)] = html
+                changes["{}_excerpt".format(field)] = common.rich_text.excerpt(html)
+            model.objects.filter(pk=values["pk"]).update(**changes)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("organizations", "0018_alter_ordering_by_priority"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="facility",
+            name="contact_info_excerpt",
+            field=models.CharField(blank=True, editable=False, max_length=300),
+        ),
+        migrations.AddField(
+            model_name="facility",
+            name="contact_info_html",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name="facility",
+            name="description_excerpt",
+            field=models.CharField(blank=True, editable=False, max_length=300),
+        ),
+        migrations.AddField(
+            model_name="facility",
+            name="description_html",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name="organization",
+            name="contact_info_excerpt",
+            field=models.CharField(blank=True, editable=False, max_length=300),
+        ),
+        migrations.AddField(
+            model_name="organization",
+            name="contact_info_html",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name="organization",
+            name="description_excerpt",
+            field=models.CharField(blank=True, editable=False, max_length=300),
+        ),
+        migrations.AddField(
+            model_name="organization",
+            name="description_html",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="description_excerpt",
+            field=models.CharField(blank=True, editable=False, max_length=300),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="description_html",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name="workplace",
+            name="description_excerpt",
+            field=models.CharField(blank=True, editable=False, max_length=300),
+        ),
+        migrations.AddField(
+            model_name="workplace",
+            name="description_html",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AlterField(
+            model_name="facility",
+            name="contact_info",
+            field=common.rich_text.RichTextField(
+                excerpt_field="contact_info_excerpt",
+                html_field="contact_info_html",
+                verbose_name="contact info",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="facility",
+            name="description",
+            field=common.rich_text.RichTextField(
+                excerpt_field="description_excerpt",
+                html_field="description_html",
+                verbose_name="description",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="organization",
+            name="contact_info",
+            field=common.rich_text.RichTextField(
+                excerpt_field="contact_info_excerpt",
+                html_field="contact_info_html",
+                verbose_name="contact info",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="organization",
+            name="description",
+            field=common.rich_text.RichTextField(
+                excerpt_field="description_excerpt",
+                html_field="description_html",
+                verbose_name="description",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="task",
+            name="description",
+            field=common.rich_text.RichTextField(
+                blank=True,
+                excerpt_field="description_excerpt",
+                html_field="description_html",
+                verbose_name="description",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="workplace",
+            name="description",
+            field=common.rich_text.RichTextField(
+                blank=True,
+                excerpt_field="description_excerpt",
+                html_field="description_html",
+                verbose_name="description",
+            ),
+        ),
+        migrations.RunPython(sanitize_rich_text, migrations.RunPython.noop),
+    ]
@@ -4,6 +4,7 @@ from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 
 from accounts.models import UserAccount
+from common.rich_text import EXCERPT_LENGTH, RichTextField, RichTextMixin
 from .managers import FacilityManager
 
 
@@ -66,7 +67,7 @@ class Membership(models.Model):
         abstract = True
 
 
-class Organization(models.Model):
+class Organization(RichTextMixin, models.Model):
     """Organizations organize the work at the facilities.
 
     Has fields: name, short description, description, contact info, address,
@@ -78,10 +79,28 @@ class Organization(models.Model):
     name = models.CharField(max_length=256, verbose_name=_("name"))
 
     # a description of the organization
-    description = models.TextField(verbose_name=_("description"))
+    description = RichTextField(
+        verbose_name=_("description"),
+        html_field="description_html",
+        excerpt_field="description_excerpt",
+    )
+    # sanitized when saved, see common.rich_text
+    description_html = models.TextField(blank=True, editable=False)
+    description_excerpt = models.CharField(
+        max_length=EXCERPT_LENGTH, blank=True, editable=False
+    )
 
     # anything one needs to know on how to contact the facility
-    contact_info = models.TextField(verbose_name=_("contact info"))
+    contact_info = RichTextField(
+        verbose_name=_("contact info"),
+        html_field="contact_info_html",
+        excerpt_field="contact_info_excerpt",
+    )
+    # sanitized when saved, see common.rich_text
+    contact_info_html = models.TextField(blank=True, editable=False)
+    contact_info_excerpt = models.CharField(
+        max_length=EXCERPT_LENGTH, blank=True, editable=False
+    )
 
     # the orgs address
     address = models.TextField(verbose_name=_("address"))
@@ -116,7 +135,7 @@ class Organization(models.Model):
         return reverse("organization", args=[self.slug])
 
 
-class Facility(models.Model):
+class Facility(RichTextMixin, models.Model):
     """
     Facilities are the places where the voluntary work is done.
     """
@@ -141,10 +160,28 @@ class Facility(models.Model):
     name = models.CharField(max_length=256, verbose_name=_("name"))
 
     # a description of the facility
-    description = models.TextField(verbose_name=_("description"))
+    description = RichTextField(
+        verbose_name=_("description"),
+        html_field="description_html",
+        excerpt_field="description_excerpt",
+    )
+    # sanitized when saved, see common.rich_text
+    description_html = models.TextField(blank=True, editable=False)
+    description_excerpt = models.CharField(
+        max_length=EXCERPT_LENGTH, blank=True, editable=False
+    )
 
     # anything one needs to know on how to contact the facility
-    contact_info = models.TextField(verbose_name=_("contact info"))
+    contact_info = RichTextField(
+        verbose_name=_("contact info"),
+        html_field="contact_info_html",
+        excerpt_field="contact_info_excerpt",
+    )
+    # sanitized when saved, see common.rich_text
+    contact_info_html = models.TextField(blank=True, editable=False)
+    contact_info_excerpt = models.CharField(
+        max_length=EXCERPT_LENGTH, blank=True, editable=False
+    )
 
     # users associated with this facility
     # ie. members, admins, admins
@@ -293,7 +330,7 @@ class FacilityMembership(Membership):
         return self.__unicode__()
 
 
-class Workplace(models.Model):
+class Workplace(RichTextMixin, models.Model):
     """
     Workplaces are places at the facilities, where work is done.
 
@@ -312,7 +349,17 @@ class Workplace(models.Model):
     name = models.CharField(max_length=256, verbose_name=_("name"))
 
     # a description of the workplace
-    description = models.TextField(blank=True, verbose_name=_("description"))
+    description = RichTextField(
+        blank=True,
+        verbose_name=_("description"),
+        html_field="description_html",
+        excerpt_field="description_excerpt",
+    )
+    # sanitized when saved, see common.rich_text
+    description_html = models.TextField(blank=True, editable=False)
+    description_excerpt = models.CharField(
+        max_length=EXCERPT_LENGTH, blank=True, editable=False
+    )
 
     priority = models.PositiveSmallIntegerField(
         null=True,
@@ -337,7 +384,7 @@ class Workplace(models.Model):
         return self.__unicode__()
 
 
-class Task(models.Model):
+class Task(RichTextMixin, models.Model):
     """Tasks that are to be done at the facilities.
 
     Has foreign key to facility, name and description.
@@ -352,7 +399,17 @@ class Task(models.Model):
     name = models.CharField(max_length=256, verbose_name=_("name"))
 
     # a description of the task
-    description = models.TextField(blank=True, verbose_name=_("description"))
+    description = RichTextField(
+        blank=True,
+        verbose_name=_("description"),
+        html_field="description_html",
+        excerpt_field="description_excerpt",
+    )
+    # sanitized when saved, see common.rich_text
+    description_html = models.TextField(blank=True, editable=False)
+    description_excerpt = models.CharField(
+        max_length=EXCERPT_LENGTH, blank=True, editable=False
+    )
 
     priority = models.PositiveSmallIntegerField(
         null=True,
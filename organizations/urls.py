@@ -1,5 +1,6 @@
 from django.urls import re_path
 
+from common.page_cache import cache_anonymous_page
 from .views import (
     FacilityView,
     ManageFacilityMembersView,
@@ -8,10 +9,14 @@ from .views import (
 )
 
 urlpatterns = [
-    re_path(r"^(?P<slug>[^/]+)/?$", OrganizationView.as_view(), name="organization"),
+    re_path(
+        r"^(?P<slug>[^/]+)/?$",
+        cache_anonymous_page(OrganizationView.as_view()),
+        name="organization",
+    ),
     re_path(
         r"^(?P<organization__slug>[^/]+)/(?P<slug>[^/]+)/?$",
-        FacilityView.as_view(),
+        cache_anonymous_page(FacilityView.as_view()),
         name="facility",
     ),
     re_path(
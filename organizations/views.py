@@ -9,13 +9,13 @@ from django.http import HttpResponseForbidden
 from django.template.defaultfilters import date
 from django.template.loader import get_template
 from django.urls import reverse
-from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy as _
 from django.views.generic import DetailView
 from django_ajax.decorators import ajax
 
 from organizations.admin import filter_queryset_by_membership
 from osm_tools.templatetags.osm_links import osm_search
+from places.hierarchy import get_place_hierarchy
 from scheduler.models import Shift
 from .models import Facility, FacilityMembership, Organization
 
@@ -150,6 +150,7 @@ def send_membership_approved_notification(membership, approved_by):
 
 def get_facility_details(facility):
     address_line = facility.address_line if facility.address else None
+    place = get_place_hierarchy().place(facility.place_id) or facility.place
 
     shifts_by_date = itertools.groupby(
         facility.open_shifts, lambda s: s.starting_time.date()
@@ -158,15 +159,16 @@ def get_facility_details(facility):
         "name": facility.name,
         "url": facility.get_absolute_url(),
         "news": [
-            {"title": n.title, "date": n.creation_date, "text": n.text}
+            {"title": n.title, "date": n.creation_date, "text": n.text_html}
             for n in facility.news_entries.all()
         ],
         "address_line": address_line,
-        "contact_info": facility.contact_info,
+        "contact_info": facility.contact_info_html,
         "osm_link": osm_search(address_line) if address_line else None,
-        "description": mark_safe(facility.description),
-        "area_slug": facility.place.area.slug,
-        "country_slug": facility.place.area.region.country.slug,
+        # sanitized when saved
+        "description": facility.description_html,
+        "area_slug": place.area.slug,
+        "country_slug": place.area.region.country.slug,
         "shifts": [
             {
                 "date_string": date(shift_date),
@@ -0,0 +1,130 @@
+"""
+Process local cache of the whole country → region → area → place hierarchy.
+
+The hierarchy is small and rarely changes, so instead of following foreign keys
+(and forgetting select_related somewhere), parents, breadcrumps, slugs and URLs
+of any place are looked up in memory. The cache is rebuilt in every process
+after a place model was changed (see places.signals).
+"""
+from django.urls import reverse
+
+from common.cache_versions import LocalVersionedValue
+from .models import Area, Country, Place, Region
+from .settings import PLACE_HIERARCHY_CHECK_INTERVAL
+
+CACHE_NAMESPACE = "places.hierarchy"
+
+# root first, each level's model has a foreign key to the previous one
+LEVELS = (Country, Region, Area, Place)
+
+
+class PlaceNode:
+    """
+    Lightweight, immutable stand-in for a place model instance.
+
+    Ancestors are available as attributes named like the models (e.g.
+    ``node.region.country``) and nodes compare equal to instances of the model
+    they represent, so they can be used like those in templates.
+    """
+
+    def __init__(self, model, pk, name, slug, parent=None):
+        self.model = model
+        self.pk = pk
+        self.name = name
+        self.slug = slug
+        self.parent = parent
+        self.kind = model._meta.model_name
+        self.key = "{}:{}".format(self.kind, pk)
+        self.breadcrumps = (parent.breadcrumps if parent else ()) + (self,)
+        self.slugs = tuple(node.slug for node in self.breadcrumps)
+        for ancestor in self.breadcrumps[:-1]:
+            setattr(self, ancestor.kind, ancestor)
+        self.url = reverse(model.get_detail_view_name(), args=self.slugs)
+
+    def get_absolute_url(self):
+        return self.url
+
+    def __eq__(self, other):
+        if isinstance(other, PlaceNode):
+            return self.key == other.key
+        if isinstance(other, LEVELS):
+            return isinstance(other, self.model) and other.pk == self.pk
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __str__(self):
+        return self.name
+
+    def __repr__(self):
+        return "<PlaceNode {} {}>".format(self.key, "/".join(self.slugs))
+
+
+class PlaceHierarchy:
+    def __init__(self):
+        self.nodes = {}
+        parents = {}
+        for model in LEVELS:
+            nodes = {}
+            fields = ["pk", "name", "slug"]
+            if model.PARENT_FIELD:
+                fields.append("{}_id".format(model.PARENT_FIELD))
+            for pk, name, slug, *parent_id in model._base_manager.values_list(
+                *fields
+            ).order_by("name"):
+                parent = parents[parent_id[0]] if parent_id else None
+                nodes[pk] = PlaceNode(model, pk, name, slug, parent)
+            self.nodes[model] = nodes
+            parents = nodes
+
+    def get(self, place):
+        """
+        Returns the node of ``place``, which is a place model instance (of any
+        level) or a node, or None if unknown.
+        """
+        if isinstance(place, PlaceNode):
+            return place
+        return self.get_by_pk(type(place), place.pk)
+
+    def get_by_pk(self, model, pk):
+        return self.nodes[model._meta.concrete_model].get(pk)
+
+    def place(self, pk):
+        return self.nodes[Place].get(pk)
+
+    def parent(self, place):
+        node = self.get(place)
+        return node and node.parent
+
+    def breadcrumps(self, place):
+        node = self.get(place)
+        return node.breadcrumps if node else ()
+
+    def slugs(self, place):
+        node = self.get(place)
+        return node.slugs if node else ()
+
+    def url(self, place):
+        node = self.get(place)
+        return node and node.url
+
+    def places(self, pks):
+        """
+        Returns the nodes of the places with the given primary keys, ordered by
+        country, region, area and name.
+        """
+        nodes = (self.place(pk) for pk in pks)
+        return sorted(
+            (node for node in nodes if node is not None),
+            key=lambda node: tuple(n.name for n in node.breadcrumps),
+        )
+
+
+_hierarchy = LocalVersionedValue(
+    CACHE_NAMESPACE, PlaceHierarchy, check_interval=PLACE_HIERARCHY_CHECK_INTERVAL
+)
+
+
+def get_place_hierarchy():
+    return _hierarchy.get()
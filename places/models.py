@@ -53,11 +53,25 @@ class BreadcrumpablePlaceModel(models.Model):
             select_related += cls.PARENT_MODEL.get_select_related_list(related)
         return select_related
 
-    def get_detail_view_name(self):
-        detail_view_name = getattr(self, "DETAIL_VIEW_NAME", None)
-        return detail_view_name or "{}-details".format(self._meta.model_name.lower())
+    @classmethod
+    def get_detail_view_name(cls):
+        detail_view_name = getattr(cls, "DETAIL_VIEW_NAME", None)
+        return detail_view_name or "{}-details".format(cls._meta.model_name.lower())
+
+    @property
+    def hierarchy_node(self):
+        """
+        The node of this place in the cached place hierarchy, which knows its
+        parents, breadcrumps and URL without hitting the database.
+        """
+        from .hierarchy import get_place_hierarchy
+
+        return get_place_hierarchy().get(self)
 
     def get_absolute_url(self):
+        node = self.hierarchy_node
+        if node and node.slug == self.slug:
+            return node.url
         return reverse(
             self.get_detail_view_name(), args=[o.slug for o in self.breadcrumps]
         )
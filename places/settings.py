@@ -0,0 +1,5 @@
+from django.conf import settings
+
+# seconds a process uses its place hierarchy without checking, whether it was
+# changed by another process, see places.hierarchy
+PLACE_HIERARCHY_CHECK_INTERVAL = getattr(settings, "PLACE_HIERARCHY_CHECK_INTERVAL", 5)
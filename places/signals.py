@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from common.cache_versions import bump_version_on_commit
+from .hierarchy import CACHE_NAMESPACE, LEVELS
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_place_hierarchy(sender, **kwargs):
+    if sender in LEVELS:
+        bump_version_on_commit(CACHE_NAMESPACE)
@@ -1,17 +1,12 @@
 from django import template
-from django.db.models import Count
 
-from places.models import Place
+from places.hierarchy import get_place_hierarchy
+from scheduler.models import OpenShiftRollup
 
 register = template.Library()
 
 
 @register.simple_tag
 def get_places_having_facilities():
-    places = (
-        Place.objects.annotate(facility_count=Count("facilities"))
-        .exclude(facility_count=0)
-        .order_by("area__region__country", "area__region", "area")
-    )
-
-    return places
+    place_ids = OpenShiftRollup.objects.having_facilities(OpenShiftRollup.Level.PLACE)
+    return get_place_hierarchy().places(place_ids)
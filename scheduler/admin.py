@@ -48,6 +48,7 @@ class ShiftAdminForm(forms.ModelForm):
             "starting_time",
             "ending_time",
             "members_only",
+            "queued_signup",
         ]
 
     def __init__(self, *args, **kwargs):
@@ -180,6 +181,7 @@ class ShiftAdmin(FormattedModelChoiceFieldAdminMixin, MembershipFilteredAdmin):
     list_filter = (
         ("facility", MembershipFieldListFilter),
         "members_only",
+        "queued_signup",
         "starting_time",
         "ending_time",
     )
@@ -192,6 +194,14 @@ class ShiftHelperAdmin(MembershipFilteredAdmin):
     raw_id_fields = ("user_account", "shift")
 
 
+@admin.register(models.ShiftSignupRequest)
+class ShiftSignupRequestAdmin(MembershipFilteredAdmin):
+    facility_filter_fk = "shift__facility"
+    list_display = ("id", "user_account", "shift", "status", "requested_at")
+    list_filter = ("status", "requested_at")
+    raw_id_fields = ("user_account", "shift")
+
+
 @admin.register(models.ShiftMessageToHelpers)
 class ShiftMessageToHelpersAdmin(admin.ModelAdmin):
     list_display = (
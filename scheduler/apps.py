@@ -9,3 +9,6 @@ class SchedulerConfig(AppConfig):
     def ready(self):
         # Connect signals
         from . import signals  # noqa
+
+        # Register system checks
+        from . import checks  # noqa
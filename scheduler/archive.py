@@ -0,0 +1,192 @@
+"""
+Archival of shifts which ended long ago.
+
+Nearly all queries of shifts and shift helpers are about recent or future
+shifts, yet the tables keep every shift since 2015. archive() moves shifts
+which ended more than SHIFT_ARCHIVE_AGE ago, together with their helpers and
+messages, to the ArchivedShift, ArchivedShiftHelper and
+ArchivedShiftMessageToHelpers tables, in batches of SHIFT_ARCHIVE_BATCH_SIZE
+shifts per transaction. Primary keys are kept.
+
+Archived rows are deleted without signals, as archiving is no change of the
+shifts: cached timelines and rollups of the batch's facilities are refreshed
+once per batch, the shift change log of the API records nothing.
+
+Reads spanning all shifts, like the volunteer hours or a user's past shifts,
+have to combine both tables, see get_volunteer_hours() and
+get_past_shift_helpers().
+"""
+import logging
+from datetime import timedelta
+from itertools import chain
+
+from django.db import connections, router, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from . import rollups, timeline
+from .models import (
+    ArchivedShift,
+    ArchivedShiftHelper,
+    ArchivedShiftMessageToHelpers,
+    Shift,
+    ShiftHelper,
+    ShiftMessageToHelpers,
+    ShiftSignupRequest,
+)
+from .settings import SHIFT_ARCHIVE_AGE, SHIFT_ARCHIVE_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED_MODELS = (
+    (Shift, ArchivedShift),
+    (ShiftHelper, ArchivedShiftHelper),
+    (ShiftMessageToHelpers, ArchivedShiftMessageToHelpers),
+)
+
+SHIFT_FIELDS = (
+    "id",
+    "slots",
+    "task_id",
+    "workplace_id",
+    "facility_id",
+    "starting_time",
+    "ending_time",
+    "members_only",
+)
+HELPER_FIELDS = ("id", "user_account_id", "shift_id", "joined_shift_at")
+MESSAGE_FIELDS = ("id", "message", "sender_id", "send_date", "shift_id")
+
+
+def copy(queryset, archive_model, fields):
+    archive_model.objects.bulk_create(
+        archive_model(**values) for values in queryset.values(*fields)
+    )
+
+
+def raw_delete(queryset):
+    # without the collector, no rows are fetched and no signals are sent
+    queryset._raw_delete(queryset.db)
+
+
+@transaction.atomic
+def archive_batch(ended_before, batch_size=SHIFT_ARCHIVE_BATCH_SIZE):
+    """
+    Archives up to ``batch_size`` shifts which ended before ``ended_before``,
+    returns the number of archived shifts.
+    """
+    shifts = list(
+        Shift.objects.filter(ending_time__lt=ended_before)
+        .order_by("pk")
+        .values_list("pk", "facility_id")[:batch_size]
+    )
+    if not shifts:
+        return 0
+    shift_ids = [pk for pk, _ in shifts]
+
+    messages = ShiftMessageToHelpers.objects.filter(shift_id__in=shift_ids)
+    message_ids = list(messages.values_list("pk", flat=True))
+    recipients = ShiftMessageToHelpers.recipients.through.objects.filter(
+        shiftmessagetohelpers_id__in=message_ids
+    )
+    copy(Shift.objects.filter(pk__in=shift_ids), ArchivedShift, SHIFT_FIELDS)
+    copy(
+        ShiftHelper.objects.filter(shift_id__in=shift_ids),
+        ArchivedShiftHelper,
+        HELPER_FIELDS,
+    )
+    copy(messages, ArchivedShiftMessageToHelpers, MESSAGE_FIELDS)
+    Recipients = ArchivedShiftMessageToHelpers.recipients.through
+    Recipients.objects.bulk_create(
+        Recipients(archivedshiftmessagetohelpers_id=message_id, useraccount_id=pk)
+        for message_id, pk in recipients.values_list(
+            "shiftmessagetohelpers_id", "useraccount_id"
+        )
+    )
+
+    # the shifts are moved, not deleted: no cancellation mails, no deletions
+    # in the shift change log and no per row refreshes by the signal handlers
+    raw_delete(recipients)
+    raw_delete(ShiftMessageToHelpers.objects.filter(pk__in=message_ids))
+    raw_delete(ShiftHelper.objects.filter(shift_id__in=shift_ids))
+    raw_delete(ShiftSignupRequest.objects.filter(shift_id__in=shift_ids))
+    raw_delete(Shift.objects.filter(pk__in=shift_ids))
+
+    facility_ids = {facility_id for _, facility_id in shifts}
+    timeline.invalidate(facility_ids)
+    rollups.refresh_facilities_on_commit(facility_ids)
+    return len(shift_ids)
+
+
+def archive(age=SHIFT_ARCHIVE_AGE, batch_size=SHIFT_ARCHIVE_BATCH_SIZE):
+    """
+    Archives all shifts which ended more than ``age`` ago, returns the number
+    of archived shifts.
+    """
+    ended_before = timezone.now() - age
+    archived = 0
+    while True:
+        count = archive_batch(ended_before, batch_size)
+        archived += count
+        if count < batch_size:
+            logger.info("Archived %d shifts", archived)
+            return archived
+
+
+def get_table_sizes():
+    """
+    Returns ``(table, rows, table bytes, index bytes)`` of the shift tables and
+    their archive tables. Sizes are only known on PostgreSQL, otherwise None.
+    """
+    sizes = []
+    for model in chain.from_iterable(ARCHIVED_MODELS):
+        connection = connections[router.db_for_read(model)]
+        table = model._meta.db_table
+        table_bytes = index_bytes = None
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT pg_table_size(%s), pg_indexes_size(%s)", [table, table]
+                )
+                table_bytes, index_bytes = cursor.fetchone()
+        sizes.append((table, model.objects.count(), table_bytes, index_bytes))
+    return sizes
+
+
+def get_volunteer_hours(now=None):
+    """
+    Returns the hours of all started shifts, archived or not, multiplied by
+    their numbers of helpers.
+    """
+    now = now or timezone.now()
+    delta = timedelta()
+    for model in (Shift, ArchivedShift):
+        shifts = (
+            model.objects.filter(starting_time__lte=now)
+            .annotate(slots_done=Count("helpers"))
+            .values_list("starting_time", "ending_time", "slots_done")
+            .order_by()
+        )
+        for starting_time, ending_time, slots_done in shifts:
+            delta += slots_done * (ending_time - starting_time)
+    return int(delta.total_seconds() / 3600)
+
+
+def get_past_shift_helpers(user_account, ended_before):
+    """
+    Returns the ShiftHelpers and ArchivedShiftHelpers of the user for shifts
+    which ended before ``ended_before``, latest shifts first.
+    """
+    shift_helpers = chain(
+        ShiftHelper.objects.filter(
+            user_account=user_account, shift__ending_time__lt=ended_before
+        ).select_related("shift__task", "shift__facility"),
+        ArchivedShiftHelper.objects.filter(user_account=user_account).select_related(
+            "shift__task", "shift__facility"
+        ),
+    )
+    return sorted(
+        shift_helpers,
+        key=lambda shift_helper: shift_helper.shift.starting_time,
+        reverse=True,
+    )
@@ -0,0 +1,41 @@
+"""
+System checks of the scheduler's data, run by ``migrate`` and by ``check
+--database``.
+"""
+from django.core import checks
+from django.db import DatabaseError
+from django.db.models import F
+
+from .models import Shift
+from .settings import SHIFT_MAX_DURATION
+
+
+@checks.register(checks.Tags.database)
+def check_shift_durations(app_configs, databases=None, **kwargs):
+    """
+    Warns about shifts longer than SHIFT_MAX_DURATION, which queries for shifts
+    within a time window miss. Only new and changed shifts are validated.
+    """
+    if not SHIFT_MAX_DURATION or not databases:
+        return []
+    warnings = []
+    for alias in databases:
+        too_long = Shift.objects.using(alias).filter(
+            ending_time__gt=F("starting_time") + SHIFT_MAX_DURATION
+        )
+        try:
+            count = too_long.count()
+        except DatabaseError:
+            # not migrated yet
+            continue
+        if count:
+            warnings.append(
+                checks.Warning(
+                    "{} shifts in database {} are longer than "
+                    "SHIFT_MAX_DURATION.".format(count, alias),
+                    hint="Shorten them or raise SHIFT_MAX_DURATION, queries "
+                    "for shifts within a time window miss them.",
+                    id="scheduler.W001",
+                )
+            )
+    return warnings
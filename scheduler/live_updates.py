@@ -0,0 +1,58 @@
+"""
+Live slot availability on the facility schedule page.
+
+Open schedule pages poll the current helper counts of the day's shifts every
+LIVE_UPDATES_POLL_INTERVAL seconds (see PlannerSlotsView) and update the
+displayed availability, instead of being reloaded over and over.
+
+The counts are encoded compactly as a list of
+``[shift_id, volunteer_count, slots]``.
+
+Polling must stay cheap, as every open page polls: the counts are cached per
+facility and day, keyed by the version of the facility's timeline namespace,
+which any change of the facility's shifts or their helpers bumps (see
+scheduler.timeline). The ETag is derived from that key, so pages whose counts
+did not change get a 304 response without the counts being read at all, and
+each change is read from the database once for all open pages.
+"""
+import hashlib
+
+from django.db.models import Count
+
+from common.cache_versions import get_version
+from common.stampede import get_or_recompute
+from scheduler.models import Shift
+from . import timeline
+from .settings import TIMELINE_CACHE_TIMEOUT
+
+
+def get_cache_key(facility_id, day):
+    return "slots:{}:{}:{}".format(
+        facility_id,
+        day.isoformat(),
+        get_version(timeline.get_namespace(facility_id)),
+    )
+
+
+def get_etag(cache_key):
+    return '"{}"'.format(hashlib.md5(cache_key.encode("utf-8")).hexdigest())
+
+
+def build_slot_counts(facility_id, day):
+    counts = (
+        Shift.objects.filter(facility_id=facility_id)
+        .on_shiftdate(day)
+        .annotate(volunteer_count=Count("helpers"))
+        .values_list("pk", "volunteer_count", "slots")
+        .order_by("pk")
+    )
+    return [list(c) for c in counts]
+
+
+def get_slot_counts(facility_id, day, cache_key=None):
+    cache_key = cache_key or get_cache_key(facility_id, day)
+    return get_or_recompute(
+        cache_key,
+        lambda: build_slot_counts(facility_id, day),
+        TIMELINE_CACHE_TIMEOUT,
+    )
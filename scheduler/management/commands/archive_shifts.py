@@ -0,0 +1,49 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.template.defaultfilters import filesizeformat
+
+from scheduler import archive
+from scheduler.settings import SHIFT_ARCHIVE_AGE, SHIFT_ARCHIVE_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = (  # noqa: A003
+        "Moves shifts which ended long ago, with their helpers and messages, to "
+        "the archive tables and shows the table sizes before and after"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--age",
+            type=int,
+            default=SHIFT_ARCHIVE_AGE.days,
+            help="Archive shifts which ended more than this many days ago",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=SHIFT_ARCHIVE_BATCH_SIZE,
+            help="Number of shifts archived per transaction",
+        )
+
+    def write_table_sizes(self, title):
+        self.stdout.write(title)
+        for table, rows, table_bytes, index_bytes in archive.get_table_sizes():
+            sizes = ""
+            if table_bytes is not None:
+                sizes = ", {} table, {} indexes".format(
+                    filesizeformat(table_bytes), filesizeformat(index_bytes)
+                )
+            self.stdout.write("  {}: {} rows{}".format(table, rows, sizes))
+
+    def handle(self, *args, **options):
+        if options["age"] < 1 or options["batch_size"] < 1:
+            raise CommandError("Age and batch size must be positive")
+
+        self.write_table_sizes("Before:")
+        archived = archive.archive(
+            age=timedelta(days=options["age"]), batch_size=options["batch_size"]
+        )
+        self.stdout.write("Archived {} shifts".format(archived))
+        self.write_table_sizes("After:")
@@ -0,0 +1,178 @@
+import random
+import statistics
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+from scheduler import partitions
+
+PLAIN_TABLE = "benchmark_shift_plain"
+PARTITIONED_TABLE = "benchmark_shift_partitioned"
+
+COLUMNS = """
+    id bigint NOT NULL,
+    facility_id integer NOT NULL,
+    slots integer NOT NULL,
+    starting_time timestamptz NOT NULL,
+    ending_time timestamptz NOT NULL
+"""
+
+# the shifts of a facility on a day, see ShiftQuerySet.on_shiftdate
+DAY_QUERY = (
+    "SELECT count(*) FROM {table} WHERE facility_id = %(facility)s "
+    "AND ending_time >= %(start)s AND starting_time < %(end)s{bound}"
+)
+# all open shifts, see OpenShiftManager
+OPEN_QUERY = "SELECT count(*) FROM {table} WHERE ending_time >= %(start)s{bound}"
+LOWER_BOUND = " AND starting_time >= %(bound)s"
+
+
+def scanned_relations(plan):
+    """Returns the names of the tables scanned by a (JSON) query plan."""
+    relations = set()
+    if "Relation Name" in plan:
+        relations.add(plan["Relation Name"])
+    for subplan in plan.get("Plans", ()):
+        relations |= scanned_relations(subplan)
+    return relations
+
+
+class Command(BaseCommand):
+    help = (  # noqa: A003
+        "Compares date window queries of a plain and a partitioned shift table "
+        "with generated shifts (PostgreSQL only)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--shifts",
+            type=int,
+            default=10_000_000,
+            help="Number of generated shifts",
+        )
+        parser.add_argument(
+            "--years",
+            type=int,
+            default=8,
+            help="Number of years the shifts are spread over, up to now",
+        )
+        parser.add_argument(
+            "--facilities", type=int, default=1000, help="Number of facilities"
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=20, help="Number of runs per query"
+        )
+        parser.add_argument(
+            "--keep", action="store_true", help="Keep the generated tables"
+        )
+
+    def handle(self, *args, **options):
+        connection = connections["default"]
+        if connection.vendor != "postgresql":
+            raise CommandError("The benchmark requires PostgreSQL")
+
+        now = timezone.localtime()
+        first = now - timedelta(days=365 * options["years"])
+        with connection.cursor() as cursor:
+            self.create_tables(cursor, first, now, options)
+            try:
+                for title, query in (
+                    ("Shifts of a facility's day", DAY_QUERY),
+                    ("Open shifts", OPEN_QUERY),
+                ):
+                    self.stdout.write(title)
+                    for bound in ("", LOWER_BOUND):
+                        self.stdout.write(
+                            "  with lower bound" if bound else "  without lower bound"
+                        )
+                        for table in (PLAIN_TABLE, PARTITIONED_TABLE):
+                            self.run_query(
+                                cursor,
+                                query.format(table=table, bound=bound),
+                                table,
+                                first,
+                                now,
+                                options,
+                            )
+            finally:
+                if not options["keep"]:
+                    cursor.execute(
+                        "DROP TABLE IF EXISTS {}, {}".format(
+                            PLAIN_TABLE, PARTITIONED_TABLE
+                        )
+                    )
+
+    def create_tables(self, cursor, first, now, options):
+        self.stdout.write(
+            "Generating {} shifts, this takes a while".format(options["shifts"])
+        )
+        cursor.execute(
+            "DROP TABLE IF EXISTS {}, {}".format(PLAIN_TABLE, PARTITIONED_TABLE)
+        )
+        cursor.execute(
+            "CREATE TABLE {} ({}, PRIMARY KEY (id))".format(PLAIN_TABLE, COLUMNS)
+        )
+        cursor.execute(
+            "CREATE TABLE {} ({}, PRIMARY KEY (id, starting_time)) "
+            "PARTITION BY RANGE (starting_time)".format(PARTITIONED_TABLE, COLUMNS)
+        )
+        # up to the end of the month of the open shifts (three months ahead)
+        last = now
+        for _month in range(3):
+            last = partitions.next_month(last)
+        for month in partitions.months(first, last):
+            cursor.execute(
+                "CREATE TABLE {}_p{:04d}_{:02d} PARTITION OF {} "
+                "FOR VALUES FROM (%s) TO (%s)".format(
+                    PARTITIONED_TABLE, month.year, month.month, PARTITIONED_TABLE
+                ),
+                [month, partitions.next_month(month)],
+            )
+        # evenly spread shifts of four hours, the last ones in the future
+        cursor.execute(
+            "INSERT INTO {} "
+            "SELECT i, i %% %s, 5, "
+            "%s + (%s - %s) * (i::float8 / %s), "
+            "%s + (%s - %s) * (i::float8 / %s) + interval '4 hours' "
+            "FROM generate_series(1, %s) AS i".format(PLAIN_TABLE),
+            [options["facilities"]]
+            + [first, now + timedelta(days=60), first, options["shifts"]] * 2
+            + [options["shifts"]],
+        )
+        cursor.execute(
+            "INSERT INTO {} SELECT * FROM {}".format(PARTITIONED_TABLE, PLAIN_TABLE)
+        )
+        for table in (PLAIN_TABLE, PARTITIONED_TABLE):
+            for column in partitions.INDEXED_COLUMNS[:3]:
+                cursor.execute(
+                    "CREATE INDEX {0}_{1}_idx ON {0} ({1})".format(table, column)
+                )
+            cursor.execute("ANALYZE {}".format(table))
+
+    def run_query(self, cursor, sql, table, first, now, options):
+        durations = []
+        scanned = set()
+        for _run in range(options["repeat"]):
+            day = first + (now - first) * random.random()
+            day = day.replace(hour=0, minute=0, second=0, microsecond=0)
+            params = {
+                "facility": random.randrange(options["facilities"]),
+                "start": day,
+                "end": day + timedelta(days=1),
+                # SHIFT_MAX_DURATION of a day
+                "bound": day - timedelta(days=1),
+            }
+            if "facility_id" not in sql:
+                params["start"] = now
+                params["bound"] = now - timedelta(days=1)
+            cursor.execute("EXPLAIN (ANALYZE, FORMAT JSON) " + sql, params)
+            (result,) = cursor.fetchone()
+            durations.append(result[0]["Execution Time"])
+            scanned = scanned_relations(result[0]["Plan"])
+        self.stdout.write(
+            "    {}: median {:.2f} ms, max {:.2f} ms, {} table(s) scanned".format(
+                table, statistics.median(durations), max(durations), len(scanned)
+            )
+        )
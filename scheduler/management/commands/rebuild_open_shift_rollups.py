@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from scheduler import rollups
+from scheduler.models import OpenShiftRollup
+
+
+class Command(BaseCommand):
+    help = (  # noqa: A003
+        "Recomputes the open shift rollups of all facilities and places"
+    )
+
+    def handle(self, *args, **options):
+        rollups.refresh_all()
+        self.stdout.write(
+            "Rebuilt {} open shift rollups".format(OpenShiftRollup.objects.count())
+        )
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import NotSupportedError
+from django.utils import timezone
+
+from scheduler import partitions
+from scheduler.settings import SHIFT_ARCHIVE_AGE, SHIFT_PARTITIONS_AHEAD
+
+
+class Command(BaseCommand):
+    help = (  # noqa: A003
+        "Creates the partitions of the shift table for the coming months and "
+        "drops empty partitions of archived months (PostgreSQL only)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--convert",
+            action="store_true",
+            help="Replace the shift table by a table partitioned by month first",
+        )
+        parser.add_argument(
+            "--ahead",
+            type=int,
+            default=SHIFT_PARTITIONS_AHEAD,
+            help="Number of months to create partitions for in advance",
+        )
+        parser.add_argument(
+            "--drop-empty",
+            action="store_true",
+            help="Detach and drop empty partitions of archived months",
+        )
+
+    def handle(self, *args, **options):
+        if options["convert"]:
+            try:
+                partitions.convert()
+            except NotSupportedError as e:
+                raise CommandError(e)
+            self.stdout.write("Partitioned the shift table")
+        elif not partitions.is_partitioned():
+            raise CommandError(
+                "The shift table is not partitioned, see --convert (PostgreSQL only)"
+            )
+
+        for name in partitions.ensure_partitions(ahead=options["ahead"]):
+            self.stdout.write("Created {}".format(name))
+        if options["drop_empty"]:
+            before = timezone.now() - SHIFT_ARCHIVE_AGE
+            for name in partitions.drop_partitions(before):
+                self.stdout.write("Dropped {}".format(name))
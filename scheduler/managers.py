@@ -1,11 +1,24 @@
 from datetime import datetime, time, timedelta
 
-from django.db import models
+from django.db import connections, models
+from django.db.models import ExpressionWrapper, Q
+from django.db.models.expressions import RawSQL
 from django.utils import timezone
 from django.utils.timezone import get_current_timezone
 
 from places import models as place_models
-from .settings import DEFAULT_SHIFT_CONFLICT_GRACE
+from .settings import DEFAULT_SHIFT_CONFLICT_GRACE, SHIFT_MAX_DURATION
+
+
+def overlapping(start, end=None):
+    """Lookups of shifts overlapping the time from start to end (if any)."""
+    lookups = {"ending_time__gte": start}
+    if end is not None:
+        lookups["starting_time__lt"] = end
+    if SHIFT_MAX_DURATION:
+        # redundant, but lets partitioned tables skip older partitions
+        lookups["starting_time__gte"] = start - SHIFT_MAX_DURATION
+    return lookups
 
 
 class ShiftQuerySet(models.QuerySet):
@@ -19,8 +32,18 @@ class ShiftQuerySet(models.QuerySet):
         shiftdate.
         """
         shiftdate = datetime.combine(shiftdate, time(tzinfo=get_current_timezone()))
+        return self.filter(**overlapping(shiftdate, shiftdate + timedelta(days=1)))
+
+    def on_shiftdates(self, first_date, last_date):
+        """Shifts that intersect with any day from first_date to last_date
+        (inclusive).
+        """
+        tzinfo = get_current_timezone()
         return self.filter(
-            ending_time__gte=shiftdate, starting_time__lt=shiftdate + timedelta(days=1)
+            **overlapping(
+                datetime.combine(first_date, time(tzinfo=tzinfo)),
+                datetime.combine(last_date + timedelta(days=1), time(tzinfo=tzinfo)),
+            )
         )
 
     def at_place(self, place):
@@ -57,7 +80,7 @@ class ShiftQuerySet(models.QuerySet):
             return self.in_country(geo_affiliation)
 
     def open(self):  # noqa: A003
-        return self.filter(ending_time__gte=timezone.now())
+        return self.filter(**overlapping(timezone.now()))
 
 
 # Create manager from custom QuerySet ShiftQuerySet
@@ -73,24 +96,18 @@ class OpenShiftManager(ShiftManager):
         return (
             super(OpenShiftManager, self)
             .get_queryset()
-            .filter(ending_time__gte=timezone.now())
+            .filter(**overlapping(timezone.now()))
         )
 
 
 class ShiftHelperManager(models.Manager):
-    """Manager for ShiftHelper. Defines one method for filtering the
-    QuerySet on conflicting shifts.
+    """Manager for ShiftHelper. Defines methods for filtering the QuerySet on
+    conflicting shifts.
     """
 
-    def conflicting(self, shift, user_account=None, grace=DEFAULT_SHIFT_CONFLICT_GRACE):
-        """Filters QuerySet of ShiftHelper objects by selecting those that
-        intersect with respect to time.
-
-        :param shift
-        :param user_account - default is None (-Does a default value for
-                user make sense in that connection?)
-        :param grace - some "buffer" which reduces the time of the shift.
-                default is 1 hour
+    def _conflicts(self, shift, user_account, grace):
+        """Returns the shift helpers whose shifts overlap with ``shift`` and
+        the condition of hard conflicts, see conflicting().
         """
         grace = grace or timedelta(0)
 
@@ -115,11 +132,76 @@ class ShiftHelperManager(models.Manager):
             shift__ending_time__gte=shift.ending_time,
         )
 
-        hard_conflict_query_set = query_set.exclude(
-            shift__starting_time__lt=graced_start, shift__ending_time__lte=graced_start
+        if connections[self.db].vendor == "postgresql":
+            # the periods of the helpers' shifts are kept by the database (see
+            # migration 0045), the overlap with the graced period of the new
+            # shift is an index probe, followed by the exact check below
+            hard_conflict = RawSQL(
+                "{table}.period && tstzrange(%s, %s, '[]')"
+                " AND lower({table}.period) < %s"
+                " AND upper({table}.period) > %s".format(
+                    table=self.model._meta.db_table
+                ),
+                (graced_start, graced_end, graced_end, graced_start),
+                output_field=models.BooleanField(),
+            )
+        else:
+            hard_conflict = ExpressionWrapper(
+                ~Q(
+                    shift__starting_time__lt=graced_start,
+                    shift__ending_time__lte=graced_start,
+                )
+                & ~Q(
+                    shift__starting_time__gte=graced_end,
+                    shift__ending_time__gte=graced_end,
+                ),
+                output_field=models.BooleanField(),
+            )
+
+        return soft_conflict_query_set, hard_conflict
+
+    def conflicting(self, shift, user_account=None, grace=DEFAULT_SHIFT_CONFLICT_GRACE):
+        """Filters QuerySet of ShiftHelper objects by selecting those that
+        intersect with respect to time.
+
+        :param shift
+        :param user_account - default is None (-Does a default value for
+                user make sense in that connection?)
+        :param grace - some "buffer" which reduces the time of the shift.
+                default is 1 hour
+
+        On PostgreSQL, the database also rejects shift helpers with hard
+        conflicts, see migration 0045_shifthelper_period.
+        """
+        soft_conflict_query_set, hard_conflict = self._conflicts(
+            shift, user_account, grace
         )
-        hard_conflict_query_set = hard_conflict_query_set.exclude(
-            shift__starting_time__gte=graced_end, shift__ending_time__gte=graced_end
+        hard_conflict_query_set = soft_conflict_query_set.filter(hard_conflict)
+        return hard_conflict_query_set, soft_conflict_query_set
+
+    def conflicts(self, shift, user_account=None, grace=DEFAULT_SHIFT_CONFLICT_GRACE):
+        """Like conflicting(), but returns the soft conflicts only, each
+        annotated with ``hard_conflict``, so both are read with a single
+        query.
+        """
+        soft_conflict_query_set, hard_conflict = self._conflicts(
+            shift, user_account, grace
         )
+        return soft_conflict_query_set.annotate(hard_conflict=hard_conflict)
 
-        return hard_conflict_query_set, soft_conflict_query_set
+
+class OpenShiftRollupManager(models.Manager):
+    """Manager for OpenShiftRollup. Defines lookups of the ids of objects
+    (facilities, places, ...) with facilities or open shifts.
+    """
+
+    def object_ids(self, level, **filters):
+        return self.filter(level=level, **filters).values_list("object_id", flat=True)
+
+    def having_facilities(self, level):
+        return self.object_ids(level, facility_count__gt=0)
+
+    def having_open_shifts(self, level):
+        return self.object_ids(
+            level, open_shift_count__gt=0, last_expiry__gte=timezone.now()
+        )
@@ -0,0 +1,73 @@
+# Generated by Django 4.0.4 on 2026-10-19 13:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("scheduler", "0042_change_shiftmessages_shift_cascade_delete"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OpenShiftRollup",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "level",
+                    models.CharField(
+                        choices=[
+                            ("facility", "facility"),
+                            ("place", "place"),
+                            ("area", "area"),
+                            ("region", "region"),
+                            ("country", "country"),
+                        ],
+                        max_length=10,
+                        verbose_name="level",
+                    ),
+                ),
+                ("object_id", models.PositiveIntegerField(verbose_name="object id")),
+                (
+                    "facility_count",
+                    models.PositiveIntegerField(default=0, verbose_name="facilities"),
+                ),
+                (
+                    "open_shift_count",
+                    models.PositiveIntegerField(default=0, verbose_name="open shifts"),
+                ),
+                (
+                    "open_slot_count",
+                    models.PositiveIntegerField(default=0, verbose_name="open slots"),
+                ),
+                (
+                    "next_expiry",
+                    models.DateTimeField(
+                        db_index=True, null=True, verbose_name="next expiry"
+                    ),
+                ),
+                (
+                    "last_expiry",
+                    models.DateTimeField(null=True, verbose_name="last expiry"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="updated"),
+                ),
+            ],
+            options={
+                "verbose_name": "open shift rollup",
+                "verbose_name_plural": "open shift rollups",
+                "unique_together": {("level", "object_id")},
+            },
+        ),
+    ]
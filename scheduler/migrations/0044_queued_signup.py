@@ -0,0 +1,89 @@
+# Generated by Django 4.0.4 on 2026-10-19 13:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+        ("scheduler", "0043_open_shift_rollup"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="shift",
+            name="queued_signup",
+            field=models.BooleanField(
+                default=False,
+                help_text="confirm sign-ups in order of arrival",
+                verbose_name="queued sign-up",
+            ),
+        ),
+        migrations.CreateModel(
+            name="ShiftSignupRequest",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.PositiveSmallIntegerField(
+                        choices=[
+                            (0, "pending"),
+                            (1, "confirmed"),
+                            (2, "rejected, shift covered"),
+                            (3, "rejected, conflicting shifts"),
+                        ],
+                        default=0,
+                        verbose_name="status",
+                    ),
+                ),
+                ("requested_at", models.DateTimeField(verbose_name="requested")),
+                (
+                    "processed_at",
+                    models.DateTimeField(null=True, verbose_name="processed"),
+                ),
+                (
+                    "shift",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="signup_requests",
+                        to="scheduler.shift",
+                        verbose_name="shift",
+                    ),
+                ),
+                (
+                    "user_account",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="shift_signup_requests",
+                        to="accounts.useraccount",
+                        verbose_name="user account",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "shift sign-up request",
+                "verbose_name_plural": "shift sign-up requests",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="shiftsignuprequest",
+            index=models.Index(
+                fields=["shift", "status", "requested_at"],
+                name="scheduler_s_shift_i_e36be6_idx",
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="shiftsignuprequest",
+            unique_together={("user_account", "shift")},
+        ),
+    ]
@@ -0,0 +1,142 @@
+"""
+PostgreSQL only: stores the period of the helper's shift on ShiftHelper and
+makes the database itself reject hard conflicts, even of concurrent sign-ups.
+The periods are maintained by triggers, not by Django. On other databases,
+conflicts are only checked by ShiftHelperManager.conflicting.
+
+The check is the one of ShiftHelperManager.conflicting: the new shift,
+shortened by the grace at both ends (half its duration for short shifts), must
+not overlap the unshortened periods of the user's other shifts. As that is not
+symmetric, it cannot be an exclusion constraint. A trigger checks it when a
+helper is added (or moved to another shift), serialized per user account by an
+advisory lock, so concurrent sign-ups see each other. Moving a shift's times
+updates the periods of its helpers, but is not checked, like in Django.
+
+The grace is DEFAULT_SHIFT_CONFLICT_GRACE at the time of migrating.
+"""
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations
+
+from scheduler.settings import DEFAULT_SHIFT_CONFLICT_GRACE
+
+GRACE = "interval '{} seconds'".format(
+    int(DEFAULT_SHIFT_CONFLICT_GRACE.total_seconds())
+)
+
+FORWARDS_SQL = [
+    "ALTER TABLE scheduler_shifthelper ADD COLUMN period tstzrange",
+    """
+    CREATE INDEX scheduler_shifthelper_user_period
+    ON scheduler_shifthelper USING gist (user_account_id, period)
+    """,
+    """
+    CREATE FUNCTION scheduler_shifthelper_check_conflicts()
+    RETURNS trigger AS $$
+    DECLARE
+        shift record;
+        grace interval := {grace};
+        graced_start timestamptz;
+        graced_end timestamptz;
+    BEGIN
+        SELECT starting_time, ending_time INTO shift
+        FROM scheduler_shift WHERE id = NEW.shift_id;
+        NEW.period := tstzrange(shift.starting_time, shift.ending_time);
+
+        -- same correction for short shifts as ShiftHelperManager.conflicting
+        IF shift.ending_time - shift.starting_time <= grace THEN
+            grace := (shift.ending_time - shift.starting_time) / 2;
+        END IF;
+        graced_start := shift.starting_time + grace;
+        graced_end := shift.ending_time - grace;
+
+        -- until the end of the transaction, so concurrent sign-ups of the
+        -- user wait for this one and see it
+        PERFORM pg_advisory_xact_lock(
+            hashtext('scheduler_shifthelper'), NEW.user_account_id
+        );
+        IF EXISTS (
+            SELECT 1 FROM scheduler_shifthelper
+            WHERE user_account_id = NEW.user_account_id
+            AND id <> NEW.id
+            -- the index probe, the exact check follows
+            AND period && tstzrange(graced_start, graced_end, '[]')
+            AND lower(period) < graced_end
+            AND upper(period) > graced_start
+        ) THEN
+            RAISE EXCEPTION 'conflicting shift helper'
+            USING ERRCODE = 'exclusion_violation',
+                CONSTRAINT = 'scheduler_shifthelper_no_conflicts';
+        END IF;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """.format(
+        grace=GRACE
+    ),
+    """
+    CREATE TRIGGER scheduler_shifthelper_check_conflicts
+    BEFORE INSERT OR UPDATE OF shift_id ON scheduler_shifthelper
+    FOR EACH ROW EXECUTE PROCEDURE scheduler_shifthelper_check_conflicts()
+    """,
+    """
+    CREATE FUNCTION scheduler_shift_update_periods()
+    RETURNS trigger AS $$
+    BEGIN
+        UPDATE scheduler_shifthelper
+        SET period = tstzrange(NEW.starting_time, NEW.ending_time)
+        WHERE shift_id = NEW.id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER scheduler_shift_periods
+    AFTER UPDATE OF starting_time, ending_time ON scheduler_shift
+    FOR EACH ROW
+    WHEN (
+        OLD.starting_time IS DISTINCT FROM NEW.starting_time
+        OR OLD.ending_time IS DISTINCT FROM NEW.ending_time
+    )
+    EXECUTE PROCEDURE scheduler_shift_update_periods()
+    """,
+    # existing helpers are not checked, so old conflicts cannot fail migrating
+    """
+    UPDATE scheduler_shifthelper AS helper
+    SET period = tstzrange(shift.starting_time, shift.ending_time)
+    FROM scheduler_shift AS shift
+    WHERE shift.id = helper.shift_id
+    """,
+]
+
+BACKWARDS_SQL = [
+    "DROP TRIGGER scheduler_shift_periods ON scheduler_shift",
+    "DROP FUNCTION scheduler_shift_update_periods()",
+    "DROP TRIGGER scheduler_shifthelper_check_conflicts ON scheduler_shifthelper",
+    "DROP FUNCTION scheduler_shifthelper_check_conflicts()",
+    "ALTER TABLE scheduler_shifthelper DROP COLUMN period",
+]
+
+
+def run_on_postgresql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for sql in statements:
+            schema_editor.execute(sql, params=None)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("scheduler", "0044_queued_signup"),
+    ]
+
+    operations = [
+        # for user accounts in the GiST index
+        BtreeGistExtension(),
+        migrations.RunPython(
+            run_on_postgresql(FORWARDS_SQL), run_on_postgresql(BACKWARDS_SQL)
+        ),
+    ]
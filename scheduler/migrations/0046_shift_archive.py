@@ -0,0 +1,143 @@
+# Generated by Django 4.0.4 on 2026-10-19 13:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+        ("organizations", "0018_alter_ordering_by_priority"),
+        ("scheduler", "0045_shifthelper_period"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedShift",
+            fields=[
+                ("id", models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ("slots", models.PositiveIntegerField(verbose_name="slots")),
+                ("starting_time", models.DateTimeField(verbose_name="starting time")),
+                ("ending_time", models.DateTimeField(verbose_name="ending time")),
+                (
+                    "members_only",
+                    models.BooleanField(default=False, verbose_name="members only"),
+                ),
+                (
+                    "archived_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="archived"),
+                ),
+                (
+                    "facility",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="+",
+                        to="organizations.facility",
+                        verbose_name="facility",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "archived shift",
+                "verbose_name_plural": "archived shifts",
+                "ordering": ["starting_time", "ending_time"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedShiftMessageToHelpers",
+            fields=[
+                ("id", models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ("message", models.TextField(verbose_name="Message")),
+                ("send_date", models.DateTimeField(verbose_name="send date")),
+                (
+                    "recipients",
+                    models.ManyToManyField(
+                        related_name="+",
+                        to="accounts.useraccount",
+                        verbose_name="recipients",
+                    ),
+                ),
+                (
+                    "sender",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="accounts.useraccount",
+                        verbose_name="sender",
+                    ),
+                ),
+                (
+                    "shift",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="scheduler.archivedshift",
+                        verbose_name="Shift",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "archived shift notification",
+                "verbose_name_plural": "archived shift notifications",
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedShiftHelper",
+            fields=[
+                ("id", models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ("joined_shift_at", models.DateTimeField()),
+                (
+                    "shift",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="shift_helpers",
+                        to="scheduler.archivedshift",
+                    ),
+                ),
+                (
+                    "user_account",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_shift_helpers",
+                        to="accounts.useraccount",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "archived shift helper",
+                "verbose_name_plural": "archived shift helpers",
+            },
+        ),
+        migrations.AddField(
+            model_name="archivedshift",
+            name="helpers",
+            field=models.ManyToManyField(
+                related_name="archived_shifts",
+                through="scheduler.ArchivedShiftHelper",
+                to="accounts.useraccount",
+            ),
+        ),
+        migrations.AddField(
+            model_name="archivedshift",
+            name="task",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="organizations.task",
+                verbose_name="task",
+            ),
+        ),
+        migrations.AddField(
+            model_name="archivedshift",
+            name="workplace",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="organizations.workplace",
+                verbose_name="workplace",
+            ),
+        ),
+    ]
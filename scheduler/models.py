@@ -1,6 +1,7 @@
 import logging
 from datetime import time
 
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
 from django.db import models
 from django.urls import reverse
@@ -9,6 +10,7 @@ from django.utils.timezone import get_current_timezone, localtime
 from django.utils.translation import gettext_lazy as _, ngettext_lazy
 
 from . import managers
+from .settings import SHIFT_MAX_DURATION
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +32,8 @@ class Shift(models.Model):
         helpers - many2many to accounts-UserAccount, realized through
             ShiftHelper
         members_only - if only members are allowed to help
+        queued_signup - if sign-ups are queued and confirmed in order of
+            arrival (see signup_queue)
 
     The manager is extended via managers.ShiftManager.
     A second manager open_shifts is set to managers.OpenShiftManager.
@@ -78,6 +82,12 @@ class Shift(models.Model):
         help_text=_("allow only members to help"),
     )
 
+    queued_signup = models.BooleanField(
+        default=False,
+        verbose_name=_("queued sign-up"),
+        help_text=_("confirm sign-ups in order of arrival"),
+    )
+
     objects = managers.ShiftManager()
     open_shifts = managers.OpenShiftManager()
 
@@ -94,6 +104,29 @@ class Shift(models.Model):
     def duration(self):
         return self.ending_time - self.starting_time
 
+    def validate_duration(self):
+        """
+        Raises ValidationError, if the shift is longer than SHIFT_MAX_DURATION.
+        Queries for shifts within a time window would miss it (see
+        scheduler.managers.overlapping).
+        """
+        if (
+            SHIFT_MAX_DURATION
+            and self.starting_time
+            and self.ending_time
+            and self.duration > SHIFT_MAX_DURATION
+        ):
+            raise ValidationError({"ending_time": _("Shift is too long.")})
+
+    def clean(self):
+        super(Shift, self).clean()
+        self.validate_duration()
+
+    def save(self, *args, **kwargs):
+        # shifts are not only created by forms (e.g. from schedule templates)
+        self.validate_duration()
+        super(Shift, self).save(*args, **kwargs)
+
     @property
     def localized_display_ending_time(self):
         days = self.days if self.ending_time.time() > time.min else 0
@@ -165,6 +198,54 @@ class ShiftHelper(models.Model):
         return self.__unicode__()
 
 
+class ShiftSignupRequest(models.Model):
+    """
+    A user's request to join a shift with queued sign-up. Pending requests of
+    a shift are processed in order of arrival by scheduler.signup_queue, which
+    adds the user to the shift (confirmed) or rejects the request, if the
+    shift is covered already or conflicts with the user's other shifts.
+    """
+
+    class Status:
+        PENDING, CONFIRMED, COVERED, CONFLICTING = 0, 1, 2, 3
+        CHOICES = (
+            (PENDING, _("pending")),
+            (CONFIRMED, _("confirmed")),
+            (COVERED, _("rejected, shift covered")),
+            (CONFLICTING, _("rejected, conflicting shifts")),
+        )
+
+    user_account = models.ForeignKey(
+        "accounts.UserAccount",
+        models.CASCADE,
+        related_name="shift_signup_requests",
+        verbose_name=_("user account"),
+    )
+    shift = models.ForeignKey(
+        "scheduler.Shift",
+        models.CASCADE,
+        related_name="signup_requests",
+        verbose_name=_("shift"),
+    )
+    status = models.PositiveSmallIntegerField(
+        choices=Status.CHOICES, default=Status.PENDING, verbose_name=_("status")
+    )
+    requested_at = models.DateTimeField(verbose_name=_("requested"))
+    processed_at = models.DateTimeField(null=True, verbose_name=_("processed"))
+
+    class Meta:
+        verbose_name = _("shift sign-up request")
+        verbose_name_plural = _("shift sign-up requests")
+        unique_together = ("user_account", "shift")
+        indexes = [models.Index(fields=["shift", "status", "requested_at"])]
+
+    def __unicode__(self):
+        return "{} for {}".format(self.user_account.user.username, self.shift.task)
+
+    def __str__(self):
+        return self.__unicode__()
+
+
 class ShiftMessageToHelpers(models.Model):
     """
     The ShiftMessageToHelpers represents a message to be sent to the helpers
@@ -198,3 +279,168 @@ class ShiftMessageToHelpers(models.Model):
 
     def __str__(self):
         return "{} on {}".format(self.sender.user.email, self.shift.task)
+
+
+class OpenShiftRollup(models.Model):
+    """
+    Precomputed numbers of facilities, open shifts and open slots per facility,
+    place, area, region and country, maintained by scheduler.rollups.
+
+    Counts are refreshed whenever shifts, their helpers or facilities change
+    and periodically, when open shifts ended (see ``next_expiry``). As
+    ``last_expiry`` is the ending time of the last open shift, rows with
+    ``last_expiry`` in the past have no open shifts left, even if they were not
+    refreshed yet.
+    """
+
+    class Level:
+        FACILITY, PLACE, AREA, REGION, COUNTRY = (
+            "facility",
+            "place",
+            "area",
+            "region",
+            "country",
+        )
+        CHOICES = (
+            (FACILITY, _("facility")),
+            (PLACE, _("place")),
+            (AREA, _("area")),
+            (REGION, _("region")),
+            (COUNTRY, _("country")),
+        )
+
+    level = models.CharField(
+        max_length=10, choices=Level.CHOICES, verbose_name=_("level")
+    )
+    object_id = models.PositiveIntegerField(verbose_name=_("object id"))
+
+    facility_count = models.PositiveIntegerField(
+        default=0, verbose_name=_("facilities")
+    )
+    open_shift_count = models.PositiveIntegerField(
+        default=0, verbose_name=_("open shifts")
+    )
+    open_slot_count = models.PositiveIntegerField(
+        default=0, verbose_name=_("open slots")
+    )
+
+    next_expiry = models.DateTimeField(
+        null=True, db_index=True, verbose_name=_("next expiry")
+    )
+    last_expiry = models.DateTimeField(null=True, verbose_name=_("last expiry"))
+
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("updated"))
+
+    objects = managers.OpenShiftRollupManager()
+
+    class Meta:
+        verbose_name = _("open shift rollup")
+        verbose_name_plural = _("open shift rollups")
+        unique_together = ("level", "object_id")
+
+    def __unicode__(self):
+        return "{} {}: {} open shifts".format(
+            self.level, self.object_id, self.open_shift_count
+        )
+
+    def __str__(self):
+        return self.__unicode__()
+
+
+class ArchivedShift(models.Model):
+    """
+    A shift that ended long ago, moved out of the Shift table by
+    scheduler.archive. Keeps the primary key and the fields of the shift, its
+    helpers and messages are archived along with it.
+    """
+
+    id = models.PositiveIntegerField(primary_key=True)  # noqa: A003
+    slots = models.PositiveIntegerField(verbose_name=_("slots"))
+    task = models.ForeignKey(
+        "organizations.Task", models.PROTECT, related_name="+", verbose_name=_("task")
+    )
+    workplace = models.ForeignKey(
+        "organizations.Workplace",
+        models.PROTECT,
+        related_name="+",
+        verbose_name=_("workplace"),
+        null=True,
+        blank=True,
+    )
+    facility = models.ForeignKey(
+        "organizations.Facility",
+        models.PROTECT,
+        related_name="+",
+        verbose_name=_("facility"),
+    )
+    starting_time = models.DateTimeField(verbose_name=_("starting time"))
+    ending_time = models.DateTimeField(verbose_name=_("ending time"))
+    members_only = models.BooleanField(default=False, verbose_name=_("members only"))
+    helpers = models.ManyToManyField(
+        "accounts.UserAccount",
+        through="ArchivedShiftHelper",
+        related_name="archived_shifts",
+    )
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name=_("archived"))
+
+    class Meta:
+        verbose_name = _("archived shift")
+        verbose_name_plural = _("archived shifts")
+        ordering = ["starting_time", "ending_time"]
+
+    def __unicode__(self):
+        return Shift.__unicode__(self)
+
+    def __str__(self):
+        return self.__unicode__()
+
+
+class ArchivedShiftHelper(models.Model):
+    """A ShiftHelper of an archived shift, see ArchivedShift."""
+
+    id = models.PositiveIntegerField(primary_key=True)  # noqa: A003
+    user_account = models.ForeignKey(
+        "accounts.UserAccount", models.CASCADE, related_name="archived_shift_helpers"
+    )
+    shift = models.ForeignKey(
+        "scheduler.ArchivedShift", models.CASCADE, related_name="shift_helpers"
+    )
+    joined_shift_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = _("archived shift helper")
+        verbose_name_plural = _("archived shift helpers")
+
+    def __unicode__(self):
+        return "{} on {}".format(self.user_account.user.username, self.shift.task)
+
+    def __str__(self):
+        return self.__unicode__()
+
+
+class ArchivedShiftMessageToHelpers(models.Model):
+    """A ShiftMessageToHelpers of an archived shift, see ArchivedShift."""
+
+    id = models.PositiveIntegerField(primary_key=True)  # noqa: A003
+    message = models.TextField(verbose_name=_("Message"))
+    sender = models.ForeignKey(
+        "accounts.UserAccount",
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+        verbose_name=_("sender"),
+    )
+    send_date = models.DateTimeField(verbose_name=_("send date"))
+    shift = models.ForeignKey(
+        "ArchivedShift", on_delete=models.CASCADE, verbose_name=_("Shift")
+    )
+    recipients = models.ManyToManyField(
+        "accounts.UserAccount", related_name="+", verbose_name=_("recipients")
+    )
+
+    class Meta:
+        verbose_name = _("archived shift notification")
+        verbose_name_plural = _("archived shift notifications")
+
+    def __str__(self):
+        return "{} on {}".format(self.sender.user.email, self.shift.task)
@@ -0,0 +1,267 @@
+"""
+Opt-in layout for PostgreSQL (12 or newer), partitioning the shift table by
+month of the shifts' starting time.
+
+convert() replaces the shift table by a partitioned table with the same
+columns, indexes, foreign keys and triggers, partitions for every month with
+shifts and a default partition, which takes shifts of months without a
+partition. As PostgreSQL only allows foreign keys to a partitioned table if
+they include the partition key, the foreign keys of shift helpers, messages
+and sign-up requests to their shifts are dropped. Django still cascades
+deletions itself.
+
+ensure_partitions() creates the partitions of upcoming months (run daily, see
+scheduler.tasks, and before applying schedule templates), drop_partitions()
+detaches and drops the partitions of months emptied by scheduler.archive.
+
+Queries only skip the partitions of other months if they limit the starting
+time from below, set SHIFT_MAX_DURATION for that (see
+scheduler.managers.overlapping).
+"""
+import logging
+import re
+from datetime import datetime
+
+from django.db import NotSupportedError, connections, router, transaction
+from django.utils import timezone
+from django.utils.timezone import get_current_timezone
+
+from .models import Shift
+from .settings import SHIFT_PARTITIONS_AHEAD
+
+logger = logging.getLogger(__name__)
+
+TABLE = Shift._meta.db_table
+DEFAULT_PARTITION = "{}_default".format(TABLE)
+PARTITION_PATTERN = re.compile(r"^{}_p(\d{{4}})_(\d{{2}})$".format(TABLE))
+
+# created on the partitioned table instead of the indexes of the plain table,
+# unique indexes must include the partition key
+INDEXED_COLUMNS = (
+    "starting_time",
+    "ending_time",
+    "facility_id",
+    "task_id",
+    "workplace_id",
+)
+
+
+def get_connection():
+    return connections[router.db_for_write(Shift)]
+
+
+def is_partitioned(connection=None):
+    connection = connection or get_connection()
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT EXISTS ("
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass"
+            ")",
+            [TABLE],
+        )
+        return cursor.fetchone()[0]
+
+
+def month_start(year, month):
+    return datetime(year, month, 1, tzinfo=get_current_timezone())
+
+
+def next_month(month):
+    if month.month == 12:
+        return month_start(month.year + 1, 1)
+    return month_start(month.year, month.month + 1)
+
+
+def months(first, last):
+    """Yields the starts of the months from first to last (inclusive)."""
+    month = month_start(first.year, first.month)
+    while (month.year, month.month) <= (last.year, last.month):
+        yield month
+        month = next_month(month)
+
+
+def partition_name(month):
+    return "{}_p{:04d}_{:02d}".format(TABLE, month.year, month.month)
+
+
+def get_partitions(cursor):
+    """Returns the names of the monthly partitions by their month."""
+    cursor.execute(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = %s::regclass",
+        [TABLE],
+    )
+    partitions = {}
+    for (name,) in cursor.fetchall():
+        match = PARTITION_PATTERN.match(name)
+        if match:
+            partitions[month_start(*map(int, match.groups()))] = name
+    return partitions
+
+
+def create_partition(cursor, month):
+    """
+    Creates the partition of the month, shifts of the month in the default
+    partition are moved to it.
+    """
+    name = partition_name(month)
+    bounds = [month, next_month(month)]
+    cursor.execute(
+        "CREATE TABLE {} (LIKE {} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)".format(
+            name, TABLE
+        )
+    )
+    cursor.execute(
+        "WITH moved AS ("
+        "DELETE FROM {} WHERE starting_time >= %s AND starting_time < %s "
+        "RETURNING *"
+        ") INSERT INTO {} SELECT * FROM moved".format(DEFAULT_PARTITION, name),
+        bounds,
+    )
+    cursor.execute(
+        "ALTER TABLE {} ATTACH PARTITION {} FOR VALUES FROM (%s) TO (%s)".format(
+            TABLE, name
+        ),
+        bounds,
+    )
+    return name
+
+
+def ensure_partitions(until=None, ahead=SHIFT_PARTITIONS_AHEAD):
+    """
+    Creates the missing partitions from the current month until ``ahead``
+    months later or, if later, the month of ``until``. Returns the names of the
+    created partitions, nothing is done if the shift table is not partitioned.
+    """
+    connection = get_connection()
+    if not is_partitioned(connection):
+        return []
+    now = timezone.localtime()
+    last = now
+    for _month in range(ahead):
+        last = next_month(last)
+    if until is not None and (until.year, until.month) > (last.year, last.month):
+        last = until
+    created = []
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        partitions = get_partitions(cursor)
+        for month in months(now, last):
+            if month not in partitions:
+                created.append(create_partition(cursor, month))
+    if created:
+        logger.info("Created shift partitions %s", ", ".join(created))
+    return created
+
+
+def drop_partitions(before):
+    """
+    Detaches and drops the empty partitions of months ending before
+    ``before``, returns their names. Partitions still holding shifts are kept,
+    archive them first (see scheduler.archive).
+    """
+    connection = get_connection()
+    if not is_partitioned(connection):
+        return []
+    dropped = []
+    with connection.cursor() as cursor:
+        for month, name in sorted(get_partitions(cursor).items()):
+            if next_month(month) > before:
+                break
+            cursor.execute("SELECT EXISTS (SELECT 1 FROM {})".format(name))
+            if cursor.fetchone()[0]:
+                continue
+            with transaction.atomic(using=connection.alias):
+                cursor.execute("ALTER TABLE {} DETACH PARTITION {}".format(TABLE, name))
+                cursor.execute("DROP TABLE {}".format(name))
+            dropped.append(name)
+    if dropped:
+        logger.info("Dropped shift partitions %s", ", ".join(dropped))
+    return dropped
+
+
+def convert():
+    """
+    Replaces the shift table by a partitioned table, see module docstring.
+    Locks the shift table while copying the shifts.
+    """
+    connection = get_connection()
+    if connection.vendor != "postgresql" or connection.pg_version < 120000:
+        raise NotSupportedError("Partitioning shifts requires PostgreSQL 12")
+    if is_partitioned(connection):
+        raise NotSupportedError("The shift table is partitioned already")
+
+    old_table = "{}_unpartitioned".format(TABLE)
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute("LOCK TABLE {} IN ACCESS EXCLUSIVE MODE".format(TABLE))
+        cursor.execute("ALTER TABLE {} RENAME TO {}".format(TABLE, old_table))
+
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'f'",
+            [old_table],
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute(
+            "SELECT pg_get_triggerdef(oid) FROM pg_trigger "
+            "WHERE tgrelid = %s::regclass AND NOT tgisinternal",
+            [old_table],
+        )
+        triggers = [
+            re.sub(r" ON \S*{} ".format(old_table), " ON {} ".format(TABLE), sql)
+            for (sql,) in cursor.fetchall()
+        ]
+        cursor.execute(
+            "SELECT conrelid::regclass, conname FROM pg_constraint "
+            "WHERE confrelid = %s::regclass AND contype = 'f'",
+            [old_table],
+        )
+        references = cursor.fetchall()
+        cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [old_table])
+        (sequence,) = cursor.fetchone()
+        cursor.execute(
+            "SELECT min(starting_time), max(starting_time) FROM {}".format(old_table)
+        )
+        first, last = cursor.fetchone()
+
+        cursor.execute(
+            "CREATE TABLE {} (LIKE {} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            "PARTITION BY RANGE (starting_time)".format(TABLE, old_table)
+        )
+        cursor.execute(
+            "ALTER TABLE {} ADD PRIMARY KEY (id, starting_time)".format(TABLE)
+        )
+        for column in INDEXED_COLUMNS:
+            cursor.execute(
+                "CREATE INDEX {0}_{1}_idx ON {0} ({1})".format(TABLE, column)
+            )
+        cursor.execute(
+            "CREATE TABLE {} PARTITION OF {} DEFAULT".format(DEFAULT_PARTITION, TABLE)
+        )
+        now = timezone.localtime()
+        first = timezone.localtime(first) if first else now
+        last = timezone.localtime(last) if last else now
+        for month in months(min(first, now), max(last, now)):
+            create_partition(cursor, month)
+        cursor.execute("INSERT INTO {} SELECT * FROM {}".format(TABLE, old_table))
+
+        for table, constraint in references:
+            cursor.execute(
+                "ALTER TABLE {} DROP CONSTRAINT {}".format(table, constraint)
+            )
+        if sequence:
+            cursor.execute("ALTER SEQUENCE {} OWNED BY {}.id".format(sequence, TABLE))
+        cursor.execute("DROP TABLE {}".format(old_table))
+        for constraint, definition in foreign_keys:
+            cursor.execute(
+                "ALTER TABLE {} ADD CONSTRAINT {} {}".format(
+                    TABLE, constraint, definition
+                )
+            )
+        for sql in triggers:
+            cursor.execute(sql)
+        cursor.execute("ANALYZE {}".format(TABLE))
+
+    # partitions for the coming months
+    ensure_partitions()
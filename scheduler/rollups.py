@@ -0,0 +1,273 @@
+"""
+Maintenance of the precomputed OpenShiftRollup rows.
+
+Facility rows are computed from the open shifts of a facility, rows of places,
+areas, regions and countries are summed up from the facility rows using the
+cached place hierarchy. Changes of shifts, shift helpers, facilities and places
+refresh the affected facilities once the transaction was committed (see
+scheduler.signals); shifts ending are handled by a periodic task (see
+scheduler.tasks).
+
+Changes of shifts and shift helpers only refresh the ancestors of their
+facility, from the place up to the country, each summed up from its children.
+Changes of facilities (which may move) and places rebuild the whole geography,
+as does the hourly rebuild.
+"""
+import logging
+import threading
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from common.cache_versions import invalidate_local
+from organizations.models import Facility
+from places.hierarchy import (
+    CACHE_NAMESPACE as PLACE_HIERARCHY_NAMESPACE,
+    get_place_hierarchy,
+)
+from .models import OpenShiftRollup, Shift
+
+logger = logging.getLogger(__name__)
+
+Level = OpenShiftRollup.Level
+
+GEOGRAPHIC_LEVELS = (Level.PLACE, Level.AREA, Level.REGION, Level.COUNTRY)
+
+COUNT_FIELDS = (
+    "facility_count",
+    "open_shift_count",
+    "open_slot_count",
+    "next_expiry",
+    "last_expiry",
+)
+
+
+class Counts:
+    def __init__(self):
+        self.facility_count = 0
+        self.open_shift_count = 0
+        self.open_slot_count = 0
+        self.next_expiry = None
+        self.last_expiry = None
+
+    def add_shift(self, slots, helper_count, ending_time):
+        self.open_shift_count += 1
+        self.open_slot_count += max(slots - helper_count, 0)
+        self._add_expiry(ending_time, ending_time)
+
+    def add(self, other):
+        self.facility_count += other.facility_count
+        self.open_shift_count += other.open_shift_count
+        self.open_slot_count += other.open_slot_count
+        self._add_expiry(other.next_expiry, other.last_expiry)
+
+    def _add_expiry(self, next_expiry, last_expiry):
+        if next_expiry and (not self.next_expiry or next_expiry < self.next_expiry):
+            self.next_expiry = next_expiry
+        if last_expiry and (not self.last_expiry or last_expiry > self.last_expiry):
+            self.last_expiry = last_expiry
+
+    def values(self):
+        return {field: getattr(self, field) for field in COUNT_FIELDS}
+
+
+def count_open_shifts(facility_ids=None):
+    shifts = Shift.open_shifts.all()
+    if facility_ids is not None:
+        shifts = shifts.filter(facility_id__in=facility_ids)
+    shifts = shifts.annotate(helper_count=Count("helpers")).values_list(
+        "facility_id", "slots", "helper_count", "ending_time"
+    )
+
+    counts = defaultdict(Counts)
+    for facility_id, slots, helper_count, ending_time in shifts:
+        counts[facility_id].add_shift(slots, helper_count, ending_time)
+    return counts
+
+
+def store(level, counts, object_ids=None):
+    """
+    Writes ``counts`` (by object id) as rows of ``level``. Rows of objects not in
+    ``counts`` are deleted, if ``object_ids`` is given only among those.
+    """
+    rows = OpenShiftRollup.objects.filter(level=level)
+    if object_ids is not None:
+        rows = rows.filter(object_id__in=object_ids)
+    rows = {row.object_id: row for row in rows}
+
+    now = timezone.now()
+    to_update, to_create = [], []
+    for object_id, object_counts in counts.items():
+        values = object_counts.values()
+        row = rows.pop(object_id, None)
+        if row is None:
+            to_create.append(
+                OpenShiftRollup(level=level, object_id=object_id, **values)
+            )
+        elif any(getattr(row, field) != value for field, value in values.items()):
+            for field, value in values.items():
+                setattr(row, field, value)
+            row.updated_at = now
+            to_update.append(row)
+
+    if rows:
+        OpenShiftRollup.objects.filter(
+            pk__in=[row.pk for row in rows.values()]
+        ).delete()
+    OpenShiftRollup.objects.bulk_update(to_update, COUNT_FIELDS + ("updated_at",))
+    # a concurrent refresh may have created the same rows already
+    OpenShiftRollup.objects.bulk_create(to_create, ignore_conflicts=True)
+
+
+def get_hierarchy(place_ids):
+    hierarchy = get_place_hierarchy()
+    if any(hierarchy.place(place_id) is None for place_id in place_ids):
+        # places just created by another process may be unknown here yet
+        invalidate_local(PLACE_HIERARCHY_NAMESPACE)
+        hierarchy = get_place_hierarchy()
+    return hierarchy
+
+
+def refresh_geography():
+    facility_rows = OpenShiftRollup.objects.filter(level=Level.FACILITY)
+    facility_rows = {row.object_id: row for row in facility_rows}
+    facilities = list(Facility.objects.values_list("pk", "place_id"))
+    hierarchy = get_hierarchy(place_id for _, place_id in facilities)
+
+    counts = {level: defaultdict(Counts) for level in GEOGRAPHIC_LEVELS}
+    for facility_id, place_id in facilities:
+        node = hierarchy.place(place_id)
+        if node is None:
+            logger.warning("Place %s of facility %s unknown", place_id, facility_id)
+            continue
+        facility_row = facility_rows.get(facility_id)
+        for ancestor in node.breadcrumps:
+            ancestor_counts = counts[ancestor.kind][ancestor.pk]
+            if facility_row:
+                ancestor_counts.add(facility_row)
+            else:
+                ancestor_counts.facility_count += 1
+
+    for level in GEOGRAPHIC_LEVELS:
+        store(level, counts[level])
+
+
+def refresh_ancestors(facility_ids):
+    """
+    Refreshes the rows of the places, areas, regions and countries containing
+    the given facilities. Places are summed up from their facilities' rows,
+    the other levels from the rows of their children.
+    """
+    place_ids = set(
+        Facility.objects.filter(pk__in=facility_ids).values_list("place_id", flat=True)
+    )
+    hierarchy = get_hierarchy(place_ids)
+    nodes = {hierarchy.place(place_id) for place_id in place_ids} - {None}
+    if not nodes:
+        return
+
+    facilities = Facility.objects.filter(place_id__in=[node.pk for node in nodes])
+    facilities = list(facilities.values_list("pk", "place_id"))
+    facility_rows = OpenShiftRollup.objects.filter(
+        level=Level.FACILITY, object_id__in=[pk for pk, _ in facilities]
+    )
+    facility_rows = {row.object_id: row for row in facility_rows}
+    counts = defaultdict(Counts)
+    for facility_id, place_id in facilities:
+        facility_row = facility_rows.get(facility_id)
+        if facility_row:
+            counts[place_id].add(facility_row)
+        else:
+            counts[place_id].facility_count += 1
+    store(Level.PLACE, counts, [node.pk for node in nodes])
+
+    for child_level, level in zip(GEOGRAPHIC_LEVELS, GEOGRAPHIC_LEVELS[1:]):
+        parents = {node.parent for node in nodes}
+        # the hierarchy is in memory, its children are found without queries
+        children = {
+            node.pk: node.parent
+            for node in hierarchy.nodes[next(iter(nodes)).model].values()
+            if node.parent in parents
+        }
+        counts = defaultdict(Counts)
+        for row in OpenShiftRollup.objects.filter(
+            level=child_level, object_id__in=children
+        ):
+            counts[children[row.object_id].pk].add(row)
+        store(level, counts, [parent.pk for parent in parents])
+        nodes = parents
+
+
+@transaction.atomic
+def refresh_facilities(facility_ids=None, geography=False):
+    """
+    Refreshes the rows of the given facilities (or of all, if None) and of
+    their ancestors, or of the whole geography, if all facilities are
+    refreshed or ``geography`` is true.
+    """
+    counts = count_open_shifts(facility_ids)
+    facilities = Facility.objects.all()
+    if facility_ids is not None:
+        facilities = facilities.filter(pk__in=facility_ids)
+    for facility_id in facilities.values_list("pk", flat=True):
+        counts[facility_id].facility_count = 1
+    # shifts of deleted facilities
+    counts = {pk: c for pk, c in counts.items() if c.facility_count}
+
+    store(Level.FACILITY, counts, facility_ids)
+    if facility_ids is None or geography:
+        refresh_geography()
+    else:
+        refresh_ancestors(facility_ids)
+
+
+def refresh_all():
+    refresh_facilities(None)
+
+
+def refresh_expired():
+    """
+    Refreshes all facilities with open shifts that ended meanwhile. Rebuilds
+    all rows, if there are none yet.
+    """
+    if not OpenShiftRollup.objects.exists():
+        refresh_all()
+        return
+    facility_ids = set(
+        OpenShiftRollup.objects.object_ids(
+            Level.FACILITY, next_expiry__lt=timezone.now()
+        )
+    )
+    if facility_ids:
+        refresh_facilities(facility_ids)
+
+
+_pending = threading.local()
+
+
+def refresh_facilities_on_commit(facility_ids, geography=False):
+    """
+    Refreshes the given facilities after the current transaction was
+    committed, and their ancestors or, if ``geography`` is true, the whole
+    geography (even without facilities). Facilities from several calls within
+    the same transaction are refreshed at once.
+    """
+    pending = getattr(_pending, "facility_ids", None)
+    if pending is None:
+        pending = _pending.facility_ids = set()
+        _pending.geography = False
+    pending.update(facility_ids)
+    _pending.geography = _pending.geography or geography
+    # each call registers a callback, as callbacks are discarded on rollback,
+    # but only the first one to run after commit has anything left to do
+    transaction.on_commit(_refresh_pending)
+
+
+def _refresh_pending():
+    facility_ids = getattr(_pending, "facility_ids", None)
+    if facility_ids is None:
+        return
+    _pending.facility_ids = None
+    refresh_facilities(facility_ids, _pending.geography)
@@ -5,3 +5,38 @@ from django.conf import settings
 DEFAULT_SHIFT_CONFLICT_GRACE = getattr(
     settings, "DEFAULT_SHIFT_CONFLICT_GRACE", timedelta(0)
 )
+
+# seconds the timeline data of a facility's day is cached at most, changes of
+# the facility's shifts invalidate it earlier
+TIMELINE_CACHE_TIMEOUT = getattr(settings, "TIMELINE_CACHE_TIMEOUT", 60 * 60)
+
+# number of days shown by the facility schedule for a range of days, by default
+# and at most
+PLANNER_RANGE_DEFAULT_DAYS = getattr(settings, "PLANNER_RANGE_DEFAULT_DAYS", 7)
+PLANNER_RANGE_MAX_DAYS = getattr(settings, "PLANNER_RANGE_MAX_DAYS", 14)
+
+# live slot availability on the facility schedule page, see
+# scheduler.live_updates
+LIVE_UPDATES_ENABLED = getattr(settings, "LIVE_UPDATES_ENABLED", False)
+# seconds between two polls of the slot counts by an open schedule page
+LIVE_UPDATES_POLL_INTERVAL = getattr(settings, "LIVE_UPDATES_POLL_INTERVAL", 10)
+
+# queued sign-up of shifts in high demand, see scheduler.signup_queue
+# number of requests of a shift processed per transaction
+SIGNUP_QUEUE_BATCH_SIZE = getattr(settings, "SIGNUP_QUEUE_BATCH_SIZE", 20)
+# seconds after which schedule pages with pending requests are reloaded
+SIGNUP_QUEUE_REFRESH_INTERVAL = getattr(settings, "SIGNUP_QUEUE_REFRESH_INTERVAL", 5)
+
+# shifts ended longer ago are moved to the archive tables, see
+# scheduler.archive
+SHIFT_ARCHIVE_AGE = getattr(settings, "SHIFT_ARCHIVE_AGE", timedelta(days=365))
+# number of shifts archived per transaction
+SHIFT_ARCHIVE_BATCH_SIZE = getattr(settings, "SHIFT_ARCHIVE_BATCH_SIZE", 500)
+
+# longest duration of shifts, if set, queries for shifts within a time window
+# also limit their starting time from below, so partitioned shift tables (see
+# scheduler.partitions) only scan the partitions of the window; longer shifts
+# are rejected when saved, existing ones are reported by scheduler.checks
+SHIFT_MAX_DURATION = getattr(settings, "SHIFT_MAX_DURATION", None)
+# number of months partitions of the shift table are created in advance
+SHIFT_PARTITIONS_AHEAD = getattr(settings, "SHIFT_PARTITIONS_AHEAD", 3)
@@ -2,7 +2,7 @@ from common import brace_format_logging
 
 from django.conf import settings
 from django.core.mail import EmailMessage
-from django.db.models.signals import pre_delete, pre_save, post_save
+from django.db.models.signals import post_delete, pre_delete, pre_save, post_save
 from django.dispatch import receiver
 from django.template.defaultfilters import time as date_filter
 from django.template.loader import render_to_string
@@ -10,7 +10,10 @@ from django.utils import timezone
 from django.utils.timezone import timedelta
 from django.utils.translation import gettext_lazy as _
 
-from scheduler.models import Shift, ShiftMessageToHelpers
+from organizations.models import Facility
+from places.hierarchy import LEVELS as PLACE_MODELS
+from scheduler import rollups, timeline
+from scheduler.models import Shift, ShiftHelper, ShiftMessageToHelpers
 
 logger = brace_format_logging.getLogger(__name__)
 
@@ -155,3 +158,46 @@ def send_shift_message_to_helpers(sender, instance, created, **kwargs):
                     logger.exception(
                         "send_shift_message_to_helpers: message not successful",
                     )
+
+
+@receiver(post_save, sender=Shift)
+@receiver(post_delete, sender=Shift)
+def refresh_rollups_of_shift(sender, instance, **kwargs):
+    rollups.refresh_facilities_on_commit({instance.facility_id})
+
+
+@receiver(post_save, sender=ShiftHelper)
+@receiver(post_delete, sender=ShiftHelper)
+def refresh_rollups_of_shift_helper(sender, instance, **kwargs):
+    facility_ids = Shift.objects.filter(pk=instance.shift_id).values_list(
+        "facility_id", flat=True
+    )
+    rollups.refresh_facilities_on_commit(set(facility_ids))
+
+
+@receiver(post_save, sender=Shift)
+@receiver(post_delete, sender=Shift)
+def invalidate_timeline_of_shift(sender, instance, **kwargs):
+    timeline.invalidate({instance.facility_id})
+
+
+@receiver(post_save, sender=ShiftHelper)
+@receiver(post_delete, sender=ShiftHelper)
+def invalidate_timeline_of_shift_helper(sender, instance, **kwargs):
+    timeline.invalidate(
+        Shift.objects.filter(pk=instance.shift_id).values_list("facility_id", flat=True)
+    )
+
+
+@receiver(post_save, sender=Facility)
+@receiver(post_delete, sender=Facility)
+def refresh_rollups_of_facility(sender, instance, **kwargs):
+    # the facility may have moved to another place
+    rollups.refresh_facilities_on_commit({instance.pk}, geography=True)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def refresh_rollups_of_geography(sender, **kwargs):
+    if sender in PLACE_MODELS:
+        rollups.refresh_facilities_on_commit((), geography=True)
@@ -0,0 +1,136 @@
+"""
+Queued sign-up for shifts in high demand.
+
+Joining a shift with ``queued_signup`` does not add the user right away, but
+appends a ShiftSignupRequest to the shift's queue. A periodic task (see
+scheduler.tasks) processes the pending requests of every shift in order of
+arrival, in batches of SIGNUP_QUEUE_BATCH_SIZE per transaction: while slots are
+left, users are added to the shift, later requests are rejected.
+
+Instead of many concurrent sign-ups racing for the last slots, a single worker
+writes them one after another, and whoever asked first gets the slot.
+"""
+import logging
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Shift, ShiftHelper, ShiftSignupRequest
+from .settings import SIGNUP_QUEUE_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+Status = ShiftSignupRequest.Status
+
+
+def enqueue(shift, user_account):
+    """
+    Appends a request of the user to the shift's queue, returns False if a
+    request of the user was pending already.
+    """
+    request, created = ShiftSignupRequest.objects.get_or_create(
+        user_account=user_account,
+        shift=shift,
+        defaults={"requested_at": timezone.now()},
+    )
+    if created:
+        return True
+    if request.status == Status.PENDING:
+        return False
+    # asking again after a rejection (or after leaving) goes to the end
+    request.status = Status.PENDING
+    request.requested_at = timezone.now()
+    request.processed_at = None
+    request.save(update_fields=["status", "requested_at", "processed_at"])
+    return True
+
+
+def withdraw(shift, user_account):
+    ShiftSignupRequest.objects.filter(user_account=user_account, shift=shift).delete()
+
+
+def get_request_statuses(user, shifts):
+    """
+    Returns the statuses of the user's requests of the shifts (pending, or
+    confirmed or rejected by the last batch) by the ids of the shifts.
+    """
+    shift_ids = [shift.pk for shift in shifts if shift.queued_signup]
+    if not shift_ids or not user.is_authenticated:
+        return {}
+    return dict(
+        ShiftSignupRequest.objects.filter(
+            user_account__user_id=user.id, shift_id__in=shift_ids
+        ).values_list("shift_id", "status")
+    )
+
+
+@transaction.atomic
+def process_batch(shift_id, batch_size=SIGNUP_QUEUE_BATCH_SIZE):
+    """
+    Processes up to ``batch_size`` pending requests of the shift in order of
+    arrival, returns the number of processed requests.
+    """
+    # serializes processing the shift's queue
+    shift = Shift.objects.select_for_update().filter(pk=shift_id).first()
+    if shift is None:
+        return 0
+    requests = list(
+        ShiftSignupRequest.objects.filter(shift=shift, status=Status.PENDING)
+        .select_related("user_account")
+        .order_by("requested_at", "pk")[:batch_size]
+    )
+    if not requests:
+        return 0
+
+    helper_ids = set(shift.shift_helpers.values_list("user_account_id", flat=True))
+    slots_left = shift.slots - len(helper_ids)
+    now = timezone.now()
+    for request in requests:
+        if request.user_account_id in helper_ids:
+            request.status = Status.CONFIRMED
+        elif slots_left <= 0:
+            request.status = Status.COVERED
+        elif ShiftHelper.objects.conflicting(shift, user_account=request.user_account)[
+            0
+        ].exists():
+            request.status = Status.CONFLICTING
+        else:
+            try:
+                with transaction.atomic():
+                    ShiftHelper.objects.create(
+                        user_account=request.user_account, shift=shift
+                    )
+            except IntegrityError:
+                # joined a conflicting shift concurrently, see
+                # ShiftHelperManager.conflicting
+                request.status = Status.CONFLICTING
+            else:
+                helper_ids.add(request.user_account_id)
+                slots_left -= 1
+                request.status = Status.CONFIRMED
+        request.processed_at = now
+    ShiftSignupRequest.objects.bulk_update(requests, ["status", "processed_at"])
+    return len(requests)
+
+
+def process(shift_id):
+    """Processes all pending requests of the shift, batch by batch."""
+    processed = 0
+    while True:
+        count = process_batch(shift_id)
+        processed += count
+        if count < SIGNUP_QUEUE_BATCH_SIZE:
+            return processed
+
+
+def process_all():
+    """Processes the pending requests of all shifts."""
+    shift_ids = (
+        ShiftSignupRequest.objects.filter(status=Status.PENDING)
+        .values_list("shift_id", flat=True)
+        .distinct()
+        .order_by()
+    )
+    for shift_id in list(shift_ids):
+        processed = process(shift_id)
+        logger.debug("Processed %d sign-up requests of shift %d", processed, shift_id)
@@ -0,0 +1,31 @@
+from celery import shared_task
+from django.utils import timezone
+
+from . import archive, partitions, rollups, signup_queue
+from .settings import SHIFT_ARCHIVE_AGE
+
+
+@shared_task
+def refresh_expired_open_shift_rollups():
+    rollups.refresh_expired()
+
+
+@shared_task
+def rebuild_open_shift_rollups():
+    rollups.refresh_all()
+
+
+@shared_task
+def process_signup_queues():
+    signup_queue.process_all()
+
+
+@shared_task
+def archive_past_shifts():
+    archive.archive()
+
+
+@shared_task
+def maintain_shift_partitions():
+    partitions.ensure_partitions()
+    partitions.drop_partitions(before=timezone.now() - SHIFT_ARCHIVE_AGE)
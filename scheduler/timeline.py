@@ -0,0 +1,101 @@
+"""
+Data of the timeline on the facility schedule page.
+
+The timeline is collapsed by default, so its data is not embedded into the
+page, but loaded from a separate JSON endpoint when the timeline is shown.
+
+The data does not depend on the user, so it is cached per facility and day.
+Any change of the facility's shifts (or their helpers) invalidates all cached
+days of that facility.
+
+The data is encoded compactly as lists::
+
+    {
+        "tasks": [[task_id, task_name], ...],
+        "workplaces": [[workplace_id, workplace_name], ...],
+        "shifts": [
+            [shift_id, task_id, workplace_id, volunteer_count, slots, start, end],
+            ...
+        ],
+    }
+
+with ``workplace_id`` being ``null`` for shifts without workplace and
+``start`` and ``end`` being local ISO 8601 timestamps with minute precision.
+"""
+import hashlib
+
+from django.db.models import Count
+from django.utils.timezone import get_current_timezone_name, localtime
+
+from common.cache_versions import bump_version_on_commit, get_version
+from common.stampede import get_or_recompute
+from scheduler.models import Shift
+from .settings import TIMELINE_CACHE_TIMEOUT
+
+CACHE_NAMESPACE = "scheduler.timeline"
+
+
+def get_namespace(facility_id):
+    return "{}.{}".format(CACHE_NAMESPACE, facility_id)
+
+
+def get_cache_key(facility_id, schedule_date):
+    return "timeline:{}:{}:{}:{}".format(
+        facility_id,
+        schedule_date.isoformat(),
+        get_current_timezone_name(),
+        get_version(get_namespace(facility_id)),
+    )
+
+
+def get_etag(cache_key):
+    return '"{}"'.format(hashlib.md5(cache_key.encode("utf-8")).hexdigest())
+
+
+def format_time(value):
+    return localtime(value).isoformat(timespec="minutes")
+
+
+def build_timeline_data(facility_id, schedule_date):
+    shifts = (
+        Shift.objects.filter(facility_id=facility_id)
+        .on_shiftdate(schedule_date)
+        .annotate(volunteer_count=Count("helpers"))
+        .order_by("starting_time", "pk")
+        .select_related("task", "workplace")
+    )
+    tasks, workplaces, items = {}, {}, []
+    for shift in shifts:
+        tasks[shift.task_id] = shift.task.name
+        if shift.workplace_id:
+            workplaces[shift.workplace_id] = shift.workplace.name
+        items.append(
+            [
+                shift.pk,
+                shift.task_id,
+                shift.workplace_id,
+                shift.volunteer_count,
+                shift.slots,
+                format_time(shift.starting_time),
+                format_time(shift.ending_time),
+            ]
+        )
+    return {
+        "tasks": [list(task) for task in tasks.items()],
+        "workplaces": [list(workplace) for workplace in workplaces.items()],
+        "shifts": items,
+    }
+
+
+def get_timeline_data(facility_id, schedule_date, cache_key=None):
+    cache_key = cache_key or get_cache_key(facility_id, schedule_date)
+    return get_or_recompute(
+        cache_key,
+        lambda: build_timeline_data(facility_id, schedule_date),
+        TIMELINE_CACHE_TIMEOUT,
+    )
+
+
+def invalidate(facility_ids):
+    for facility_id in facility_ids:
+        bump_version_on_commit(get_namespace(facility_id))
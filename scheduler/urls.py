@@ -1,23 +1,48 @@
 from django.urls import re_path
 
-from .views import HelpDesk, PlannerView, ShiftDetailView, SendMessageToShiftHelpers
+from common.ratelimit import ratelimit
+
+from .views import (
+    HelpDesk,
+    PlannerRangeView,
+    PlannerSlotsView,
+    PlannerView,
+    ShiftDetailView,
+    SendMessageToShiftHelpers,
+    TimelineDataView,
+)
 
 urlpatterns = [
     re_path(r"^$", HelpDesk.as_view(), name="helpdesk"),
     re_path(
         r"^(?P<facility_slug>[^/]+)/shifts/(?P<year>\d{4})/(?P<month>\d{1,2})/(?P<day>\d{1,2})/?$",  # noqa: E501
-        PlannerView.as_view(),
+        ratelimit("join_leave")(PlannerView.as_view()),
         name="planner_by_facility",
     ),
+    re_path(
+        r"^(?P<facility_slug>[^/]+)/shifts/(?P<year>\d{4})/(?P<month>\d{1,2})/(?P<day>\d{1,2})/days/?$",  # noqa: E501
+        ratelimit("join_leave")(PlannerRangeView.as_view()),
+        name="planner_range",
+    ),
+    re_path(
+        r"^(?P<facility_slug>[^/]+)/shifts/(?P<year>\d{4})/(?P<month>\d{1,2})/(?P<day>\d{1,2})/slots\.json$",  # noqa: E501
+        PlannerSlotsView.as_view(),
+        name="planner_slots",
+    ),
+    re_path(
+        r"^(?P<facility_slug>[^/]+)/shifts/(?P<year>\d{4})/(?P<month>\d{1,2})/(?P<day>\d{1,2})/timeline\.json$",  # noqa: E501
+        TimelineDataView.as_view(),
+        name="planner_timeline",
+    ),
     re_path(
         r"^(?P<facility_slug>[^/]+)/shifts/(?P<year>\d{4})/(?P<month>\d{1,2})/(?P<day>\d{1,2})/(?P<shift_id>\d+)/?$",  # noqa: E501
-        ShiftDetailView.as_view(),
+        ratelimit("join_leave")(ShiftDetailView.as_view()),
         name="shift_details",
     ),
     # receiving the post message to send notifications to the helpers of a shift
     re_path(
         r"^sendmessage$",
-        SendMessageToShiftHelpers.as_view(),
+        ratelimit("shift_message")(SendMessageToShiftHelpers.as_view()),
         name="send_message_to_shift_helpers",
     ),
 ]
@@ -1,19 +1,22 @@
 import json
 import logging
 from abc import ABC
-from datetime import date
+from datetime import date, timedelta
 
 from django.contrib import messages
 from django.contrib.admin.models import DELETION, LogEntry
 from django.contrib.contenttypes.models import ContentType
 from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError
 from django.db.models import Count, F, Prefetch
-from django.http import Http404
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django.utils.safestring import mark_safe
+from django.utils.timezone import localtime
 from django.utils.translation import gettext_lazy as _
-from django.views.generic import DetailView, FormView, TemplateView
+from django.views.generic import DetailView, FormView, TemplateView, View
 
 from accounts.models import UserAccount
 from organizations.models import Facility, FacilityMembership
@@ -23,9 +26,23 @@ from organizations.templatetags.memberships import (
     is_membership_pending,
 )
 from organizations.views import get_facility_details
-from scheduler.models import Shift, ShiftHelper, ShiftMessageToHelpers
+from places.hierarchy import get_place_hierarchy
+from scheduler.models import (
+    Shift,
+    ShiftHelper,
+    ShiftMessageToHelpers,
+    ShiftSignupRequest,
+)
 from volunteer_planner.utils import LoginRequiredMixin
+from . import live_updates, signup_queue, timeline
 from .forms import RegisterForShiftForm, ShiftMessageToHelpersModelForm
+from .settings import (
+    LIVE_UPDATES_ENABLED,
+    LIVE_UPDATES_POLL_INTERVAL,
+    PLANNER_RANGE_DEFAULT_DAYS,
+    PLANNER_RANGE_MAX_DAYS,
+    SIGNUP_QUEUE_REFRESH_INTERVAL,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -51,6 +68,15 @@ def get_open_shifts():
     return shifts
 
 
+def get_schedule_date(kwargs):
+    try:
+        return date(int(kwargs["year"]), int(kwargs["month"]), int(kwargs["day"]))
+    except ValueError:
+        raise Http404(
+            f"Invalid date {kwargs['year']}/{kwargs['month']}/{kwargs['day']}"
+        )
+
+
 class JoinLeaveFormView(ABC, FormView):
     """
     Abstract base class for FormViews, that should be used to sign up for
@@ -93,16 +119,17 @@ class JoinLeaveFormView(ABC, FormView):
                         )
                 return super().form_valid(form)
 
-            hard_conflicts, graced_conflicts = ShiftHelper.objects.conflicting(
+            # soft and hard conflicts at once
+            conflicts = ShiftHelper.objects.conflicts(
                 shift_to_join, user_account=user_account
             )
             hard_conflicted_shifts = [
-                shift_helper.shift for shift_helper in hard_conflicts
+                shift_helper.shift
+                for shift_helper in conflicts
+                if shift_helper.hard_conflict
             ]
 
-            soft_conflicted_shifts = [
-                shift_helper.shift for shift_helper in graced_conflicts
-            ]
+            soft_conflicted_shifts = [shift_helper.shift for shift_helper in conflicts]
 
             if hard_conflicted_shifts:
                 error_message = _(
@@ -127,10 +154,36 @@ class JoinLeaveFormView(ABC, FormView):
                     "slots left."
                 )
                 messages.warning(self.request, error_message)
+            elif shift_to_join.queued_signup:
+                if signup_queue.enqueue(shift_to_join, user_account):
+                    messages.success(
+                        self.request,
+                        _(
+                            "Your sign-up was queued. Sign-ups for this shift "
+                            "are confirmed in order of arrival, this page shows "
+                            "when yours was."
+                        ),
+                    )
+                else:
+                    messages.info(
+                        self.request, _("Your sign-up for this shift is pending.")
+                    )
             else:
-                shift_helper, created = ShiftHelper.objects.get_or_create(
-                    user_account=user_account, shift=shift_to_join
-                )
+                try:
+                    shift_helper, created = ShiftHelper.objects.get_or_create(
+                        user_account=user_account, shift=shift_to_join
+                    )
+                except IntegrityError:
+                    # a conflicting shift was joined concurrently, rejected by
+                    # the database (PostgreSQL only)
+                    messages.warning(
+                        self.request,
+                        _(
+                            "We can't add you to this shift because you've "
+                            "already agreed to other shifts at the same time."
+                        ),
+                    )
+                    return super().form_valid(form)
                 if created:
                     messages.success(
                         self.request, _("You were successfully added to this shift.")
@@ -165,6 +218,8 @@ class JoinLeaveFormView(ABC, FormView):
                     )
 
         elif shift_to_leave:
+            if shift_to_leave.queued_signup:
+                signup_queue.withdraw(shift_to_leave, user_account)
             try:
                 sh = ShiftHelper.objects.get(
                     user_account=user_account, shift=shift_to_leave
@@ -190,6 +245,24 @@ class JoinLeaveFormView(ABC, FormView):
 
         return super().form_valid(form)
 
+    def get_signup_context(self, shifts):
+        statuses = signup_queue.get_request_statuses(self.request.user, shifts)
+        labels = dict(ShiftSignupRequest.Status.CHOICES)
+        return {
+            "pending_signup_shift_ids": {
+                shift_id
+                for shift_id, status in statuses.items()
+                if status == ShiftSignupRequest.Status.PENDING
+            },
+            # labels of the requests processed meanwhile, e.g. rejected ones
+            "processed_signups": {
+                shift_id: labels[status]
+                for shift_id, status in statuses.items()
+                if status != ShiftSignupRequest.Status.PENDING
+            },
+            "signup_refresh_interval": SIGNUP_QUEUE_REFRESH_INTERVAL,
+        }
+
 
 class HelpDesk(LoginRequiredMixin, TemplateView):
     """
@@ -203,13 +276,7 @@ class HelpDesk(LoginRequiredMixin, TemplateView):
 
         facilities = (
             Facility.objects.with_open_shifts()
-            .select_related(
-                "organization",
-                "place",
-                "place__area",
-                "place__area__region",
-                "place__area__region__country",
-            )
+            .select_related("organization")
             .prefetch_related(
                 Prefetch(
                     "shift_set", queryset=Shift.open_shifts.all(), to_attr="open_shifts"
@@ -221,11 +288,13 @@ class HelpDesk(LoginRequiredMixin, TemplateView):
         facility_list = []
         used_places = set()
         used_countries = set()
+        hierarchy = get_place_hierarchy()
 
         for facility in facilities:
-            used_places.add(facility.place.area)
+            place = hierarchy.place(facility.place_id) or facility.place
+            used_places.add(place.area)
             facility_list.append(get_facility_details(facility))
-            used_countries.add(facility.place.area.region.country)
+            used_countries.add(place.area.region.country)
 
         context["areas_json"] = json.dumps(
             [
@@ -275,7 +344,9 @@ class GeographicHelpdeskView(DetailView):
     def get_context_data(self, **kwargs):
         context = super(GeographicHelpdeskView, self).get_context_data(**kwargs)
         place = self.object
-        context["breadcrumps"] = self.make_breadcrumps_dict(*place.breadcrumps)
+        node = place.hierarchy_node
+        breadcrumps = node.breadcrumps if node else place.breadcrumps
+        context["breadcrumps"] = self.make_breadcrumps_dict(*breadcrumps)
         context["shifts"] = get_open_shifts().by_geography(place)
         return context
 
@@ -286,18 +357,7 @@ class ShiftDetailView(LoginRequiredMixin, JoinLeaveFormView):
 
     def get_context_data(self, **kwargs):
         context = super(ShiftDetailView, self).get_context_data(**kwargs)
-
-        try:
-            schedule_date = date(
-                int(self.kwargs["year"]),
-                int(self.kwargs["month"]),
-                int(self.kwargs["day"]),
-            )
-        except ValueError:
-            raise Http404(
-                "Invalid date "
-                f"{self.kwargs['year']}/{self.kwargs['month']}/{self.kwargs['day']}"
-            )
+        schedule_date = get_schedule_date(self.kwargs)
 
         try:
             shift = (
@@ -311,6 +371,7 @@ class ShiftDetailView(LoginRequiredMixin, JoinLeaveFormView):
         except Shift.DoesNotExist:
             raise Http404()
         context["shift"] = shift
+        context.update(self.get_signup_context([shift]))
         return context
 
     def get_success_url(self):
@@ -333,17 +394,7 @@ class PlannerView(LoginRequiredMixin, JoinLeaveFormView):
     def get_context_data(self, **kwargs):
 
         context = super(PlannerView, self).get_context_data(**kwargs)
-        try:
-            schedule_date = date(
-                int(self.kwargs["year"]),
-                int(self.kwargs["month"]),
-                int(self.kwargs["day"]),
-            )
-        except ValueError:
-            raise Http404(
-                "Invalid date "
-                f"{self.kwargs['year']}/{self.kwargs['month']}/{self.kwargs['day']}"
-            )
+        schedule_date = get_schedule_date(self.kwargs)
 
         facility = get_object_or_404(Facility, slug=self.kwargs["facility_slug"])
 
@@ -367,6 +418,18 @@ class PlannerView(LoginRequiredMixin, JoinLeaveFormView):
         context["facility"] = facility
         context["schedule_date"] = schedule_date
         context["shift_message_to_helpers_form"] = ShiftMessageToHelpersModelForm
+        context.update(self.get_signup_context(shifts))
+        if LIVE_UPDATES_ENABLED:
+            context["live_updates_interval"] = LIVE_UPDATES_POLL_INTERVAL
+            context["live_updates_url"] = reverse(
+                "planner_slots",
+                args=[
+                    facility.slug,
+                    schedule_date.year,
+                    schedule_date.month,
+                    schedule_date.day,
+                ],
+            )
         return context
 
     def get_success_url(self):
@@ -376,6 +439,194 @@ class PlannerView(LoginRequiredMixin, JoinLeaveFormView):
         return reverse("planner_by_facility", kwargs=self.kwargs)
 
 
+def group_shifts_by_day(shifts, first_date, last_date):
+    """
+    Groups shifts by day and then by task and workplace in a single pass,
+    keeping the order of the shifts within each day. Shifts spanning midnight
+    are listed on every day they intersect with.
+
+    Returns a list of ``(day, [(task, workplace, shifts), ...])`` tuples for
+    every day from first_date to last_date.
+    """
+    days = {
+        first_date + timedelta(days=offset): {}
+        for offset in range((last_date - first_date).days + 1)
+    }
+    for shift in shifts:
+        day = max(localtime(shift.starting_time).date(), first_date)
+        last_day = min(localtime(shift.ending_time).date(), last_date)
+        while day <= last_day:
+            days[day].setdefault((shift.task, shift.workplace), []).append(shift)
+            day += timedelta(days=1)
+    return [
+        (
+            day,
+            [
+                (task, workplace, shifts_of_group)
+                for (task, workplace), shifts_of_group in groups.items()
+            ],
+        )
+        for day, groups in days.items()
+    ]
+
+
+class PlannerRangeView(LoginRequiredMixin, JoinLeaveFormView):
+    """
+    View showing the shifts of a facility for several days (``?days=``, a week
+    by default), so volunteers can plan ahead without browsing day by day.
+
+    The number of queries does not depend on the number of days or shifts.
+    """
+
+    template_name = "helpdesk_range.html"
+    form_class = RegisterForShiftForm
+
+    def get_days(self):
+        try:
+            days = int(self.request.GET.get("days", PLANNER_RANGE_DEFAULT_DAYS))
+        except ValueError:
+            days = PLANNER_RANGE_DEFAULT_DAYS
+        return min(max(days, 1), PLANNER_RANGE_MAX_DAYS)
+
+    def get_range_url(self, facility, first_date, days):
+        url = reverse(
+            "planner_range",
+            kwargs={
+                "facility_slug": facility.slug,
+                "year": first_date.year,
+                "month": first_date.month,
+                "day": first_date.day,
+            },
+        )
+        return "{}?days={}".format(url, days)
+
+    def get_context_data(self, **kwargs):
+        context = super(PlannerRangeView, self).get_context_data(**kwargs)
+        first_date = get_schedule_date(self.kwargs)
+        days = self.get_days()
+        last_date = first_date + timedelta(days=days - 1)
+
+        facility = get_object_or_404(
+            Facility.objects.select_related("organization"),
+            slug=self.kwargs["facility_slug"],
+        )
+
+        shifts = list(
+            Shift.objects.filter(facility=facility)
+            .on_shiftdates(first_date, last_date)
+            .annotate(volunteer_count=Count("helpers"))
+            .order_by(
+                F("task__priority").desc(nulls_last=True),
+                F("workplace__priority").desc(nulls_last=True),
+                "task__name",
+                "workplace__name",
+                "starting_time",
+                "ending_time",
+            )
+            .select_related("task", "workplace")
+        )
+        user = self.request.user
+        joined_shift_ids = set(
+            ShiftHelper.objects.filter(
+                user_account__user_id=user.id,
+                shift_id__in=[shift.pk for shift in shifts],
+            ).values_list("shift_id", flat=True)
+        )
+        membership_status = (
+            FacilityMembership.objects.filter(
+                facility=facility, user_account__user_id=user.id
+            )
+            .values_list("status", flat=True)
+            .first()
+        )
+
+        context["facility"] = facility
+        context["first_date"] = first_date
+        context["last_date"] = last_date
+        context["days"] = group_shifts_by_day(shifts, first_date, last_date)
+        context["joined_shift_ids"] = joined_shift_ids
+        context.update(self.get_signup_context(shifts))
+        context["is_facility_member"] = is_facility_member(user, facility)
+        context["is_membership_pending"] = (
+            membership_status == FacilityMembership.Status.PENDING
+        )
+        context["is_membership_rejected"] = (
+            membership_status == FacilityMembership.Status.REJECTED
+        )
+        context["previous_url"] = self.get_range_url(
+            facility, first_date - timedelta(days=days), days
+        )
+        context["next_url"] = self.get_range_url(
+            facility, first_date + timedelta(days=days), days
+        )
+        return context
+
+    def get_success_url(self):
+        """
+        Redirect to the same page.
+        """
+        url = reverse("planner_range", kwargs=self.kwargs)
+        if self.request.GET:
+            url = "{}?{}".format(url, self.request.GET.urlencode())
+        return url
+
+
+class TimelineDataView(LoginRequiredMixin, View):
+    """
+    Timeline data of the facility schedule page, see scheduler.timeline.
+
+    The data is the same for all users, so it is cached and can be revalidated
+    with its ETag.
+    """
+
+    def get(self, request, *args, **kwargs):
+        schedule_date = get_schedule_date(self.kwargs)
+        facility = get_object_or_404(
+            Facility.objects.exclude(
+                timeline_enabled=Facility.TimelineViewMode.DISABLED
+            ).only("pk"),
+            slug=self.kwargs["facility_slug"],
+        )
+
+        cache_key = timeline.get_cache_key(facility.pk, schedule_date)
+        etag = timeline.get_etag(cache_key)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            data = timeline.get_timeline_data(facility.pk, schedule_date, cache_key)
+            response = JsonResponse(data)
+            response["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class PlannerSlotsView(LoginRequiredMixin, View):
+    """
+    Slot counts of a facility's shifts on a day, polled by the facility
+    schedule page, see scheduler.live_updates.
+
+    The counts are the same for all users, so they are cached and can be
+    revalidated with their ETag.
+    """
+
+    def get(self, request, *args, **kwargs):
+        if not LIVE_UPDATES_ENABLED:
+            raise Http404("Live updates are disabled")
+        schedule_date = get_schedule_date(self.kwargs)
+        facility = get_object_or_404(
+            Facility.objects.only("pk"), slug=self.kwargs["facility_slug"]
+        )
+
+        cache_key = live_updates.get_cache_key(facility.pk, schedule_date)
+        etag = live_updates.get_etag(cache_key)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            counts = live_updates.get_slot_counts(facility.pk, schedule_date, cache_key)
+            response = JsonResponse(counts, safe=False)
+            response["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
 class SendMessageToShiftHelpers(LoginRequiredMixin, FormView):
     """
     View processes the sending of an email to all shift helpers.
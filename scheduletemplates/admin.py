@@ -3,6 +3,7 @@ from datetime import datetime, time, timedelta
 from django import forms
 from django.contrib import admin, messages
 from django.core.exceptions import ValidationError
+from django.db import transaction
 from django.db.models import Count, F, Min, Sum
 from django.forms import DateInput, TimeInput
 from django.http import HttpResponseForbidden
@@ -19,6 +20,7 @@ from organizations.admin import (
     MembershipFilteredAdmin,
     MembershipFilteredTabularInline,
 )
+from scheduler import partitions
 from scheduler.admin import (
     FormattedModelChoiceFieldAdminMixin,
     facility_mismatch_error_message,
@@ -271,17 +273,32 @@ class ScheduleTemplateAdmin(MembershipFilteredAdmin):
 
             # Phase 3: Create shifts
             elif request.POST.get("confirm") or request.POST.get("confirm_and_repeat"):
-                for template in selected_shift_templates:
-                    starting_time = datetime.combine(apply_date, template.starting_time)
-                    Shift.objects.create(
-                        facility=template.schedule_template.facility,
-                        starting_time=starting_time,
-                        ending_time=starting_time + template.duration,
-                        task=template.task,
-                        workplace=template.workplace,
-                        slots=template.slots,
-                        members_only=template.members_only,
+                partitions.ensure_partitions(until=apply_date)
+                try:
+                    with transaction.atomic():
+                        for template in selected_shift_templates:
+                            starting_time = datetime.combine(
+                                apply_date, template.starting_time
+                            )
+                            Shift.objects.create(
+                                facility=template.schedule_template.facility,
+                                starting_time=starting_time,
+                                ending_time=starting_time + template.duration,
+                                task=template.task,
+                                workplace=template.workplace,
+                                slots=template.slots,
+                                members_only=template.members_only,
+                            )
+                except ValidationError:
+                    # templates saved before SHIFT_MAX_DURATION was set
+                    messages.error(
+                        request,
+                        _(
+                            "Shifts of the selected templates are too long, "
+                            "no shifts were added."
+                        ),
                     )
+                    return redirect("admin:apply_schedule_template", pk)
 
                 messages.success(
                     request,
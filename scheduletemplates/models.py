@@ -1,5 +1,6 @@
 from datetime import datetime, time, timedelta
 
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
 from django.db import models
 from django.templatetags.l10n import localize
@@ -7,6 +8,7 @@ from django.utils import timezone
 from django.utils.timezone import get_current_timezone, make_aware
 from django.utils.translation import gettext_lazy as _, ngettext_lazy
 
+from scheduler.settings import SHIFT_MAX_DURATION
 from . import managers
 
 
@@ -120,6 +122,16 @@ class ShiftTemplate(models.Model):
     def __str__(self):
         return self.__unicode__()
 
+    def clean(self):
+        super(ShiftTemplate, self).clean()
+        if not (self.starting_time and self.ending_time):
+            return
+        if self.days == 0 and self.starting_time >= self.ending_time:
+            self.days = 1
+        # shifts created from the template would be rejected
+        if SHIFT_MAX_DURATION and self.duration > SHIFT_MAX_DURATION:
+            raise ValidationError({"ending_time": _("Shift is too long.")})
+
     def save(
         self, force_insert=False, force_update=False, using=None, update_fields=None
     ):
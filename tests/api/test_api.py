@@ -0,0 +1,126 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+
+from api.pagination import decode_cursor, encode_cursor
+from tests.factories import FacilityFactory, PlaceFactory, ShiftFactory
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def create_shifts(count, **kwargs):
+    starting_time = timezone.now() + timedelta(hours=1)
+    return [
+        ShiftFactory.create(
+            starting_time=starting_time + timedelta(minutes=30 * (index // 2)),
+            ending_time=starting_time + timedelta(hours=2),
+            **kwargs,
+        )
+        for index in range(count)
+    ]
+
+
+def test_cursor_roundtrip():
+    assert decode_cursor(encode_cursor(["2022-05-02T08:00:00Z", 3]), 2) == [
+        "2022-05-02T08:00:00Z",
+        3,
+    ]
+
+
+@pytest.mark.django_db
+def test_shifts_are_paginated_by_cursor(client):
+    shifts = create_shifts(5)
+
+    ids, url = [], reverse("api_shifts") + "?limit=2&fields=id"
+    while url:
+        data = client.get(url).json()
+        ids += [shift["id"] for shift in data["results"]]
+        url = data["next"]
+
+    assert ids == [shift.pk for shift in shifts]
+
+
+@pytest.mark.django_db
+def test_sparse_fields(client):
+    create_shifts(1)
+
+    data = client.get(reverse("api_shifts"), {"fields": "id,slots"}).json()
+
+    assert list(data["results"][0]) == ["id", "slots"]
+    response = client.get(reverse("api_shifts"), {"fields": "id,password"})
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_shifts_are_filtered_by_geography_and_open(client):
+    place = PlaceFactory.create()
+    shift = create_shifts(1, facility=FacilityFactory.create(place=place))[0]
+    create_shifts(1)
+    ShiftFactory.create(
+        facility=shift.facility,
+        starting_time=timezone.now() - timedelta(hours=3),
+        ending_time=timezone.now() - timedelta(hours=2),
+    )
+
+    data = client.get(
+        reverse("api_shifts"),
+        {"geography": "region:{}".format(place.area.region_id), "open": "1"},
+    ).json()
+
+    assert [result["id"] for result in data["results"]] == [shift.pk]
+
+
+@pytest.mark.django_db
+def test_unchanged_data_is_not_sent_again(client):
+    FacilityFactory.create()
+    etag = client.get(reverse("api_facilities"))["ETag"]
+
+    response = client.get(reverse("api_facilities"), HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+
+
+@pytest.mark.django_db
+def test_places_are_listed_parents_first(client, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        place = PlaceFactory.create()
+
+    results = client.get(reverse("api_places")).json()["results"]
+
+    ids = [result["id"] for result in results]
+    area, region = place.area, place.area.region
+    chain = [
+        "country:{}".format(region.country_id),
+        "region:{}".format(region.pk),
+        "area:{}".format(area.pk),
+        "place:{}".format(place.pk),
+    ]
+    assert sorted(chain, key=ids.index) == chain
+    assert results[ids.index(chain[-1])]["parent"] == chain[-2]
+
+
+@pytest.mark.django_db
+def test_requests_are_rate_limited(client, monkeypatch):
+    calls = []
+
+    def script(keys, args):
+        # stand-in for the token bucket script, Redis is not available here
+        calls.append(keys)
+        return [1, "0"] if len(calls) <= 2 else [0, "1.5"]
+
+    monkeypatch.setattr("common.ratelimit.RATELIMIT_ENABLED", True)
+    monkeypatch.setattr("common.ratelimit.get_script", lambda: script)
+
+    responses = [client.get(reverse("api_places")) for _ in range(3)]
+
+    assert [response.status_code for response in responses] == [200, 200, 429]
+    assert responses[-1]["Retry-After"] == "2"
+    assert calls[0] == ["ratelimit:api:ip:127.0.0.1"]
@@ -0,0 +1,118 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+
+from api import changes
+from api.models import ShiftChange
+from tests.factories import ShiftFactory, ShiftHelperFactory
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(monkeypatch):
+    monkeypatch.setattr("api.views.CHANGE_LOG_SETTLE_TIME", 0)
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def on_commit(django_capture_on_commit_callbacks):
+    return lambda: django_capture_on_commit_callbacks(execute=True)
+
+
+@pytest.mark.django_db
+def test_changes_are_recorded_once_per_transaction(on_commit):
+    with on_commit():
+        shift = ShiftFactory.create()
+        shift.slots = 5
+        shift.save()
+    with on_commit():
+        ShiftHelperFactory.create(shift=shift)
+    shift_id = shift.pk
+    with on_commit():
+        shift.delete()
+
+    assert [
+        (change.shift_id, change.facility_id, change.action)
+        for change in ShiftChange.objects.all()
+    ] == [
+        (shift_id, shift.facility_id, ShiftChange.Action.CREATED),
+        (shift_id, shift.facility_id, ShiftChange.Action.UPDATED),
+        (shift_id, shift.facility_id, ShiftChange.Action.DELETED),
+    ]
+
+
+@pytest.mark.django_db
+def test_rolled_back_changes_are_not_recorded(on_commit):
+    with transaction.atomic():
+        ShiftFactory.create_batch(2)
+        transaction.set_rollback(True)
+    with on_commit():
+        shift = ShiftFactory.create()
+
+    assert [change.shift_id for change in ShiftChange.objects.all()] == [shift.pk]
+
+
+@pytest.mark.django_db
+def test_changes_since_cursor(client, on_commit):
+    with on_commit():
+        first, second = ShiftFactory.create_batch(2)
+    cursor = client.get(reverse("api_changes")).json()["cursor"]
+    with on_commit():
+        ShiftHelperFactory.create(shift=second)
+
+    data = client.get(reverse("api_changes"), {"since": cursor}).json()
+
+    assert [(c["shift"], c["action"]) for c in data["results"]] == [
+        (second.pk, "updated")
+    ]
+    assert data["cursor"] > cursor
+
+
+@pytest.mark.django_db
+def test_compaction_keeps_latest_change_per_shift(on_commit):
+    with on_commit():
+        shift = ShiftFactory.create()
+    for _ in range(3):
+        with on_commit():
+            shift.save()
+    latest = ShiftChange.objects.last()
+
+    changes.compact(now=timezone.now() + timedelta(hours=2))
+
+    assert list(ShiftChange.objects.all()) == [latest]
+
+
+@pytest.mark.django_db
+def test_truncated_changes_are_gone(client, on_commit):
+    with on_commit():
+        ShiftFactory.create()
+    changes.compact(now=timezone.now() + timedelta(days=8))
+
+    response = client.get(reverse("api_changes"), {"since": 0})
+    assert response.status_code == 410
+    # the client fetches all shifts again and then polls from the head
+    cursor = response.json()["cursor"]
+    with on_commit():
+        shift = ShiftFactory.create()
+
+    data = client.get(reverse("api_changes"), {"since": cursor}).json()
+    assert [change["shift"] for change in data["results"]] == [shift.pk]
+
+
+@pytest.mark.django_db
+def test_polling_starts_at_the_head(client, on_commit):
+    with on_commit():
+        ShiftFactory.create_batch(2)
+
+    data = client.get(reverse("api_changes")).json()
+    assert data["results"] == []
+    with on_commit():
+        shift = ShiftFactory.create()
+
+    data = client.get(reverse("api_changes"), {"since": data["cursor"]}).json()
+    assert [change["shift"] for change in data["results"]] == [shift.pk]
@@ -0,0 +1,114 @@
+import json
+import logging
+
+import pytest
+
+from common import brace_format_logging
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append((record, self.format(record)))
+
+
+class LevelFilter(logging.Filter):
+    def __init__(self, level):
+        super().__init__()
+        self.level = level
+
+    def filter(self, record):  # noqa: A003
+        return record.levelno >= self.level
+
+
+@pytest.fixture
+def handler():
+    handler = ListHandler()
+    logger = logging.getLogger("tests.brace_format_logging")
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+    yield handler
+    logger.removeHandler(handler)
+
+
+@pytest.fixture
+def logger():
+    return brace_format_logging.getLogger(
+        "tests.brace_format_logging", {"adapter_extra": "adapter"}
+    )
+
+
+def test_message_formatting(handler, logger):
+    class SomeObj:
+        some_property = "property"
+
+    logger.info(
+        "{} {extra[extra_key]} {kwargs_key} {extra_key} {obj.some_property} "
+        "{adapter_extra}",
+        "positional",
+        kwargs_key=123,
+        obj=SomeObj,
+        extra={"extra_key": "keyword"},
+    )
+
+    record, message = handler.records[0]
+    assert message == "positional keyword 123 keyword property adapter"
+
+
+def test_message_without_fields_is_not_formatted(handler, logger):
+    logger.info("{{literal}} braces", unused="value")
+
+    assert handler.records[0][1] == "{literal} braces"
+
+
+def test_disabled_level_creates_no_record(handler, logger):
+    logging.getLogger("tests.brace_format_logging").setLevel(logging.INFO)
+
+    logger.debug("{missing}")
+
+    assert not handler.records
+
+
+def test_json_formatter(handler, logger):
+    handler.setFormatter(brace_format_logging.JsonFormatter())
+
+    logger.warning("Shift {shift} changed", shift=42, extra={"facility": "F"})
+
+    data = json.loads(handler.records[0][1])
+    assert data["message"] == "Shift 42 changed"
+    assert data["template"] == "Shift {shift} changed"
+    assert data["level"] == "WARNING"
+    assert data["context"] == {"shift": 42, "facility": "F", "adapter_extra": "adapter"}
+
+
+def test_queue_listener_handler():
+    config = {
+        "version": 1,
+        "filters": {"warnings": {"()": LevelFilter, "level": logging.WARNING}},
+        "handlers": {
+            "target": {"()": ListHandler, "filters": ["warnings"]},
+            "queued": {
+                "class": "common.brace_format_logging.QueueListenerHandler",
+                "handlers": ["target"],
+            },
+        },
+        "loggers": {"tests.queued": {"handlers": ["queued"], "propagate": False}},
+    }
+    queued = brace_format_logging.QueueListenerHandler(handlers=["target"])
+    logging.getLogger("tests.queued").addHandler(queued)
+    logging.getLogger("tests.queued").setLevel(logging.DEBUG)
+    logger = brace_format_logging.getLogger("tests.queued")
+
+    # records emitted before the handlers are known are kept
+    logger.warning("queued {value}", value=1)
+    brace_format_logging.start_queue_listeners(config)
+    logger.info("filtered")
+    queued.close()
+    logging.getLogger("tests.queued").removeHandler(queued)
+
+    ((record, message),) = queued.handlers[0].records
+    assert message == "queued 1"
+    assert record.msg.context == {"extra": {}, "value": 1}
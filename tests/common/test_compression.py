@@ -0,0 +1,95 @@
+import gzip
+
+import pytest
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+
+from common import compression
+from common.compression import (
+    CompressionMiddleware,
+    CompressionStats,
+    accepted_encodings,
+)
+
+CONTENT = b'<script>var facilities = [{"name": "Facility"}];</script>' * 100
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(monkeypatch):
+    monkeypatch.setattr(compression, "COMPRESSION_STATS_FLUSH_INTERVAL", 0)
+    monkeypatch.setattr(compression, "stats", CompressionStats())
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def get_response(response, accept_encoding="gzip", **meta):
+    request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept_encoding, **meta)
+    return CompressionMiddleware(lambda request: response)(request)
+
+
+def test_accepted_encodings():
+    assert accepted_encodings("gzip;q=0.5, br, deflate;q=0") == {"gzip", "br"}
+
+
+def test_large_responses_are_compressed():
+    original = HttpResponse(CONTENT)
+    original["ETag"] = '"abc"'
+
+    response = get_response(original)
+
+    assert response["Content-Encoding"] == "gzip"
+    assert response["ETag"] == 'W/"abc"'
+    assert "Accept-Encoding" in response["Vary"]
+    assert int(response["Content-Length"]) == len(response.content)
+    assert gzip.decompress(response.content) == CONTENT
+
+
+@pytest.mark.parametrize(
+    "response, accept_encoding",
+    [
+        (HttpResponse(b"small"), "gzip"),
+        (HttpResponse(CONTENT, content_type="image/png"), "gzip"),
+        (HttpResponse(CONTENT), "identity"),
+    ],
+)
+def test_responses_are_not_compressed(response, accept_encoding):
+    assert not get_response(response, accept_encoding).has_header("Content-Encoding")
+
+
+def test_streaming_responses_are_compressed():
+    chunks = (CONTENT for _ in range(3))
+
+    response = get_response(StreamingHttpResponse(chunks))
+
+    assert response["Content-Encoding"] == "gzip"
+    assert gzip.decompress(b"".join(response.streaming_content)) == CONTENT * 3
+
+
+def test_pages_with_csrf_token_are_padded_and_gzipped(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", object())
+
+    lengths = {
+        len(
+            get_response(
+                HttpResponse(CONTENT), "br, gzip", CSRF_COOKIE_USED=True
+            ).content
+        )
+        for _ in range(20)
+    }
+
+    assert len(lengths) > 1
+
+
+@pytest.mark.django_db
+def test_bytes_saved_are_recorded_per_view(client, monkeypatch):
+    monkeypatch.setattr(compression, "COMPRESSION_MIN_SIZE", 0)
+
+    response = client.get(reverse("home"), HTTP_ACCEPT_ENCODING="gzip")
+
+    assert response["Content-Encoding"] == "gzip"
+    stats = CompressionStats.collect()["home"]
+    assert stats["responses"] == 1
+    assert stats["compressed"] == len(response.content) < stats["original"]
@@ -0,0 +1,60 @@
+import time
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from common import db_connections
+
+
+class FakeConnection:
+    alias = "default"
+    in_atomic_block = False
+
+    def __init__(self, last_used, usable=False):
+        self.connection = object()
+        self.last_used = last_used
+        self.usable = usable
+        self.checked = False
+
+    def is_usable(self):
+        self.checked = True
+        return self.usable
+
+    def close(self):
+        self.connection = None
+
+
+@pytest.fixture
+def fake_connections(monkeypatch):
+    fakes = []
+    monkeypatch.setattr(db_connections.connections, "all", lambda: fakes)
+    return fakes
+
+
+def test_idle_unusable_connections_are_closed(fake_connections):
+    idle = time.monotonic() - db_connections.DATABASE_CONN_HEALTH_CHECK_IDLE - 1
+    fake_connections += [FakeConnection(idle), FakeConnection(idle, usable=True)]
+
+    db_connections.check_connections()
+
+    assert fake_connections[0].connection is None
+    assert fake_connections[1].connection is not None
+
+
+def test_busy_connections_are_not_checked(fake_connections):
+    fake_connections.append(FakeConnection(time.monotonic()))
+
+    db_connections.check_connections()
+
+    assert not fake_connections[0].checked
+    assert fake_connections[0].connection is not None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_check_db_connection_benchmark():
+    out = StringIO()
+    call_command("check_db_connection", "--benchmark", "5", stdout=out)
+
+    assert "Requests without reuse" in out.getvalue()
+    assert "Requests with reuse" in out.getvalue()
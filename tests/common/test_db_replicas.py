@@ -0,0 +1,100 @@
+from contextlib import contextmanager
+
+import pytest
+from django.db import connections, router
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+
+from common import db_replicas
+from organizations.models import Facility
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    monkeypatch.setattr(db_replicas, "DATABASE_REPLICAS", ["replica"])
+    monkeypatch.setattr(db_replicas, "_health", {})
+    return "replica"
+
+
+def call_view(path, method="get", **cookies):
+    """Calls a view through the middleware, returns the response and the
+    database which reads were routed to."""
+    routed = []
+
+    def view(request):
+        routed.append(router.db_for_read(Facility))
+        return HttpResponse()
+
+    def get_response(request):
+        request.resolver_match = resolve(path)
+        middleware.process_view(request, view, (), {})
+        return view(request)
+
+    middleware = db_replicas.ReplicaMiddleware(get_response)
+    request = getattr(RequestFactory(), method)(path)
+    request.COOKIES.update(cookies)
+    response = middleware(request)
+    return response, routed[0]
+
+
+@pytest.mark.django_db(databases=["default", "replica"])
+def test_reads_go_to_the_replica(replica):
+    with db_replicas.replica_reads():
+        with CaptureQueriesContext(connections["replica"]) as queries:
+            assert not Facility.objects.exists()
+        assert router.db_for_write(Facility) == "default"
+
+    assert len(queries) == 1
+    assert router.db_for_read(Facility) == "default"
+
+
+@pytest.mark.django_db(databases=["default", "replica"])
+def test_only_designated_views_read_from_the_replica(replica):
+    assert call_view("/helpdesk/")[1] == "replica"
+    assert call_view("/account/")[1] == "default"
+
+
+@pytest.mark.django_db(databases=["default", "replica"])
+def test_clients_are_pinned_to_the_primary_after_changes(replica):
+    response, _db = call_view("/helpdesk/", method="post")
+    cookie = response.cookies[db_replicas.DATABASE_REPLICA_PIN_COOKIE]
+    assert cookie["max-age"] == db_replicas.DATABASE_REPLICA_PIN_SECONDS
+
+    assert call_view("/helpdesk/", vp_primary="1")[1] == "default"
+
+
+def test_unhealthy_replicas_are_not_used(replica, monkeypatch):
+    monkeypatch.setattr(db_replicas, "check_replica", lambda alias: False)
+
+    assert db_replicas.get_replica() is None
+
+
+class FakeReplicaConnection:
+    """A PostgreSQL replica connection returning ``lag`` for the lag query."""
+
+    vendor = "postgresql"
+
+    def __init__(self, lag):
+        self.lag = lag
+        self.queries = []
+
+    @contextmanager
+    def cursor(self):
+        yield self
+
+    def execute(self, sql):
+        self.queries.append(sql)
+
+    def fetchone(self):
+        return (self.lag,)
+
+
+@pytest.mark.parametrize("lag, healthy", [(None, True), (0, True), (60, False)])
+def test_replicas_lagging_behind_are_unhealthy(monkeypatch, lag, healthy):
+    connection = FakeReplicaConnection(lag)
+    monkeypatch.setattr(db_replicas, "connections", {"replica": connection})
+
+    assert db_replicas.check_replica("replica") == healthy
+    assert connection.queries == [db_replicas.REPLICATION_LAG_SQL]
@@ -0,0 +1,96 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.template import Context, Template, TemplateSyntaxError
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone, translation
+
+from common.cache_versions import bump_version
+from tests.factories import ShiftFactory, UserAccountFactory
+
+TEMPLATE = (
+    "{% load fragment_cache %}"
+    '{% versioned_cache 60 "fragment" "tests.fragment" pk %}'
+    "{{ counter }}"
+    "{% endversioned_cache %}"
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def render(pk=1):
+    calls = []
+
+    def counter():
+        calls.append(True)
+        return len(calls)
+
+    return Template(TEMPLATE).render(Context({"counter": counter, "pk": pk})), calls
+
+
+def test_fragments_are_cached_until_the_version_is_bumped():
+    assert render()[1]
+    assert not render()[1]
+
+    bump_version("tests.fragment")
+    assert render()[1]
+
+
+def test_fragments_vary_on_values_and_language():
+    render()
+
+    assert render(pk=2)[1]
+    with translation.override("de"):
+        assert render()[1]
+
+
+def test_timeout_must_be_an_integer():
+    with pytest.raises(TemplateSyntaxError):
+        Template(
+            '{% load fragment_cache %}{% versioned_cache "soon" "f" "n" %}'
+            "{% endversioned_cache %}"
+        ).render(Context())
+
+
+@pytest.mark.django_db
+def test_geographic_helpdesk_shifts_are_cached(
+    client, django_capture_on_commit_callbacks
+):
+    start = timezone.now() + timedelta(days=1)
+    shift = ShiftFactory.create(
+        starting_time=start, ending_time=start + timedelta(hours=2)
+    )
+    url = shift.facility.place.area.region.country.get_absolute_url()
+    # logged in users bypass the page cache
+    client.force_login(UserAccountFactory.create().user)
+
+    with CaptureQueriesContext(connection) as uncached:
+        assert shift.facility.name in client.get(url).content.decode()
+    with CaptureQueriesContext(connection) as cached:
+        assert shift.facility.name in client.get(url).content.decode()
+    assert len(cached) < len(uncached)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        shift.facility.name = "Renamed"
+        shift.facility.save()
+    assert "Renamed" in client.get(url).content.decode()
+
+
+@pytest.mark.django_db
+def test_benchmark_templates():
+    ShiftFactory.create()
+    out = StringIO()
+
+    call_command("benchmark_templates", "--repeat", "2", stdout=out)
+
+    assert "helpdesk_single.html" in out.getvalue()
+    assert "cached fragment" in out.getvalue()
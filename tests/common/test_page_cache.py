@@ -0,0 +1,73 @@
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from common.page_cache import CSRF_TOKEN_PLACEHOLDER
+from tests.factories import FacilityFactory, UserAccountFactory
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.mark.django_db
+def test_anonymous_page_is_served_from_cache(client, django_assert_num_queries):
+    assert client.get(reverse("home"))["X-Page-Cache"] == "miss"
+
+    with django_assert_num_queries(0):
+        response = client.get(reverse("home"))
+
+    assert response["X-Page-Cache"] == "hit"
+    assert "Accept-Language" in response["Vary"]
+    assert "Cookie" in response["Vary"]
+
+
+@pytest.mark.django_db
+def test_csrf_token_is_personal(client):
+    client.get(reverse("home"))
+
+    response = client.get(reverse("home"))
+
+    content = response.content.decode()
+    assert CSRF_TOKEN_PLACEHOLDER not in content
+    assert 'name="csrfmiddlewaretoken"' in content
+    assert response.cookies["csrftoken"]
+    assert "private" in response["Cache-Control"]
+
+
+@pytest.mark.django_db
+def test_pages_are_cached_per_language(client):
+    client.get(reverse("home"), HTTP_ACCEPT_LANGUAGE="de")
+
+    response = client.get(reverse("home"), HTTP_ACCEPT_LANGUAGE="en")
+
+    assert response["X-Page-Cache"] == "miss"
+
+
+@pytest.mark.django_db
+def test_logged_in_users_bypass_cache(client):
+    client.force_login(UserAccountFactory.create().user)
+
+    response = client.get(reverse("home"))
+
+    assert response.status_code == 302
+    assert "X-Page-Cache" not in response
+
+
+@pytest.mark.django_db
+def test_facility_changes_invalidate_pages(client, django_capture_on_commit_callbacks):
+    facility = FacilityFactory.create()
+    url = reverse("facility", args=[facility.organization.slug, facility.slug])
+    client.get(url)
+    assert client.get(url)["X-Page-Cache"] == "hit"
+
+    facility.name = "Renamed facility"
+    with django_capture_on_commit_callbacks(execute=True):
+        facility.save()
+
+    response = client.get(url)
+    assert response["X-Page-Cache"] == "miss"
+    assert "Renamed facility" in response.content.decode()
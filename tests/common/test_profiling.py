@@ -0,0 +1,65 @@
+import pytest
+from django.urls import reverse
+
+from common.models import RequestProfile
+from tests.factories import UserAccountFactory
+
+
+@pytest.fixture
+def staff_client(client):
+    user_account = UserAccountFactory.create(user__is_staff=True)
+    client.force_login(user_account.user)
+    return client
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "query, mode",
+    [
+        ("_profile", RequestProfile.Mode.DETERMINISTIC),
+        ("_profile=cprofile", RequestProfile.Mode.DETERMINISTIC),
+        ("_profile=sample", RequestProfile.Mode.SAMPLED),
+    ],
+)
+def test_staff_user_can_profile_request(staff_client, query, mode):
+    response = staff_client.get(f"{reverse('helpdesk')}?{query}")
+
+    assert response.status_code == 200
+    profile = RequestProfile.objects.get()
+    assert response["X-Profile-Id"] == str(profile.pk)
+    assert profile.mode == mode
+    assert profile.view_name == "helpdesk"
+    assert profile.sql_count == len(profile.sql_timeline) > 0
+    assert profile.data
+
+
+@pytest.mark.django_db
+def test_profile_requested_by_header(staff_client):
+    staff_client.get(reverse("helpdesk"), HTTP_X_PROFILE="sample")
+
+    assert RequestProfile.objects.get().mode == RequestProfile.Mode.SAMPLED
+
+
+@pytest.mark.django_db
+def test_non_staff_user_can_not_profile_request(client):
+    user_account = UserAccountFactory.create()
+    client.force_login(user_account.user)
+
+    response = client.get(f"{reverse('helpdesk')}?_profile")
+
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response
+    assert not RequestProfile.objects.exists()
+
+
+@pytest.mark.django_db
+def test_profile_download(admin_client, staff_client):
+    staff_client.get(f"{reverse('helpdesk')}?_profile")
+    profile = RequestProfile.objects.get()
+
+    response = admin_client.get(
+        reverse("admin:common_requestprofile_download", args=[profile.pk])
+    )
+
+    assert response.status_code == 200
+    assert bytes(profile.data) == response.content
@@ -0,0 +1,123 @@
+import pytest
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from common import ratelimit
+from tests.factories import UserFactory
+
+
+@pytest.fixture(autouse=True)
+def enabled(monkeypatch):
+    monkeypatch.setattr(ratelimit, "RATELIMIT_ENABLED", True)
+    monkeypatch.setattr(ratelimit, "RATELIMITS", {"test": {"rate": "6/m", "burst": 2}})
+
+
+def view(request):
+    return HttpResponse("ok")
+
+
+def test_parse_rate():
+    assert ratelimit.parse_rate("30/m") == 0.5
+
+
+class FakeScript:
+    """Records the buckets of the calls, buckets in ``empty`` have no tokens."""
+
+    def __init__(self, empty=()):
+        self.empty = empty
+        self.calls = []
+
+    def __call__(self, keys, args):
+        self.calls.append((keys, args))
+        if any(key in self.empty for key in keys):
+            return [0, "2.5"]
+        return [1, "0"]
+
+
+@pytest.fixture
+def logged_in_request(client):
+    """A POST request of a logged-in user, whose user is looked up lazily."""
+    user = UserFactory.create()
+    client.force_login(user)
+    request = RequestFactory().post("/", REMOTE_ADDR="10.0.0.1")
+    request.COOKIES.update(
+        {name: cookie.value for name, cookie in client.cookies.items()}
+    )
+    SessionMiddleware(lambda request: None).process_request(request)
+    AuthenticationMiddleware(lambda request: None).process_request(request)
+    return user, request
+
+
+@pytest.mark.django_db
+def test_buckets_are_kept_per_ip_and_user(monkeypatch, logged_in_request):
+    user, request = logged_in_request
+    script = FakeScript()
+    monkeypatch.setattr(ratelimit, "get_script", lambda: script)
+    monkeypatch.setattr(ratelimit, "RATELIMIT_IP_MULTIPLIER", 20)
+
+    response = ratelimit.ratelimit("test")(view)(request)
+
+    assert response.status_code == 200
+    assert script.calls == [
+        (["ratelimit:test:ip:10.0.0.1"], [40, 2.0]),
+        (["ratelimit:test:user:{}".format(user.pk)], [2, 0.1]),
+    ]
+
+
+def test_anonymous_requests_use_the_ip_bucket_only(monkeypatch):
+    script = FakeScript()
+    monkeypatch.setattr(ratelimit, "get_script", lambda: script)
+    request = RequestFactory().post("/", REMOTE_ADDR="10.0.0.1")
+    request.user = AnonymousUser()
+
+    response = ratelimit.ratelimit("test")(view)(request)
+
+    assert response.status_code == 200
+    assert [keys for keys, args in script.calls] == [["ratelimit:test:ip:10.0.0.1"]]
+
+
+@pytest.mark.django_db
+def test_requests_limited_by_ip_do_no_database_work(
+    monkeypatch, logged_in_request, django_assert_num_queries
+):
+    user, request = logged_in_request
+    script = FakeScript(empty={"ratelimit:test:ip:10.0.0.1"})
+    monkeypatch.setattr(ratelimit, "get_script", lambda: script)
+
+    with django_assert_num_queries(0):
+        response = ratelimit.ratelimit("test")(view)(request)
+
+    assert response.status_code == 429
+    assert response["Retry-After"] == "3"
+    assert len(script.calls) == 1
+
+
+@pytest.mark.django_db
+def test_requests_are_limited_by_user(monkeypatch, logged_in_request):
+    user, request = logged_in_request
+    script = FakeScript(empty={"ratelimit:test:user:{}".format(user.pk)})
+    monkeypatch.setattr(ratelimit, "get_script", lambda: script)
+
+    response = ratelimit.ratelimit("test")(view)(request)
+
+    assert response.status_code == 429
+
+
+def test_only_limited_methods_are_checked(monkeypatch):
+    monkeypatch.setattr(ratelimit, "consume", lambda scope, request: 1)
+
+    response = ratelimit.ratelimit("test")(view)(RequestFactory().get("/"))
+
+    assert response.status_code == 200
+
+
+def test_requests_pass_without_redis(monkeypatch):
+    monkeypatch.setattr("common.redis_client.REDIS_URL", "redis://127.0.0.1:1/")
+    monkeypatch.setattr("common.redis_client._client", None)
+
+    response = ratelimit.ratelimit("test")(view)(RequestFactory().post("/"))
+
+    assert response.status_code == 200
@@ -0,0 +1,53 @@
+import pytest
+
+from common.rich_text import EXCERPT_LENGTH, excerpt, sanitize
+from tests.factories import FacilityFactory
+
+UNSAFE = (
+    '<p onclick="steal()">Open <strong>daily</strong></p>'
+    "<script>steal()</script>"
+    '<a href="javascript:steal()">map</a> '
+    '<a href="https://example.org" target="_blank">site</a>'
+    '<span style="color: red; position: fixed">!</span>'
+)
+
+
+def test_unsafe_markup_is_removed():
+    assert sanitize(UNSAFE) == (
+        "<p>Open <strong>daily</strong></p>"
+        "<a>map</a> "
+        '<a href="https://example.org" target="_blank">site</a>'
+        '<span style="color: red;">!</span>'
+    )
+
+
+def test_sanitizing_is_idempotent():
+    assert sanitize(sanitize(UNSAFE)) == sanitize(UNSAFE)
+
+
+def test_excerpts_are_plain_text():
+    assert excerpt("<p>Fish &amp; chips</p><p>daily<br>from 8</p>") == (
+        "Fish & chips daily from 8"
+    )
+    assert len(excerpt("<p>{}</p>".format("x" * 1000))) == EXCERPT_LENGTH
+
+
+@pytest.mark.django_db
+def test_rich_text_is_sanitized_when_saved():
+    facility = FacilityFactory.create(description=UNSAFE)
+    facility.refresh_from_db()
+
+    assert facility.description == UNSAFE
+    assert facility.description_html == sanitize(UNSAFE)
+    assert facility.description_excerpt == "Open daily map site!"
+
+
+@pytest.mark.django_db
+def test_sanitized_copies_are_saved_with_update_fields():
+    facility = FacilityFactory.create(description="<p>old</p>")
+    facility.description = "<p>new</p>"
+    facility.save(update_fields=["description"])
+    facility.refresh_from_db()
+
+    assert facility.description_html == "<p>new</p>"
+    assert facility.description_excerpt == "new"
@@ -0,0 +1,80 @@
+import random
+import threading
+import time
+
+import pytest
+from django.core.cache import cache
+
+from common import stampede
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+class Builder:
+    def __init__(self, duration=0):
+        self.duration = duration
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.duration)
+        return self.calls
+
+
+def test_concurrent_misses_compute_once():
+    builder = Builder(duration=0.2)
+    results = []
+
+    def request():
+        results.append(stampede.get_or_recompute("key", builder, 60))
+
+    threads = [threading.Thread(target=request) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert builder.calls == 1
+    assert results == [1] * 10
+
+
+def test_expired_values_are_served_while_recomputed():
+    builder = Builder()
+    stampede.get_or_recompute("key", builder, 60)
+    # expired a second ago
+    cache.set("key", (1, time.time() - 1, 0.0))
+
+    # another process recomputes the value
+    cache.add(stampede.lock_key("key"), True)
+    assert stampede.get_or_recompute("key", builder, 60) == 1
+    assert builder.calls == 1
+
+    cache.delete(stampede.lock_key("key"))
+    assert stampede.get_or_recompute("key", builder, 60) == 2
+
+
+def test_values_are_refreshed_early(monkeypatch):
+    builder = Builder()
+    stampede.get_or_recompute("key", builder, 60)
+    assert stampede.get_or_recompute("key", builder, 60) == 1
+
+    # a value computed in a long time is refreshed with some probability
+    monkeypatch.setattr(stampede.random, "random", lambda: 0.5)
+    cache.set("key", (1, time.time() + 5, 10.0))
+    assert stampede.get_or_recompute("key", builder, 60) == 2
+
+
+def test_needs_refresh_is_more_likely_towards_expiry(monkeypatch):
+    monkeypatch.setattr(stampede, "random", random.Random(0))
+    now = time.time()
+    refreshed = [
+        sum(stampede.needs_refresh(now + remaining, 1.0) for _ in range(1000))
+        for remaining in (0.1, 1, 100)
+    ]
+
+    assert refreshed[0] > refreshed[1] > refreshed[2] == 0
@@ -0,0 +1,56 @@
+import gzip
+
+import pytest
+
+from common import static_file_compressor
+from common.static_file_compressor import CompressedStaticFilesStorage
+
+SCRIPT = "function add(first, second) {\n    return first + second;\n}\n"
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        static_file_compressor,
+        "STATICFILES_POSTPROCESS_CACHE_DIR",
+        str(tmp_path / "cache"),
+    )
+    monkeypatch.setattr(static_file_compressor, "STATICFILES_POSTPROCESS_WORKERS", 2)
+    monkeypatch.setattr(static_file_compressor, "STATICFILES_POSTPROCESS_REPORT", False)
+    (tmp_path / "static").mkdir()
+    return CompressedStaticFilesStorage(location=str(tmp_path / "static"))
+
+
+def collect(storage, files):
+    for name, content in files.items():
+        with open(storage.path(name), "w") as f:
+            f.write(content)
+    return list(storage.post_process({name: None for name in files}))
+
+
+def test_files_are_minified_and_compressed(storage):
+    results = collect(storage, {"app.js": SCRIPT, "style.css": "a {  color: red; }"})
+
+    assert [(name, processed) for name, _path, processed in results] == [
+        ("app.js", True),
+        ("style.css", True),
+    ]
+    with open(storage.path("app.js")) as f:
+        minified = f.read()
+    assert minified == "function add(first,second){return first+second;}"
+    with gzip.open(storage.path("app.js.gz"), "rt") as f:
+        assert f.read() == minified
+
+
+def test_unchanged_files_are_restored_from_cache(storage, monkeypatch):
+    collect(storage, {"app.js": SCRIPT})
+    storage.delete("app.js.gz")
+
+    def fail(*args):
+        raise AssertionError("minified again")
+
+    monkeypatch.setattr(static_file_compressor, "STATICFILES_POSTPROCESS_WORKERS", 1)
+    monkeypatch.setattr(static_file_compressor, "minify", fail)
+    collect(storage, {"app.js": SCRIPT})
+
+    assert storage.exists("app.js.gz")
@@ -0,0 +1,83 @@
+import pytest
+from django.core.cache import cache
+
+from common import cache_versions, tiered_cache
+from common.tiered_cache import TieredCache, TieredCacheStats
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(monkeypatch):
+    cache.clear()
+    monkeypatch.setattr(tiered_cache, "stats", TieredCacheStats())
+    yield
+    cache.clear()
+
+
+def build(values):
+    def builder():
+        values.append(len(values))
+        return values[-1]
+
+    return builder
+
+
+def test_values_are_served_from_the_local_tier():
+    tiered = TieredCache("test.local")
+    built = []
+
+    assert tiered.get_or_set("key", build(built), 60) == 0
+    cache.clear()
+
+    assert tiered.get_or_set("key", build(built), 60) == 0
+    assert built == [0]
+
+
+def test_values_are_shared_between_processes():
+    built = []
+    TieredCache("test.shared").get_or_set("key", build(built), 60)
+
+    # another process, with an empty local tier
+    assert TieredCache("test.shared").get_or_set("key", build(built), 60) == 0
+    assert built == [0]
+
+
+def test_least_recently_used_values_are_evicted():
+    tiered = TieredCache("test.lru", max_entries=2)
+    tiered.set("a", 1)
+    tiered.set("b", 2)
+    tiered.get("a")
+    tiered.set("c", 3)
+    cache.clear()
+
+    assert tiered.get("a") == 1
+    assert tiered.get("b") is None
+    assert tiered.get("c") == 3
+
+
+def test_version_bumps_invalidate_both_tiers():
+    tiered = TieredCache("test.versions", check_interval=0)
+    other_process = TieredCache("test.versions", check_interval=0)
+    tiered.set("key", "old")
+    other_process.get("key")
+
+    # the other process only sees the new version in the shared cache
+    cache_versions._local["test.versions"].remove(other_process)
+    cache_versions.bump_version("test.versions")
+
+    assert tiered.get("key") is None
+    assert other_process.get("key") is None
+
+
+def test_hits_are_counted_per_namespace(monkeypatch):
+    monkeypatch.setattr(tiered_cache, "TIERED_CACHE_STATS_FLUSH_INTERVAL", 0)
+    tiered = TieredCache("test.stats")
+    tiered.get("key")
+    tiered.set("key", 1)
+    tiered.get("key")
+    TieredCache("test.stats").get("key")
+
+    assert TieredCacheStats.collect()["test.stats"] == {
+        "local_hits": 1,
+        "shared_hits": 1,
+        "misses": 1,
+    }
@@ -0,0 +1,37 @@
+import pytest
+from django.conf import settings
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.utils.translation import trans_real
+
+from common import warmup
+
+
+@pytest.mark.django_db
+def test_warm_up_loads_translations_of_all_languages():
+    warmup.warm_up()
+
+    for language, _name in settings.LANGUAGES:
+        assert language in trans_real._translations
+
+
+@pytest.mark.django_db
+def test_failing_steps_are_skipped(monkeypatch):
+    steps = []
+    monkeypatch.setattr(warmup, "WARMUP_TEMPLATES", ("does-not-exist.html",))
+    monkeypatch.setattr(warmup, "STEPS", warmup.STEPS + (lambda: steps.append("last"),))
+
+    warmup.warm_up()
+
+    assert steps == ["last"]
+
+
+def test_first_fast_request_ends_measuring(monkeypatch):
+    monkeypatch.setattr(warmup, "startup", warmup.WorkerStartup())
+    middleware = warmup.WarmupMetricsMiddleware(lambda request: HttpResponse())
+
+    for _ in range(3):
+        middleware(RequestFactory().get("/"))
+
+    assert warmup.startup.done
+    assert warmup.startup.requests == 1
@@ -0,0 +1,64 @@
+import pytest
+from django.contrib.flatpages.models import FlatPage
+from django.core.cache import cache
+
+from content.models import FlatPageExtraStyle, FlatPageTranslation
+from content.views import get_flatpage
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def flatpage(settings):
+    flatpage = FlatPage.objects.create(url="/faq/", title="FAQ", content="Answers")
+    flatpage.sites.add(settings.SITE_ID)
+    FlatPageTranslation.objects.create(
+        flatpage=flatpage, language="de", title="Fragen", content="Antworten"
+    )
+    FlatPageExtraStyle.objects.create(flatpage=flatpage, css=".faq { color: red; }")
+    return flatpage
+
+
+@pytest.mark.django_db
+def test_flatpage_is_served_from_cache(client, flatpage, django_assert_num_queries):
+    client.get("/faq/", HTTP_ACCEPT_LANGUAGE="de")
+
+    with django_assert_num_queries(0):
+        response = client.get("/faq/", HTTP_ACCEPT_LANGUAGE="de")
+
+    assert "Antworten" in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_cached_flatpage_has_extra_style(flatpage, settings, django_assert_num_queries):
+    get_flatpage("/faq/", settings.SITE_ID, "en")
+
+    with django_assert_num_queries(0):
+        cached = get_flatpage("/faq/", settings.SITE_ID, "en")
+        assert cached.extra_style.css == ".faq { color: red; }"
+    assert (cached.pk, cached.title) == (flatpage.pk, "FAQ")
+
+
+@pytest.mark.django_db
+def test_missing_flatpages_are_cached(client, django_assert_num_queries):
+    assert client.get("/unknown/").status_code == 404
+
+    with django_assert_num_queries(0):
+        assert client.get("/unknown/").status_code == 404
+
+
+@pytest.mark.django_db
+def test_changes_invalidate_cache(client, flatpage, django_capture_on_commit_callbacks):
+    client.get("/faq/", HTTP_ACCEPT_LANGUAGE="en")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        flatpage.content = "Updated answers"
+        flatpage.save()
+
+    response = client.get("/faq/", HTTP_ACCEPT_LANGUAGE="en")
+    assert "Updated answers" in response.content.decode()
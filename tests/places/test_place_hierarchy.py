@@ -0,0 +1,62 @@
+import pytest
+from django.urls import reverse
+
+from common.cache_versions import invalidate_local
+from places.hierarchy import CACHE_NAMESPACE, get_place_hierarchy
+from tests.factories import FacilityFactory, PlaceFactory
+
+
+@pytest.fixture(autouse=True)
+def fresh_hierarchy():
+    # the process local hierarchy outlives the rolled back test transactions
+    invalidate_local(CACHE_NAMESPACE)
+    yield
+    invalidate_local(CACHE_NAMESPACE)
+
+
+@pytest.mark.django_db
+def test_hierarchy_answers_without_queries(django_assert_num_queries):
+    place = PlaceFactory.create()
+    area, region, country = place.area, place.area.region, place.area.region.country
+    hierarchy = get_place_hierarchy()
+
+    with django_assert_num_queries(0):
+        node = hierarchy.get(place)
+        assert node.breadcrumps == (country, region, area, place)
+        assert node.parent == area
+        assert node.area.region.country == country
+        assert node.slugs == (country.slug, region.slug, area.slug, place.slug)
+        assert node.url == reverse("place-details", args=node.slugs)
+        assert hierarchy.url(region) == reverse(
+            "region-details", args=[country.slug, region.slug]
+        )
+
+
+@pytest.mark.django_db
+def test_hierarchy_is_rebuilt_after_changes():
+    place = PlaceFactory.create()
+    assert get_place_hierarchy().get(place).name == place.name
+
+    place.area.slug = "renamed"
+    place.area.save()
+
+    assert get_place_hierarchy().get(place).slugs[2] == "renamed"
+    assert "/renamed/" in place.get_absolute_url()
+
+
+@pytest.mark.django_db
+def test_region_selection_lists_places_having_facilities(
+    client, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        facility = FacilityFactory.create()
+        PlaceFactory.create(name="Place without facilities")
+
+    response = client.get(
+        reverse("place-details", args=facility.place.hierarchy_node.slugs)
+    )
+
+    assert response.status_code == 200
+    content = response.content.decode()
+    assert facility.place.get_absolute_url() in content
+    assert "Place without facilities" not in content
@@ -0,0 +1,110 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from api.models import ShiftChange
+from common.cache_versions import get_version
+from scheduler import archive, timeline
+from scheduler.models import (
+    ArchivedShift,
+    ArchivedShiftHelper,
+    ArchivedShiftMessageToHelpers,
+    Shift,
+    ShiftHelper,
+    ShiftMessageToHelpers,
+)
+from tests.factories import ShiftFactory, ShiftHelperFactory
+
+
+def create_shift(ended_days_ago, hours=2):
+    ending_time = timezone.now() - timedelta(days=ended_days_ago)
+    return ShiftFactory.create(
+        starting_time=ending_time - timedelta(hours=hours), ending_time=ending_time
+    )
+
+
+@pytest.fixture
+def old_shift_helper():
+    shift_helper = ShiftHelperFactory.create(shift=create_shift(ended_days_ago=400))
+    message = ShiftMessageToHelpers.objects.create(
+        message="Thank you", sender=shift_helper.user_account, shift=shift_helper.shift
+    )
+    message.recipients.add(shift_helper.user_account)
+    return shift_helper
+
+
+@pytest.mark.django_db
+def test_shifts_ended_long_ago_are_archived(old_shift_helper):
+    recent_shift = create_shift(ended_days_ago=10)
+
+    assert archive.archive(age=timedelta(days=365), batch_size=1) == 1
+
+    assert list(Shift.objects.all()) == [recent_shift]
+    assert not ShiftHelper.objects.exists()
+    assert not ShiftMessageToHelpers.objects.exists()
+    archived_shift = ArchivedShift.objects.get(pk=old_shift_helper.shift_id)
+    assert archived_shift.ending_time == old_shift_helper.shift.ending_time
+    assert list(archived_shift.helpers.all()) == [old_shift_helper.user_account]
+    archived_helper = ArchivedShiftHelper.objects.get()
+    assert archived_helper.pk == old_shift_helper.pk
+    message = ArchivedShiftMessageToHelpers.objects.get()
+    assert list(message.recipients.all()) == [old_shift_helper.user_account]
+
+
+@pytest.mark.django_db
+def test_archiving_is_not_recorded_as_deletion(
+    old_shift_helper, django_capture_on_commit_callbacks, mailoutbox
+):
+    shift = old_shift_helper.shift
+    timeline_version = get_version(timeline.get_namespace(shift.facility_id))
+    ShiftChange.objects.all().delete()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        archive.archive(age=timedelta(days=365))
+
+    assert not ShiftChange.objects.exists()
+    assert not mailoutbox
+    assert get_version(timeline.get_namespace(shift.facility_id)) != timeline_version
+
+
+@pytest.mark.django_db
+def test_reads_include_archived_shifts(old_shift_helper):
+    user_account = old_shift_helper.user_account
+    ShiftHelperFactory.create(
+        shift=create_shift(ended_days_ago=10, hours=3), user_account=user_account
+    )
+    hours = archive.get_volunteer_hours()
+    archive.archive(age=timedelta(days=365))
+
+    assert archive.get_volunteer_hours() == hours == 5
+    past_shift_helpers = archive.get_past_shift_helpers(
+        user_account, ended_before=timezone.now()
+    )
+    assert [shift_helper.shift.pk for shift_helper in past_shift_helpers] == [
+        Shift.objects.get().pk,
+        old_shift_helper.shift_id,
+    ]
+
+
+@pytest.mark.django_db
+def test_past_shifts_page_lists_archived_shifts(client, old_shift_helper):
+    archive.archive(age=timedelta(days=365))
+    client.force_login(old_shift_helper.user_account.user)
+
+    response = client.get(reverse("shift_list_done"))
+
+    assert str(ArchivedShift.objects.get()) in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_command_reports_table_sizes(capsys):
+    create_shift(ended_days_ago=400)
+
+    call_command("archive_shifts", "--age=365")
+
+    output = capsys.readouterr().out
+    assert "Archived 1 shifts" in output
+    assert "scheduler_archivedshift: 1 rows" in output
@@ -0,0 +1,84 @@
+from datetime import datetime, time, timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils.timezone import get_current_timezone, localdate
+
+from scheduler import live_updates
+from tests.factories import ShiftFactory, ShiftHelperFactory, UserAccountFactory
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr("scheduler.views.LIVE_UPDATES_ENABLED", True)
+
+
+def slots_url(shift, day):
+    return reverse(
+        "planner_slots", args=[shift.facility.slug, day.year, day.month, day.day]
+    )
+
+
+@pytest.mark.django_db
+def test_slot_counts_include_shifts_ending_on_the_next_day():
+    day = localdate() + timedelta(days=1)
+    tz = get_current_timezone()
+    shift = ShiftFactory.create(
+        slots=4,
+        starting_time=datetime.combine(day, time(22), tzinfo=tz),
+        ending_time=datetime.combine(day + timedelta(days=1), time(2), tzinfo=tz),
+    )
+    ShiftHelperFactory.create(shift=shift)
+
+    for shown_day in (day, day + timedelta(days=1)):
+        counts = live_updates.build_slot_counts(shift.facility_id, shown_day)
+        assert counts == [[shift.pk, 1, 4]]
+
+
+@pytest.mark.django_db
+def test_unchanged_slot_counts_are_not_modified(
+    client, enabled, django_assert_max_num_queries
+):
+    client.force_login(UserAccountFactory.create().user)
+    shift = ShiftFactory.create(slots=3)
+    day = localdate(shift.starting_time)
+
+    response = client.get(slots_url(shift, day))
+
+    assert response.status_code == 200
+    assert response.json() == [[shift.pk, 0, 3]]
+
+    # the session, the user and the facility, but not the counts
+    with django_assert_max_num_queries(3):
+        response = client.get(
+            slots_url(shift, day), HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+
+    assert response.status_code == 304
+
+
+@pytest.mark.django_db
+def test_shift_helper_changes_change_the_slot_counts(
+    client, enabled, django_capture_on_commit_callbacks
+):
+    client.force_login(UserAccountFactory.create().user)
+    shift = ShiftFactory.create(slots=3)
+    day = localdate(shift.starting_time)
+    etag = client.get(slots_url(shift, day))["ETag"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        ShiftHelperFactory.create(shift=shift)
+    response = client.get(slots_url(shift, day), HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 200
+    assert response.json() == [[shift.pk, 1, 3]]
+
+
+@pytest.mark.django_db
+def test_slot_counts_are_not_served_when_disabled(client):
+    client.force_login(UserAccountFactory.create().user)
+    shift = ShiftFactory.create()
+
+    response = client.get(slots_url(shift, localdate(shift.starting_time)))
+
+    assert response.status_code == 404
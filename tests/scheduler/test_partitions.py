@@ -0,0 +1,67 @@
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.utils.timezone import get_current_timezone
+
+from scheduler import checks, managers, models, partitions
+from scheduler.models import Shift
+from tests.factories import ShiftFactory
+
+
+def test_partitions_are_named_by_month():
+    months = list(partitions.months(date(2022, 11, 15), date(2023, 2, 1)))
+
+    assert [partitions.partition_name(month) for month in months] == [
+        "scheduler_shift_p2022_11",
+        "scheduler_shift_p2022_12",
+        "scheduler_shift_p2023_01",
+        "scheduler_shift_p2023_02",
+    ]
+    assert months[0] == datetime(2022, 11, 1, tzinfo=get_current_timezone())
+
+
+@pytest.mark.django_db
+def test_nothing_is_done_without_partitioned_table():
+    assert not partitions.is_partitioned()
+    assert partitions.ensure_partitions(until=date(2030, 1, 1)) == []
+
+
+@pytest.mark.django_db
+def test_window_queries_are_bounded_by_the_longest_shift(monkeypatch):
+    day = date(2022, 5, 2)
+    start = datetime.combine(day, time(8), tzinfo=get_current_timezone())
+    shift = ShiftFactory.create(
+        starting_time=start, ending_time=start + timedelta(hours=4)
+    )
+    ShiftFactory.create(
+        starting_time=start - timedelta(days=3), ending_time=start + timedelta(hours=1)
+    )
+    assert Shift.objects.on_shiftdate(day).count() == 2
+
+    monkeypatch.setattr(managers, "SHIFT_MAX_DURATION", timedelta(days=1))
+
+    assert list(Shift.objects.on_shiftdate(day)) == [shift]
+    assert list(Shift.objects.on_shiftdates(day, day)) == [shift]
+
+
+@pytest.mark.django_db
+def test_shifts_longer_than_the_longest_shift_are_rejected(monkeypatch):
+    start = datetime.combine(date(2022, 5, 2), time(8), tzinfo=get_current_timezone())
+    shift = ShiftFactory.create(
+        starting_time=start - timedelta(days=3), ending_time=start
+    )
+    monkeypatch.setattr(models, "SHIFT_MAX_DURATION", timedelta(days=1))
+    monkeypatch.setattr(checks, "SHIFT_MAX_DURATION", timedelta(days=1))
+
+    # existing shifts are reported
+    (warning,) = checks.check_shift_durations(None, databases=["default"])
+    assert warning.id == "scheduler.W001"
+    with pytest.raises(ValidationError):
+        shift.full_clean()
+    with pytest.raises(ValidationError):
+        ShiftFactory.create(starting_time=start, ending_time=start + timedelta(days=2))
+
+    shift.starting_time = start - timedelta(hours=8)
+    shift.save()
+    assert checks.check_shift_durations(None, databases=["default"]) == []
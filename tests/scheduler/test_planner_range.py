@@ -0,0 +1,115 @@
+from datetime import datetime, time, timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils.timezone import get_current_timezone, localdate
+
+from scheduler.views import group_shifts_by_day
+from tests.factories import (
+    FacilityFactory,
+    ShiftFactory,
+    ShiftHelperFactory,
+    TaskFactory,
+    UserAccountFactory,
+)
+
+
+def at(day, hour):
+    return datetime.combine(day, time(hour), tzinfo=get_current_timezone())
+
+
+def range_url(facility, first_date, days=None):
+    url = reverse(
+        "planner_range",
+        args=[facility.slug, first_date.year, first_date.month, first_date.day],
+    )
+    return url if days is None else "{}?days={}".format(url, days)
+
+
+@pytest.fixture
+def user_account(client):
+    user_account = UserAccountFactory.create()
+    client.force_login(user_account.user)
+    return user_account
+
+
+def create_shifts(facility, first_date, days):
+    for offset in range(days):
+        day = first_date + timedelta(days=offset)
+        task = TaskFactory.create(facility=facility)
+        ShiftFactory.create(
+            facility=facility,
+            task=task,
+            starting_time=at(day, 8),
+            ending_time=at(day, 12),
+        )
+        ShiftFactory.create(
+            facility=facility,
+            task=task,
+            starting_time=at(day, 22),
+            ending_time=at(day + timedelta(days=1), 2),
+        )
+
+
+@pytest.mark.django_db
+def test_number_of_queries_does_not_depend_on_shifts(
+    client, user_account, django_assert_num_queries
+):
+    first_date = localdate() + timedelta(days=1)
+    facility = FacilityFactory.create()
+    create_shifts(facility, first_date, 1)
+    client.get(range_url(facility, first_date, days=1))
+
+    with django_assert_num_queries(9) as one_day:
+        client.get(range_url(facility, first_date, days=1))
+
+    create_shifts(facility, first_date + timedelta(days=1), 6)
+    ShiftHelperFactory.create(
+        shift=facility.shift_set.first(), user_account=user_account
+    )
+    with django_assert_num_queries(len(one_day)):
+        response = client.get(range_url(facility, first_date, days=7))
+
+    assert len(response.context["days"]) == 7
+    assert len(response.context["joined_shift_ids"]) == 1
+
+
+def test_shifts_spanning_midnight_are_grouped_into_both_days():
+    first_date = datetime(2022, 5, 2).date()
+    task = TaskFactory.build(pk=1)
+    late_shift = ShiftFactory.build(
+        task=task,
+        workplace=None,
+        starting_time=at(first_date, 22),
+        ending_time=at(first_date + timedelta(days=1), 2),
+    )
+
+    days = group_shifts_by_day([late_shift], first_date, first_date + timedelta(days=2))
+
+    assert [day for day, _groups in days] == [
+        first_date + timedelta(days=offset) for offset in range(3)
+    ]
+    assert days[0][1] == [(task, None, [late_shift])]
+    assert days[1][1] == [(task, None, [late_shift])]
+    assert days[2][1] == []
+
+
+@pytest.mark.django_db
+def test_number_of_days_is_capped(client, user_account):
+    facility = FacilityFactory.create()
+
+    response = client.get(range_url(facility, localdate(), days=1000))
+
+    assert len(response.context["days"]) == 14
+
+
+@pytest.mark.django_db
+def test_joining_a_shift_redirects_to_the_same_range(client, user_account):
+    shift = ShiftFactory.create()
+    url = range_url(shift.facility, localdate(), days=3)
+
+    response = client.post(url, {"join_shift": shift.pk})
+
+    assert response.status_code == 302
+    assert response.url == url
+    assert shift.helpers.filter(pk=user_account.pk).exists()
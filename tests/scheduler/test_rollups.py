@@ -0,0 +1,111 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from organizations.models import Facility
+from scheduler import rollups
+from scheduler.models import OpenShiftRollup
+from tests.factories import (
+    FacilityFactory,
+    PlaceFactory,
+    ShiftFactory,
+    ShiftHelperFactory,
+)
+
+Level = OpenShiftRollup.Level
+
+
+def rollup(level, obj):
+    return OpenShiftRollup.objects.get(level=level, object_id=obj.pk)
+
+
+@pytest.fixture
+def on_commit(django_capture_on_commit_callbacks):
+    return lambda: django_capture_on_commit_callbacks(execute=True)
+
+
+@pytest.mark.django_db
+def test_rollups_follow_shift_changes(on_commit):
+    place = PlaceFactory.create()
+    with on_commit():
+        facility = FacilityFactory.create(place=place)
+        FacilityFactory.create(place=place)
+        shift = ShiftFactory.create(facility=facility, slots=3)
+        ShiftFactory.create(facility=facility, slots=2)
+        ShiftHelperFactory.create(shift=shift)
+
+    facility_rollup = rollup(Level.FACILITY, facility)
+    assert facility_rollup.open_shift_count == 2
+    assert facility_rollup.open_slot_count == 4
+    for level, obj in (
+        (Level.PLACE, place),
+        (Level.AREA, place.area),
+        (Level.REGION, place.area.region),
+        (Level.COUNTRY, place.area.region.country),
+    ):
+        geographic_rollup = rollup(level, obj)
+        assert geographic_rollup.facility_count == 2
+        assert geographic_rollup.open_shift_count == 2
+        assert geographic_rollup.open_slot_count == 4
+
+    assert list(Facility.objects.with_open_shifts()) == [facility]
+
+    with on_commit():
+        shift.delete()
+
+    assert rollup(Level.PLACE, place).open_shift_count == 1
+
+
+@pytest.mark.django_db
+def test_refresh_expired(on_commit):
+    with on_commit():
+        shift = ShiftFactory.create()
+    facility = shift.facility
+    assert list(Facility.objects.with_open_shifts()) == [facility]
+
+    # the shift ends without any change triggering a refresh
+    past = timezone.now() - timedelta(minutes=1)
+    type(shift).objects.filter(pk=shift.pk).update(
+        starting_time=past - timedelta(hours=1), ending_time=past
+    )
+    OpenShiftRollup.objects.filter(level=Level.FACILITY).update(
+        next_expiry=past, last_expiry=past
+    )
+    assert list(Facility.objects.with_open_shifts()) == []
+
+    rollups.refresh_expired()
+
+    assert rollup(Level.FACILITY, facility).open_shift_count == 0
+    assert rollup(Level.PLACE, facility.place).open_shift_count == 0
+    assert rollup(Level.PLACE, facility.place).facility_count == 1
+
+
+@pytest.mark.django_db
+def test_shift_changes_only_refresh_ancestors(on_commit, monkeypatch):
+    place = PlaceFactory.create()
+    other_place = PlaceFactory.create(area=place.area)
+    with on_commit():
+        facility = FacilityFactory.create(place=place)
+        other_facility = FacilityFactory.create(place=other_place)
+        shift = ShiftFactory.create(facility=facility, slots=3)
+        ShiftFactory.create(facility=other_facility, slots=2)
+        FacilityFactory.create()
+
+    def refresh_geography():
+        raise AssertionError("the whole geography was refreshed")
+
+    monkeypatch.setattr(rollups, "refresh_geography", refresh_geography)
+    with on_commit():
+        shift.slots = 7
+        shift.save()
+    incremental = list(
+        OpenShiftRollup.objects.values_list("level", "object_id", "open_slot_count")
+    )
+    monkeypatch.undo()
+    rollups.refresh_all()
+
+    assert rollup(Level.AREA, place.area).open_slot_count == 9
+    assert sorted(incremental) == sorted(
+        OpenShiftRollup.objects.values_list("level", "object_id", "open_slot_count")
+    )
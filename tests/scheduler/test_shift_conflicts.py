@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta
+
+import pytest
+from django.db import IntegrityError, connection, transaction
+from django.urls import reverse
+from django.utils.timezone import get_current_timezone, localtime
+
+from scheduler.models import ShiftHelper
+from tests.factories import ShiftFactory, UserAccountFactory
+
+
+def at(time):
+    hours, minutes = map(int, time.split(":"))
+    return datetime(2015, 1, 1, hours, minutes, tzinfo=get_current_timezone())
+
+
+def create_shift(start, end):
+    return ShiftFactory.create(starting_time=at(start), ending_time=at(end))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "helped, joined, conflicts",
+    [
+        # the new shift is graced by an hour, the helped one is not
+        (("08:00", "12:00"), ("10:00", "14:00"), True),
+        (("08:00", "12:00"), ("10:30", "14:00"), True),
+        (("08:00", "12:00"), ("11:00", "14:00"), False),
+        (("08:00", "12:00"), ("11:30", "14:00"), False),
+        (("08:00", "12:00"), ("05:00", "09:30"), True),
+        (("08:00", "12:00"), ("05:00", "08:30"), False),
+        # short shifts are graced by half their duration
+        (("09:00", "10:00"), ("09:30", "10:15"), True),
+        (("09:00", "10:00"), ("08:00", "09:00"), False),
+        (("10:00", "10:30"), ("10:30", "14:00"), False),
+        (("10:00", "10:30"), ("10:00", "10:30"), True),
+    ],
+)
+def test_the_graced_shift_is_compared_with_the_helped_ones(
+    helped, joined, conflicts, django_assert_num_queries
+):
+    user_account = UserAccountFactory.create()
+    ShiftHelper.objects.create(user_account=user_account, shift=create_shift(*helped))
+    joined_shift = create_shift(*joined)
+
+    hard_conflicts, _ = ShiftHelper.objects.conflicting(
+        joined_shift, user_account=user_account, grace=timedelta(hours=1)
+    )
+    with django_assert_num_queries(1):
+        annotated_conflicts = list(
+            ShiftHelper.objects.conflicts(
+                joined_shift, user_account=user_account, grace=timedelta(hours=1)
+            )
+        )
+
+    assert hard_conflicts.exists() == conflicts
+    assert any(helper.hard_conflict for helper in annotated_conflicts) == conflicts
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="conflicts are checked by a trigger"
+)
+def test_the_database_rejects_hard_conflicts():
+    user_account = UserAccountFactory.create()
+    ShiftHelper.objects.create(
+        user_account=user_account, shift=create_shift("08:00", "12:00")
+    )
+
+    ShiftHelper.objects.create(
+        user_account=user_account, shift=create_shift("11:30", "14:00")
+    )
+    with pytest.raises(IntegrityError), transaction.atomic():
+        ShiftHelper.objects.create(
+            user_account=user_account, shift=create_shift("10:00", "14:00")
+        )
+
+
+@pytest.mark.django_db
+def test_conflicts_rejected_by_the_database_are_reported(client, monkeypatch):
+    starting_time = localtime() + timedelta(days=1)
+    shift = ShiftFactory.create(
+        starting_time=starting_time, ending_time=starting_time + timedelta(hours=2)
+    )
+    user_account = UserAccountFactory.create()
+    client.force_login(user_account.user)
+
+    def get_or_create(**kwargs):
+        # what PostgreSQL's conflict trigger does to concurrent sign-ups
+        raise IntegrityError("conflicting shift helper")
+
+    monkeypatch.setattr(ShiftHelper.objects, "get_or_create", get_or_create)
+    day = starting_time.date()
+    response = client.post(
+        reverse(
+            "planner_by_facility",
+            args=[shift.facility.slug, day.year, day.month, day.day],
+        ),
+        {"join_shift": shift.pk},
+        follow=True,
+    )
+
+    assert [str(message) for message in response.context["messages"]] == [
+        "We can't add you to this shift because you've already agreed to other "
+        "shifts at the same time."
+    ]
@@ -0,0 +1,130 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils.timezone import localtime
+
+from scheduler import signup_queue
+from scheduler.models import ShiftHelper, ShiftSignupRequest
+from tests.factories import ShiftFactory, ShiftHelperFactory, UserAccountFactory
+
+Status = ShiftSignupRequest.Status
+
+
+def planner_url(shift):
+    day = localtime(shift.starting_time).date()
+    return reverse(
+        "planner_by_facility",
+        args=[shift.facility.slug, day.year, day.month, day.day],
+    )
+
+
+@pytest.mark.django_db
+def test_requests_are_confirmed_in_order_of_arrival():
+    shift = ShiftFactory.create(slots=2, queued_signup=True)
+    user_accounts = UserAccountFactory.create_batch(3)
+    for user_account in reversed(user_accounts):
+        signup_queue.enqueue(shift, user_account)
+
+    assert signup_queue.process(shift.pk) == 3
+
+    statuses = dict(ShiftSignupRequest.objects.values_list("user_account_id", "status"))
+    assert statuses == {
+        user_accounts[2].pk: Status.CONFIRMED,
+        user_accounts[1].pk: Status.CONFIRMED,
+        user_accounts[0].pk: Status.COVERED,
+    }
+    assert set(shift.helpers.all()) == set(user_accounts[1:])
+
+
+@pytest.mark.django_db
+def test_requests_are_processed_in_batches(monkeypatch):
+    monkeypatch.setattr(signup_queue, "SIGNUP_QUEUE_BATCH_SIZE", 2)
+    shift = ShiftFactory.create(slots=5, queued_signup=True)
+    for user_account in UserAccountFactory.create_batch(5):
+        signup_queue.enqueue(shift, user_account)
+
+    assert signup_queue.process_batch(shift.pk, batch_size=2) == 2
+    signup_queue.process_all()
+
+    assert shift.helpers.count() == 5
+    assert not ShiftSignupRequest.objects.filter(status=Status.PENDING).exists()
+
+
+@pytest.mark.django_db
+def test_conflicting_requests_are_rejected():
+    shift = ShiftFactory.create(queued_signup=True)
+    other_shift = ShiftFactory.create(
+        starting_time=shift.starting_time, ending_time=shift.ending_time
+    )
+    user_account = ShiftHelperFactory.create(shift=other_shift).user_account
+    signup_queue.enqueue(shift, user_account)
+
+    signup_queue.process(shift.pk)
+
+    request = ShiftSignupRequest.objects.get()
+    assert request.status == Status.CONFLICTING
+    assert request.processed_at is not None
+    assert not shift.helpers.exists()
+
+
+@pytest.mark.django_db
+def test_asking_again_requeues_a_rejected_request():
+    shift = ShiftFactory.create(slots=1, queued_signup=True)
+    first, second = UserAccountFactory.create_batch(2)
+    signup_queue.enqueue(shift, first)
+    signup_queue.enqueue(shift, second)
+    signup_queue.process(shift.pk)
+    ShiftHelper.objects.filter(user_account=first).delete()
+
+    assert signup_queue.enqueue(shift, second)
+    assert not signup_queue.enqueue(shift, second)
+    signup_queue.process(shift.pk)
+
+    assert list(shift.helpers.all()) == [second]
+
+
+@pytest.mark.django_db
+def test_joining_a_queued_shift_shows_the_pending_request(client):
+    starting_time = localtime() + timedelta(days=1)
+    shift = ShiftFactory.create(
+        queued_signup=True,
+        starting_time=starting_time,
+        ending_time=starting_time + timedelta(hours=1),
+    )
+    user_account = UserAccountFactory.create()
+    client.force_login(user_account.user)
+
+    response = client.post(planner_url(shift), {"join_shift": shift.pk}, follow=True)
+
+    assert not shift.helpers.exists()
+    assert response.context["pending_signup_shift_ids"] == {shift.pk}
+    assert "Sign-Up Pending" in response.content.decode()
+
+    client.post(planner_url(shift), {"leave_shift": shift.pk})
+
+    assert not ShiftSignupRequest.objects.exists()
+
+
+@pytest.mark.django_db
+def test_rejected_requests_show_the_reason(client):
+    starting_time = localtime() + timedelta(days=1)
+    shift = ShiftFactory.create(
+        slots=1,
+        queued_signup=True,
+        starting_time=starting_time,
+        ending_time=starting_time + timedelta(hours=1),
+    )
+    ShiftHelperFactory.create(shift=shift)
+    user_account = UserAccountFactory.create()
+    client.force_login(user_account.user)
+    signup_queue.enqueue(shift, user_account)
+    signup_queue.process(shift.pk)
+
+    response = client.get(planner_url(shift))
+
+    assert response.context["pending_signup_shift_ids"] == set()
+    assert response.context["processed_signups"] == {
+        shift.pk: "rejected, shift covered"
+    }
+    assert "Sign-up rejected, shift covered" in response.content.decode()
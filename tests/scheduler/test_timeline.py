@@ -0,0 +1,116 @@
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils.timezone import localtime
+
+from organizations.models import Facility
+from tests.factories import (
+    FacilityFactory,
+    ShiftFactory,
+    ShiftHelperFactory,
+    UserAccountFactory,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def shift():
+    return ShiftFactory.create(slots=3)
+
+
+def timeline_url(shift):
+    schedule_date = localtime(shift.starting_time).date()
+    return reverse(
+        "planner_timeline",
+        args=[
+            shift.facility.slug,
+            schedule_date.year,
+            schedule_date.month,
+            schedule_date.day,
+        ],
+    )
+
+
+@pytest.fixture
+def user_client(client):
+    client.force_login(UserAccountFactory.create().user)
+    return client
+
+
+@pytest.mark.django_db
+def test_timeline_data_is_compact(user_client, shift):
+    data = user_client.get(timeline_url(shift)).json()
+
+    assert data["tasks"] == [[shift.task.pk, shift.task.name]]
+    assert data["workplaces"] == [[shift.workplace.pk, shift.workplace.name]]
+    assert data["shifts"] == [
+        [
+            shift.pk,
+            shift.task.pk,
+            shift.workplace.pk,
+            0,
+            3,
+            localtime(shift.starting_time).isoformat(timespec="minutes"),
+            localtime(shift.ending_time).isoformat(timespec="minutes"),
+        ]
+    ]
+
+
+@pytest.mark.django_db
+def test_timeline_data_is_cached(user_client, shift, django_assert_max_num_queries):
+    url = timeline_url(shift)
+    etag = user_client.get(url)["ETag"]
+
+    # the session, the user and the facility
+    with django_assert_max_num_queries(3):
+        assert user_client.get(url)["ETag"] == etag
+
+    assert user_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+
+@pytest.mark.django_db
+def test_shift_helper_changes_invalidate_timeline_data(
+    user_client, shift, django_capture_on_commit_callbacks
+):
+    url = timeline_url(shift)
+    user_client.get(url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        ShiftHelperFactory.create(shift=shift)
+
+    assert user_client.get(url).json()["shifts"][0][3] == 1
+
+
+@pytest.mark.django_db
+def test_timeline_data_is_not_served_for_disabled_timelines(user_client):
+    facility = FacilityFactory.create(
+        timeline_enabled=Facility.TimelineViewMode.DISABLED
+    )
+    shift = ShiftFactory.create(facility=facility)
+
+    assert user_client.get(timeline_url(shift)).status_code == 404
+
+
+@pytest.mark.django_db
+def test_schedule_page_does_not_embed_timeline_data(user_client, shift):
+    schedule_date = localtime(shift.starting_time).date()
+    url = reverse(
+        "planner_by_facility",
+        kwargs={
+            "facility_slug": shift.facility.slug,
+            "year": schedule_date.year,
+            "month": schedule_date.month,
+            "day": schedule_date.day,
+        },
+    )
+
+    content = user_client.get(url).content.decode()
+
+    assert f"id: {shift.pk}," not in content
+    assert timeline_url(shift) in content
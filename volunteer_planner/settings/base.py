@@ -65,6 +65,7 @@ LOCAL_APPS = (
     "news",
     "notifications",
     "content",
+    "api",
 )
 
 INSTALLED_APPS = DJANGO_APPS + LOCAL_APPS + THIRD_PARTY_APPS
@@ -72,16 +73,23 @@ INSTALLED_APPS = DJANGO_APPS + LOCAL_APPS + THIRD_PARTY_APPS
 DEFAULT_AUTO_FIELD = "django.db.models.AutoField"
 
 MIDDLEWARE = [
+    "common.warmup.WarmupMetricsMiddleware",
+    "common.compression.CompressionMiddleware",
+    "common.db_replicas.ReplicaMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "common.profiling.RequestProfilingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "common.admin.RedirectOnAdminPermissionDenied403",
 ]
 
+# sends reads of some views to DATABASE_REPLICAS, see common.db_replicas
+DATABASE_ROUTERS = ["common.db_replicas.ReplicaRouter"]
+
 AUTHENTICATION_BACKENDS = [
     "accounts.auth.EmailAsUsernameModelBackend",
     "django.contrib.auth.backends.ModelBackend",
@@ -96,6 +104,10 @@ STATICFILES_DIRS = [
     os.path.join(SITE_ROOT, "resources"),
 ]
 STATICFILES_STORAGE = "common.static_file_compressor.CompressedStaticFilesStorage"
+# keeps minified and compressed static files between collectstatic runs
+STATICFILES_POSTPROCESS_CACHE_DIR = os.environ.get(
+    "STATICFILES_POSTPROCESS_CACHE_DIR", os.path.join(SITE_ROOT, ".cache", "static")
+)
 MEDIA_URL = "/media/"
 
 TEMPLATES = [
@@ -113,6 +125,7 @@ TEMPLATES = [
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
                 "non_logged_in_area.context_processors.current_site",
+                "common.page_cache.csrf_token_placeholder",
             ],
         },
     },
@@ -122,16 +135,25 @@ LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
     "filters": {"require_debug_false": {"()": "django.utils.log.RequireDebugFalse"}},
+    "formatters": {
+        "json": {"()": "common.brace_format_logging.JsonFormatter"},
+    },
     "handlers": {
         "mail_admins": {
             "level": "ERROR",
             "filters": ["require_debug_false"],
             "class": "django.utils.log.AdminEmailHandler",
-        }
+        },
+        # sends mails in a background thread instead of the request thread
+        "queued_mail_admins": {
+            "level": "ERROR",
+            "class": "common.brace_format_logging.QueueListenerHandler",
+            "handlers": ["mail_admins"],
+        },
     },
     "loggers": {
         "django.request": {
-            "handlers": ["mail_admins"],
+            "handlers": ["queued_mail_admins"],
             "level": "ERROR",
             # if logging handlers above are added/edited, re-evaluate 'propagate'.
             # for now: don't propagate, because it sends every ERROR e-mail twice,
@@ -180,13 +202,47 @@ ORGANIZATION_MANAGER_GROUPNAME = "Organization Manager"
 
 DEFAULT_SHIFT_CONFLICT_GRACE = timedelta(hours=1)
 
-CELERY_BROKER_URL = f"redis://{os.environ.get('REDIS_HOST', 'localhost')}/"
+REDIS_URL = f"redis://{os.environ.get('REDIS_HOST', 'localhost')}/"
+CELERY_BROKER_URL = REDIS_URL
 CELERY_RESULT_BACKEND = "django-db"
 CELERY_BEAT_SCHEDULER = os.environ.get(
     "CELERY_BEAT_SCHEDULER", "django_celery_beat.schedulers:DatabaseScheduler"
 )
+CELERY_BEAT_SCHEDULE = {
+    "refresh-expired-open-shift-rollups": {
+        "task": "scheduler.tasks.refresh_expired_open_shift_rollups",
+        "schedule": 60,
+    },
+    "rebuild-open-shift-rollups": {
+        "task": "scheduler.tasks.rebuild_open_shift_rollups",
+        "schedule": 60 * 60,
+    },
+    # sign-ups of shifts with queued sign-up are confirmed by this task, so
+    # it runs often, it's a single query if nothing is pending
+    "process-signup-queues": {
+        "task": "scheduler.tasks.process_signup_queues",
+        "schedule": 5,
+    },
+    "archive-past-shifts": {
+        "task": "scheduler.tasks.archive_past_shifts",
+        "schedule": 24 * 60 * 60,
+    },
+    # does nothing unless the shift table was partitioned, see
+    # scheduler.partitions
+    "maintain-shift-partitions": {
+        "task": "scheduler.tasks.maintain_shift_partitions",
+        "schedule": 24 * 60 * 60,
+    },
+    "compact-change-log": {
+        "task": "api.tasks.compact_change_log",
+        "schedule": 60 * 60,
+    },
+}
 # TODO
 # Hopefully, with 2.3.0 django-celery-beat will be TZ aware and working, but now
 # it's TzAwareCrontab uses pytz and does not handle ZoneInfo well
 # (https://github.com/celery/django-celery-beat/issues/518)
 DJANGO_CELERY_BEAT_TZ_AWARE = False
+
+# open schedule pages poll the slot counts of their shifts
+LIVE_UPDATES_ENABLED = os.environ.get("LIVE_UPDATES_ENABLED", "") == "1"
@@ -4,6 +4,22 @@ from .sentry import *  # noqa: F401
 DEBUG = os.environ.get("DEV", False)
 
 STATIC_ROOT = os.environ["STATIC_ROOT"]
+# content hashes in file names allow far-future caching by clients and proxies
+STATICFILES_STORAGE = (
+    "common.static_file_compressor.CompressedManifestStaticFilesStorage"
+)
+
+# keep compiled templates per process, even if DEBUG is enabled
+TEMPLATES[0]["APP_DIRS"] = False
+TEMPLATES[0]["OPTIONS"]["loaders"] = [
+    (
+        "django.template.loaders.cached.Loader",
+        [
+            "django.template.loaders.filesystem.Loader",
+            "django.template.loaders.app_directories.Loader",
+        ],
+    )
+]
 
 # Let this be done by frontend reverse proxy, if required!
 PREPEND_WWW = False
@@ -17,9 +33,27 @@ DATABASES = {
         "NAME": os.environ.get("DATABASE_NAME"),
         "PASSWORD": os.environ.get("DATABASE_PW"),
         "USER": os.environ.get("DATABASE_USER"),
+        # seconds connections are reused for, instead of connecting per request,
+        # 0 disables reuse (see common.db_connections)
+        "CONN_MAX_AGE": int(os.environ.get("DATABASE_CONN_MAX_AGE", 300)),
     }
 }
 
+# read replicas of the default database, e.g. "replica1.db,replica2.db"
+DATABASE_REPLICAS = []
+for number, host in enumerate(
+    filter(None, os.environ.get("DATABASE_REPLICA_HOSTS", "").split(",")), start=1
+):
+    alias = "replica{}".format(number)
+    DATABASES[alias] = dict(
+        DATABASES["default"],
+        HOST=host,
+        # an unavailable replica must not block requests for long
+        OPTIONS={"connect_timeout": 2},
+        TEST={"MIRROR": "default"},
+    )
+    DATABASE_REPLICAS.append(alias)
+
 ALLOWED_HOSTS = os.environ.get(
     "ALLOWED_HOSTS", "volunteer-planner.org,www.volunteer-planner.org"
 ).split(sep=",") + ["localhost"]
@@ -43,3 +77,22 @@ CACHES = {
 }
 
 INTERNAL_IPS = ["127.0.0.1", "172.20.0.1"]
+
+# Log to stderr as JSON lines (picked up by uwsgi's logger). Records are formatted
+# and written by a background thread, so logging does not add request latency.
+LOGGING["handlers"].update(
+    {
+        "console_json": {
+            "class": "logging.StreamHandler",
+            "formatter": "json",
+        },
+        "queued_console_json": {
+            "class": "common.brace_format_logging.QueueListenerHandler",
+            "handlers": ["console_json"],
+        },
+    }
+)
+LOGGING["root"] = {
+    "handlers": ["queued_console_json"],
+    "level": os.environ.get("LOG_LEVEL", "WARNING"),
+}
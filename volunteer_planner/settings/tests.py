@@ -6,3 +6,10 @@ DEBUG = False
 ALLOWED_HOSTS += ["localhost"]
 
 SECRET_KEY = "Kitten like fish"
+
+# there is no Redis server for tests, see tests/common/test_ratelimit.py
+RATELIMIT_ENABLED = False
+
+# for tests of common.db_replicas, not used as replica unless
+# DATABASE_REPLICAS is set
+DATABASES["replica"] = dict(DATABASES["default"], TEST={"MIRROR": "default"})
@@ -12,6 +12,7 @@ urlpatterns = [
     re_path(r"^helpdesk/", include("scheduler.urls")),
     re_path(r"^orgs/", include("organizations.urls")),
     re_path(r"^places/", include("scheduler.place_urls")),
+    re_path(r"^api/", include("api.urls")),
     re_path(r"^admin/", admin.site.urls),
     re_path(r"^i18n/", include("django.conf.urls.i18n")),
     re_path(
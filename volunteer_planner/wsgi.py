@@ -5,7 +5,30 @@ WSGI config for production setup.
 import os
 
 from django.core.wsgi import get_wsgi_application
+from django.db import connections
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "volunteer_planner.settings.production")
 
 application = get_wsgi_application()
+
+from common.settings import WARMUP_ENABLED  # noqa: E402
+
+if WARMUP_ENABLED:
+    # in the uwsgi master, before the workers are forked
+    from common.warmup import warm_up
+
+    warm_up()
+
+# uwsgi forks its workers after loading the application, connections opened
+# while loading would be shared by all workers (and closing them in a worker
+# would end them for all others), so none must be left open here
+connections.close_all()
+
+try:
+    from uwsgidecorators import postfork
+except ImportError:
+    pass
+else:
+    from common.warmup import worker_started
+
+    postfork(worker_started)
@@ -1,9 +1,25 @@
 import os
 
 from celery import Celery
+from celery.signals import task_postrun, task_prerun
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "volunteer_planner.settings.local")
 
 app = Celery()
 app.config_from_object("django.conf:settings", namespace="CELERY", force=True)
 app.autodiscover_tasks()
+
+
+@task_prerun.connect
+def check_db_connections(**kwargs):
+    # persistent connections of idle workers may have broken meanwhile
+    from common.db_connections import check_connections
+
+    check_connections()
+
+
+@task_postrun.connect
+def touch_db_connections(**kwargs):
+    from common.db_connections import touch_connections
+
+    touch_connections()